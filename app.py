@@ -1,21 +1,43 @@
+import time
+_startup_began = time.perf_counter()
 import os
+import sys
 import re
 import json
-import requests
 import logging
-import time
+import importlib
+from contextlib import contextmanager
 from datetime import datetime, timedelta
-from flask import Flask, render_template_string, request, jsonify, session
-from PIL import Image
-from io import BytesIO
+from flask import Flask, request, jsonify, session, Response, g, has_request_context
+from io import BytesIO, BufferedReader, TextIOWrapper
 import urllib.parse
-from bs4 import BeautifulSoup
+import codecs
+import csv
+import tempfile
+import xml.etree.ElementTree as ElementTree
+import gzip
+from html.parser import HTMLParser
 from werkzeug.utils import secure_filename
 import base64
-from github import Github
 import secrets
+import random
+import threading
+import sqlite3
+import uuid
+import hashlib
+import atexit
+import queue
+import asyncio
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+from collections import OrderedDict, deque
 from dotenv import load_dotenv
-from playwright.sync_api import sync_playwright
+try:
+    import brotli
+except ImportError:  # optional: pages and assets are then served gzip-only
+    brotli = None
+
+_imports_done = time.perf_counter()
 
 # Load environment variables from .env file
 load_dotenv()
@@ -31,6 +53,69 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+class LazyModule:
+    """Stand-in for a heavy module that imports it on first attribute access.
+
+    Lets ``/`` and ``/login`` answer without paying for Playwright, PyGithub,
+    Pillow and friends; whichever request first needs one pays its import
+    (or ``warm_lazy_modules`` does, in the background, right after startup).
+    """
+
+    registry = {}
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+        self._load_ms = None
+        self._lock = threading.Lock()
+        LazyModule.registry[name] = self
+
+    def _load(self):
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    start = time.perf_counter()
+                    module = importlib.import_module(self._name)
+                    self._load_ms = (time.perf_counter() - start) * 1000
+                    self._module = module
+                    logger.info(f"Imported {self._name} on first use in {self._load_ms:.1f} ms")
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        return f"<LazyModule {self._name} {'loaded' if self._module is not None else 'pending'}>"
+
+requests = LazyModule('requests')
+httpx = LazyModule('httpx')
+bs4 = LazyModule('bs4')
+github = LazyModule('github')
+Image = LazyModule('PIL.Image')
+playwright_async = LazyModule('playwright.async_api')
+prometheus = LazyModule('prometheus_client')
+prometheus_multiprocess = LazyModule('prometheus_client.multiprocess')
+
+def warm_lazy_modules():
+    """Import every deferred module and build the page bundle; run in a background thread once the server is listening"""
+    for module in list(LazyModule.registry.values()):
+        try:
+            module._load()
+        except Exception as e:
+            logger.warning(f"Could not preload {module._name}: {str(e)}")
+    get_page_bundle()
+
+def startup_report():
+    """Where startup time went: eager imports, module setup, and each deferred import so far"""
+    return {
+        'imports_ms': round((_imports_done - _startup_began) * 1000, 1),
+        'module_ms': round((_module_ready - _startup_began) * 1000, 1),
+        'deferred': {
+            name: None if module._load_ms is None else round(module._load_ms, 1)
+            for name, module in LazyModule.registry.items()
+        }
+    }
+
 app = Flask(__name__)
 app.secret_key = os.environ.get('FLASK_SECRET_KEY', secrets.token_hex(32))
 app.permanent_session_lifetime = timedelta(days=180)
@@ -39,9 +124,91 @@ app.permanent_session_lifetime = timedelta(days=180)
 API_TOKEN = os.environ.get('LINK_POSTER_TOKEN', 'change-this-token-in-production')
 GITHUB_TOKEN = os.environ.get('GITHUB_TOKEN')
 GITHUB_REPO = os.environ.get('GITHUB_REPO', 'your-username/your-repo')
+GITHUB_BRANCH = os.environ.get('GITHUB_BRANCH', 'main')
+GITHUB_API_URL = os.environ.get('GITHUB_API_URL', 'https://api.github.com')
+GITHUB_POOL_SIZE = int(os.environ.get('GITHUB_POOL_SIZE', '4'))
+GITHUB_SECONDS_BETWEEN_WRITES = float(os.environ.get('GITHUB_SECONDS_BETWEEN_WRITES', '0.25'))
+# Worker processes commit independently, so the branch can move more than once mid-publish
+GITHUB_COMMIT_ATTEMPTS = int(os.environ.get('GITHUB_COMMIT_ATTEMPTS', '4'))
+PATH_INDEX_PREFIXES = ('content/links/', 'static/images/')
+PATH_INDEX_REFRESH_SECONDS = int(os.environ.get('PATH_INDEX_REFRESH_SECONDS', '600'))
 MAX_IMAGE_WIDTH = 1200
 JPEG_QUALITY = 85
+IMAGE_MAX_BYTES = int(os.environ.get('IMAGE_MAX_BYTES', str(20 * 1024 * 1024)))
+IMAGE_MAX_PIXELS = int(os.environ.get('IMAGE_MAX_PIXELS', str(40_000_000)))
+# MPO is how Pillow reports multi-picture JPEGs straight from cameras and phones
+IMAGE_ALLOWED_FORMATS = {'JPEG', 'MPO', 'PNG', 'GIF', 'WEBP', 'BMP', 'TIFF'}
+IMAGE_PROBE_BYTES = 64 * 1024  # give up if the header isn't recognised within this much data
+IMAGE_CHUNK_SIZE = 8 * 1024
+IMAGE_REDUCING_GAP = 3.0  # >= 3.0 is indistinguishable from a single LANCZOS pass
+IMAGE_SRCSET_WIDTHS = [int(w) for w in os.environ.get('IMAGE_SRCSET_WIDTHS', '480,800,1200').split(',') if w.strip()]
+IMAGE_DERIVATIVE_FORMATS = [f.strip().lower() for f in os.environ.get('IMAGE_DERIVATIVE_FORMATS', 'webp').split(',') if f.strip()]
+THUMB_WIDTH = 300
+THUMB_QUALITY = 75
+THUMB_MIN_DIMENSION = int(os.environ.get('THUMB_MIN_DIMENSION', '100'))  # smaller candidates are hidden
+THUMB_WORKERS = int(os.environ.get('THUMB_WORKERS', '6'))
+THUMB_CACHE_SIZE = int(os.environ.get('THUMB_CACHE_SIZE', '200'))
+THUMB_MAX_CANDIDATES = 15  # most images a scrape offers the picker, so most /prefetch-thumbs takes
+THUMB_CACHE_TTL = 3600
+THUMB_ERROR_TTL = 30  # a failed download is retried after this, in case it was transient
+THUMB_MAX_BYTES = 10 * 1024 * 1024
+PREPARED_IMAGE_TTL = int(os.environ.get('PREPARED_IMAGE_TTL', '600'))
+PREPARED_IMAGE_CACHE_BYTES = int(os.environ.get('PREPARED_IMAGE_CACHE_BYTES', str(64 * 1024 * 1024)))
+PREPARED_IMAGE_WORKERS = 2
+PREPARED_IMAGE_MAX_PENDING = 8  # queued or running; clicking through candidates beyond this is ignored
+IMAGE_INDEX_DB = os.environ.get('IMAGE_INDEX_DB', 'image_index.db')
+IMAGE_DEDUP_MAX_DISTANCE = int(os.environ.get('IMAGE_DEDUP_MAX_DISTANCE', '4'))  # differing dHash bits
+# Reusing a committed image for another URL also takes the same aspect ratio and a close
+# 256-bit hash: templated social cards can be within IMAGE_DEDUP_MAX_DISTANCE of each other
+IMAGE_DEDUP_MAX_FINE_DISTANCE = int(os.environ.get('IMAGE_DEDUP_MAX_FINE_DISTANCE', '3'))
+IMAGE_DEDUP_ASPECT_TOLERANCE = 0.01  # relative
+IMAGE_DEDUP_MIN_DETAIL = 8  # dHash bits that must differ from a flat image (all 0) or plain gradient (all 1)
+IMAGE_HASH_LENGTH = 16  # hex characters of SHA-256 used in image filenames
+IMAGE_DERIVATIVE_SETTINGS = {
+    'webp': {'pil_format': 'WEBP', 'mime': 'image/webp', 'options': {'quality': 80, 'method': 4}},
+    'avif': {'pil_format': 'AVIF', 'mime': 'image/avif', 'options': {'quality': 60}},
+}
 DEBUG_MODE = os.environ.get('DEBUG_MODE', 'false').lower() == 'true'
+PLAYWRIGHT_POOL_SIZE = int(os.environ.get('PLAYWRIGHT_POOL_SIZE', '2'))
+PLAYWRIGHT_MAX_PAGES_PER_BROWSER = int(os.environ.get('PLAYWRIGHT_MAX_PAGES_PER_BROWSER', '50'))
+PLAYWRIGHT_JOB_TIMEOUT = int(os.environ.get('PLAYWRIGHT_JOB_TIMEOUT', '60'))
+PLAYWRIGHT_QUIET_MS = int(os.environ.get('PLAYWRIGHT_QUIET_MS', '500'))
+PLAYWRIGHT_DEADLINE_MS = int(os.environ.get('PLAYWRIGHT_DEADLINE_MS', '10000'))
+PLAYWRIGHT_MAX_SCROLL_STEPS = int(os.environ.get('PLAYWRIGHT_MAX_SCROLL_STEPS', '10'))
+PLAYWRIGHT_ASYNC_PAGES = int(os.environ.get('PLAYWRIGHT_ASYNC_PAGES', '8'))
+FETCH_MAX_CONNECTIONS = int(os.environ.get('FETCH_MAX_CONNECTIONS', '100'))
+FETCH_TIMEOUT = 10  # per connect/read
+FETCH_DEADLINE = 20  # whole page download
+METADATA_MAX_BYTES = int(os.environ.get('METADATA_MAX_BYTES', str(2 * 1024 * 1024)))
+METADATA_CHUNK_SIZE = 16 * 1024
+METADATA_MAX_IMG_TAGS = 10  # fetch_url_metadata only looks at the first 10 <img> tags
+METADATA_PARSER = os.environ.get('METADATA_PARSER', 'scanner')  # 'scanner' or 'bs4'
+METADATA_CACHE_SIZE = int(os.environ.get('METADATA_CACHE_SIZE', '256'))
+METADATA_CACHE_TTL = int(os.environ.get('METADATA_CACHE_TTL', '3600'))
+METADATA_CACHE_PLAYWRIGHT_TTL = int(os.environ.get('METADATA_CACHE_PLAYWRIGHT_TTL', '21600'))
+METADATA_CACHE_DB = os.environ.get('METADATA_CACHE_DB', '')  # empty = memory only
+TRACKING_PARAM_PREFIXES = ('utm_',)
+TRACKING_PARAMS = {'fbclid', 'gclid', 'dclid', 'msclkid', 'mc_cid', 'mc_eid', 'igshid', '_ga', 'ref_src', 'yclid'}
+ASYNC_PUBLISH = os.environ.get('ASYNC_PUBLISH', 'false').lower() == 'true'
+PUBLISH_QUEUE_DB = os.environ.get('PUBLISH_QUEUE_DB', 'publish_queue.db')
+PUBLISH_WORKERS = int(os.environ.get('PUBLISH_WORKERS', '2'))
+PUBLISH_MAX_ATTEMPTS = int(os.environ.get('PUBLISH_MAX_ATTEMPTS', '3'))
+PUBLISH_RETRY_BASE_SECONDS = float(os.environ.get('PUBLISH_RETRY_BASE_SECONDS', '5'))
+PUBLISH_LANDED_SEARCH_DEPTH = 50  # branch commits searched for a retried job's earlier commit
+BATCH_MAX_ITEMS = int(os.environ.get('BATCH_MAX_ITEMS', '50'))
+BATCH_METADATA_WORKERS = int(os.environ.get('BATCH_METADATA_WORKERS', '8'))  # network-bound
+BATCH_IMAGE_WORKERS = int(os.environ.get('BATCH_IMAGE_WORKERS', '2'))  # CPU-bound decode/resize/encode
+IMPORT_DB = os.environ.get('IMPORT_DB', 'imports.db')
+IMPORT_BATCH_SIZE = int(os.environ.get('IMPORT_BATCH_SIZE', '25'))  # posts per commit
+IMPORT_IN_FLIGHT = int(os.environ.get('IMPORT_IN_FLIGHT', '16'))  # entries fetched/processed at once
+IMPORT_DOMAIN_DELAY = float(os.environ.get('IMPORT_DOMAIN_DELAY', '1'))  # seconds between requests to one host
+IMPORT_READ_CHUNK = 64 * 1024
+IMPORT_SNIFF_BYTES = 4096  # read ahead to recognise an export's format
+LAZY_IMPORTS = os.environ.get('LAZY_IMPORTS', 'true').lower() == 'true'
+ASSET_MAX_AGE = 365 * 24 * 3600  # fingerprinted, so safe to cache "forever"
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+# Seconds; covers everything from a cache lookup to a slow Playwright scrape
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
 
 # HTML Template
 HTML_TEMPLATE = '''
@@ -51,449 +218,9 @@ HTML_TEMPLATE = '''
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>Hugo Link Poster</title>
-    <style>
-        :root {
-            --bg-color: #f5f5f5;
-            --container-bg: white;
-            --text-color: #333;
-            --text-secondary: #555;
-            --text-muted: #666;
-            --border-color: #ddd;
-            --border-light: #e0e0e0;
-            --primary-color: #3498db;
-            --primary-hover: #2980b9;
-            --danger-color: #e74c3c;
-            --danger-hover: #c0392b;
-            --success-bg: #d4edda;
-            --success-color: #155724;
-            --success-border: #c3e6cb;
-            --error-bg: #f8d7da;
-            --error-color: #721c24;
-            --error-border: #f5c6cb;
-            --debug-bg: #fff3cd;
-            --debug-color: #856404;
-            --debug-border: #ffeeba;
-            --debug-output-bg: #f8f9fa;
-            --debug-output-border: #6c757d;
-            --image-bg: #f0f0f0;
-            --shadow: 0 2px 10px rgba(0,0,0,0.1);
-        }
-
-        [data-theme="dark"] {
-            --bg-color: #1a1a1a;
-            --container-bg: #2d2d2d;
-            --text-color: #e0e0e0;
-            --text-secondary: #b0b0b0;
-            --text-muted: #888;
-            --border-color: #404040;
-            --border-light: #555;
-            --primary-color: #4a9eff;
-            --primary-hover: #3d8bdb;
-            --danger-color: #ff6b6b;
-            --danger-hover: #e55a5a;
-            --success-bg: #1e3a2e;
-            --success-color: #4caf50;
-            --success-border: #2e5233;
-            --error-bg: #3d1a1a;
-            --error-color: #f44336;
-            --error-border: #5a2a2a;
-            --debug-bg: #2d2a1a;
-            --debug-color: #ffeb3b;
-            --debug-border: #3d3520;
-            --debug-output-bg: #2a2a2a;
-            --debug-output-border: #555;
-            --image-bg: #3a3a3a;
-            --shadow: 0 2px 10px rgba(0,0,0,0.3);
-        }
-
-        * {
-            box-sizing: border-box;
-        }
-        body {
-            font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, sans-serif;
-            line-height: 1.6;
-            color: var(--text-color);
-            margin: 0;
-            padding: 20px;
-            background-color: var(--bg-color);
-            transition: background-color 0.3s ease, color 0.3s ease;
-        }
-        .container {
-            max-width: 600px;
-            margin: 0 auto;
-            background: var(--container-bg);
-            padding: 20px;
-            border-radius: 10px;
-            box-shadow: var(--shadow);
-            transition: background-color 0.3s ease, box-shadow 0.3s ease;
-            position: relative;
-        }
-        .theme-toggle {
-            position: absolute;
-            top: 20px;
-            right: 20px;
-            background: var(--border-color);
-            border: none;
-            border-radius: 50%;
-            width: 40px;
-            height: 40px;
-            cursor: pointer;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            font-size: 18px;
-            transition: background-color 0.3s ease, transform 0.2s ease;
-            z-index: 10;
-        }
-        .theme-toggle:hover {
-            background: var(--border-light);
-            transform: scale(1.1);
-        }
-        h1 {
-            color: var(--text-color);
-            margin-bottom: 30px;
-            text-align: center;
-            padding-right: 60px;
-            transition: color 0.3s ease;
-        }
-        .form-group {
-            margin-bottom: 20px;
-        }
-        label {
-            display: block;
-            margin-bottom: 5px;
-            font-weight: 600;
-            color: var(--text-secondary);
-            transition: color 0.3s ease;
-        }
-        input[type="text"],
-        input[type="password"],
-        input[type="url"],
-        textarea {
-            width: 100%;
-            padding: 10px;
-            border: 1px solid var(--border-color);
-            border-radius: 5px;
-            font-size: 16px;
-            font-family: inherit;
-            background-color: var(--container-bg);
-            color: var(--text-color);
-            transition: border-color 0.3s ease, background-color 0.3s ease, color 0.3s ease;
-        }
-        input[type="text"]:focus,
-        input[type="password"]:focus,
-        input[type="url"]:focus,
-        textarea:focus {
-            outline: none;
-            border-color: var(--primary-color);
-        }
-        textarea {
-            resize: vertical;
-            min-height: 100px;
-        }
-        button {
-            background-color: var(--primary-color);
-            color: white;
-            padding: 12px 24px;
-            border: none;
-            border-radius: 5px;
-            font-size: 16px;
-            cursor: pointer;
-            width: 100%;
-            margin-top: 10px;
-            transition: background-color 0.3s ease;
-        }
-        button:hover {
-            background-color: var(--primary-hover);
-        }
-        button:disabled {
-            background-color: #95a5a6;
-            cursor: not-allowed;
-        }
-        .alert {
-            padding: 12px;
-            margin-bottom: 20px;
-            border-radius: 5px;
-            transition: background-color 0.3s ease, color 0.3s ease, border-color 0.3s ease;
-        }
-        .alert-success {
-            background-color: var(--success-bg);
-            color: var(--success-color);
-            border: 1px solid var(--success-border);
-        }
-        .alert-error {
-            background-color: var(--error-bg);
-            color: var(--error-color);
-            border: 1px solid var(--error-border);
-        }
-        .alert-warning {
-            background-color: var(--debug-bg);
-            color: var(--debug-color);
-            border: 1px solid var(--debug-border);
-        }
-        .image-selector {
-            margin-top: 20px;
-        }
-        .image-grid {
-            display: grid;
-            grid-template-columns: repeat(auto-fill, minmax(150px, 1fr));
-            gap: 15px;
-            margin-top: 10px;
-        }
-        .image-option {
-            position: relative;
-            cursor: pointer;
-            border: 3px solid transparent;
-            border-radius: 5px;
-            overflow: hidden;
-            background-color: var(--image-bg);
-            transition: background-color 0.3s ease, border-color 0.3s ease;
-        }
-        .image-option img {
-            width: 100%;
-            height: 120px;
-            object-fit: cover;
-            display: block;
-        }
-        .image-option.selected {
-            border-color: var(--primary-color);
-        }
-        .image-option input[type="radio"] {
-            position: absolute;
-            opacity: 0;
-        }
-        .loading {
-            display: none;
-            text-align: center;
-            margin: 20px 0;
-        }
-        .spinner {
-            border: 3px solid var(--border-color);
-            border-top: 3px solid var(--primary-color);
-            border-radius: 50%;
-            width: 40px;
-            height: 40px;
-            animation: spin 1s linear infinite;
-            margin: 0 auto;
-        }
-        @keyframes spin {
-            0% { transform: rotate(0deg); }
-            100% { transform: rotate(360deg); }
-        }
-        .help-text {
-            font-size: 14px;
-            color: var(--text-muted);
-            margin-top: 5px;
-            transition: color 0.3s ease;
-        }
-        #logout {
-            background-color: var(--danger-color);
-            margin-top: 30px;
-        }
-        #logout:hover {
-            background-color: var(--danger-hover);
-        }
-        .debug-output {
-            background-color: var(--debug-output-bg);
-            border: 2px dashed var(--debug-output-border);
-            border-radius: 5px;
-            padding: 20px;
-            margin-top: 20px;
-            font-family: 'Courier New', monospace;
-            white-space: pre-wrap;
-            word-break: break-all;
-            color: var(--text-color);
-            transition: background-color 0.3s ease, border-color 0.3s ease, color 0.3s ease;
-        }
-        .debug-notice {
-            background-color: var(--debug-bg);
-            border: 1px solid var(--debug-border);
-            color: var(--debug-color);
-            padding: 10px;
-            border-radius: 5px;
-            margin-bottom: 20px;
-            text-align: center;
-            transition: background-color 0.3s ease, color 0.3s ease, border-color 0.3s ease;
-        }
-        .modal {
-            display: none;
-            position: fixed;
-            z-index: 1000;
-            left: 0;
-            top: 0;
-            width: 100%;
-            height: 100%;
-            overflow: auto;
-            background-color: rgba(0, 0, 0, 0.7);
-            animation: fadeIn 0.3s ease;
-        }
-        @keyframes fadeIn {
-            from { opacity: 0; }
-            to { opacity: 1; }
-        }
-        @keyframes slideDown {
-            from {
-                opacity: 0;
-                transform: translateY(-20px);
-            }
-            to {
-                opacity: 1;
-                transform: translateY(0);
-            }
-        }
-        .modal-content {
-            background-color: var(--container-bg);
-            margin: 2% auto;
-            padding: 0;
-            border-radius: 10px;
-            width: 90%;
-            max-width: 800px;
-            box-shadow: 0 4px 20px rgba(0,0,0,0.3);
-            max-height: 90vh;
-            overflow: hidden;
-            display: flex;
-            flex-direction: column;
-        }
-        .modal-header {
-            padding: 20px;
-            border-bottom: 1px solid var(--border-color);
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-        }
-        .modal-header h2 {
-            margin: 0;
-            color: var(--text-color);
-        }
-        .modal-close {
-            color: var(--text-muted);
-            font-size: 28px;
-            font-weight: bold;
-            cursor: pointer;
-            background: none;
-            border: none;
-            padding: 0;
-            width: 30px;
-            height: 30px;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            transition: color 0.3s ease;
-        }
-        .modal-close:hover,
-        .modal-close:focus {
-            color: var(--text-color);
-        }
-        .modal-body {
-            padding: 20px;
-            overflow-y: auto;
-            flex: 1;
-        }
-        .preview-post {
-            color: var(--text-color);
-        }
-        .preview-post h1 {
-            font-size: 28px;
-            margin-bottom: 10px;
-            color: var(--text-color);
-        }
-        .preview-meta {
-            color: var(--text-muted);
-            font-size: 14px;
-            margin-bottom: 20px;
-            padding-bottom: 10px;
-            border-bottom: 1px solid var(--border-color);
-        }
-        .preview-meta a {
-            color: var(--primary-color);
-            text-decoration: none;
-        }
-        .preview-meta a:hover {
-            text-decoration: underline;
-        }
-        .preview-image {
-            width: 100%;
-            max-width: 100%;
-            height: auto;
-            border-radius: 5px;
-            margin: 20px 0;
-        }
-        .preview-content {
-            line-height: 1.8;
-            color: var(--text-color);
-        }
-        .preview-excerpt {
-            font-style: italic;
-            color: var(--text-secondary);
-            padding: 15px;
-            background: var(--image-bg);
-            border-left: 3px solid var(--primary-color);
-            margin: 15px 0;
-            border-radius: 3px;
-        }
-        .youtube-embed {
-            position: relative;
-            padding-bottom: 56.25%;
-            height: 0;
-            overflow: hidden;
-            margin: 20px 0;
-            border-radius: 5px;
-        }
-        .youtube-embed iframe {
-            position: absolute;
-            top: 0;
-            left: 0;
-            width: 100%;
-            height: 100%;
-            border: 0;
-        }
-        .button-group {
-            display: flex;
-            gap: 10px;
-            margin-top: 10px;
-        }
-        .button-group button {
-            flex: 1;
-        }
-        .button-secondary {
-            background-color: var(--text-muted);
-        }
-        .button-secondary:hover {
-            background-color: var(--text-secondary);
-        }
-        .success-notification {
-            position: fixed;
-            top: 20px;
-            left: 50%;
-            transform: translateX(-50%);
-            background-color: var(--success-bg);
-            color: var(--success-color);
-            border: 2px solid var(--success-border);
-            padding: 20px 30px;
-            border-radius: 10px;
-            box-shadow: 0 4px 20px rgba(0,0,0,0.3);
-            z-index: 2000;
-            min-width: 400px;
-            text-align: center;
-            animation: slideDown 0.5s ease;
-            font-size: 16px;
-        }
-        .success-notification strong {
-            display: block;
-            margin-bottom: 10px;
-            font-size: 18px;
-        }
-        .success-notification a {
-            color: var(--success-color);
-            text-decoration: underline;
-            font-weight: 600;
-        }
-        .success-notification a:hover {
-            opacity: 0.8;
-        }
-    </style>
+    <link rel="stylesheet" href="{{ assets['app.css'] }}">
 </head>
-<body>
+<body data-async-publish="{{ 'true' if async_publish else 'false' }}">
     <div class="container">
         <button class="theme-toggle" id="themeToggle" title="Toggle dark mode">
             <span id="themeIcon">🌙</span>
@@ -563,6 +290,22 @@ HTML_TEMPLATE = '''
             </div>
         </form>
         
+        <details class="bulk-panel">
+            <summary>Bulk paste</summary>
+            <form id="bulkForm">
+                <div class="form-group">
+                    <label for="bulkLinks">Links</label>
+                    <textarea id="bulkLinks" name="bulkLinks" rows="8" required placeholder="https://example.com/article&#10;https://example.com/other Optional title"></textarea>
+                    <p class="help-text">One link per line, optionally followed by a title. Titles and sources come from each page; all posts go into a single commit.</p>
+                </div>
+                <div class="form-group">
+                    <label class="checkbox-label"><input type="checkbox" id="bulkImages" checked> Use each page's featured image</label>
+                </div>
+                <button type="submit" id="bulkSubmit">Create Posts</button>
+            </form>
+            <ul class="bulk-results" id="bulkResults"></ul>
+        </details>
+        
         <button id="logout">Logout</button>
         {% endif %}
     </div>
@@ -580,358 +323,1060 @@ HTML_TEMPLATE = '''
         </div>
     </div>
 
-    <script>
-        // Theme switching functionality
-        function initTheme() {
-            const savedTheme = localStorage.getItem('theme') || 'dark';
-            const themeToggle = document.getElementById('themeToggle');
-            const themeIcon = document.getElementById('themeIcon');
-            
-            // Apply saved theme
-            document.documentElement.setAttribute('data-theme', savedTheme);
-            updateThemeIcon(savedTheme, themeIcon);
-            
-            // Theme toggle event listener
-            themeToggle.addEventListener('click', () => {
-                const currentTheme = document.documentElement.getAttribute('data-theme');
-                const newTheme = currentTheme === 'dark' ? 'light' : 'dark';
-                
-                document.documentElement.setAttribute('data-theme', newTheme);
-                localStorage.setItem('theme', newTheme);
-                updateThemeIcon(newTheme, themeIcon);
-            });
-        }
-        
-        function updateThemeIcon(theme, iconElement) {
-            iconElement.textContent = theme === 'dark' ? '☀️' : '🌙';
-        }
-        
-        // Initialize theme on page load
-        document.addEventListener('DOMContentLoaded', initTheme);
+    <script src="{{ assets['theme.js'] }}"></script>
+    {% if not authenticated %}
+    <script src="{{ assets['login.js'] }}"></script>
+    {% else %}
+    <script src="{{ assets['editor.js'] }}"></script>
+    {% endif %}
+</body>
+</html>
+'''
+
+# Served as fingerprinted, long-cached files from /assets/ (see build_static_assets)
+APP_CSS = '''
+:root {
+    --bg-color: #f5f5f5;
+    --container-bg: white;
+    --text-color: #333;
+    --text-secondary: #555;
+    --text-muted: #666;
+    --border-color: #ddd;
+    --border-light: #e0e0e0;
+    --primary-color: #3498db;
+    --primary-hover: #2980b9;
+    --danger-color: #e74c3c;
+    --danger-hover: #c0392b;
+    --success-bg: #d4edda;
+    --success-color: #155724;
+    --success-border: #c3e6cb;
+    --error-bg: #f8d7da;
+    --error-color: #721c24;
+    --error-border: #f5c6cb;
+    --debug-bg: #fff3cd;
+    --debug-color: #856404;
+    --debug-border: #ffeeba;
+    --debug-output-bg: #f8f9fa;
+    --debug-output-border: #6c757d;
+    --image-bg: #f0f0f0;
+    --shadow: 0 2px 10px rgba(0,0,0,0.1);
+}
+
+[data-theme="dark"] {
+    --bg-color: #1a1a1a;
+    --container-bg: #2d2d2d;
+    --text-color: #e0e0e0;
+    --text-secondary: #b0b0b0;
+    --text-muted: #888;
+    --border-color: #404040;
+    --border-light: #555;
+    --primary-color: #4a9eff;
+    --primary-hover: #3d8bdb;
+    --danger-color: #ff6b6b;
+    --danger-hover: #e55a5a;
+    --success-bg: #1e3a2e;
+    --success-color: #4caf50;
+    --success-border: #2e5233;
+    --error-bg: #3d1a1a;
+    --error-color: #f44336;
+    --error-border: #5a2a2a;
+    --debug-bg: #2d2a1a;
+    --debug-color: #ffeb3b;
+    --debug-border: #3d3520;
+    --debug-output-bg: #2a2a2a;
+    --debug-output-border: #555;
+    --image-bg: #3a3a3a;
+    --shadow: 0 2px 10px rgba(0,0,0,0.3);
+}
+
+* {
+    box-sizing: border-box;
+}
+body {
+    font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, sans-serif;
+    line-height: 1.6;
+    color: var(--text-color);
+    margin: 0;
+    padding: 20px;
+    background-color: var(--bg-color);
+    transition: background-color 0.3s ease, color 0.3s ease;
+}
+.container {
+    max-width: 600px;
+    margin: 0 auto;
+    background: var(--container-bg);
+    padding: 20px;
+    border-radius: 10px;
+    box-shadow: var(--shadow);
+    transition: background-color 0.3s ease, box-shadow 0.3s ease;
+    position: relative;
+}
+.theme-toggle {
+    position: absolute;
+    top: 20px;
+    right: 20px;
+    background: var(--border-color);
+    border: none;
+    border-radius: 50%;
+    width: 40px;
+    height: 40px;
+    cursor: pointer;
+    display: flex;
+    align-items: center;
+    justify-content: center;
+    font-size: 18px;
+    transition: background-color 0.3s ease, transform 0.2s ease;
+    z-index: 10;
+}
+.theme-toggle:hover {
+    background: var(--border-light);
+    transform: scale(1.1);
+}
+h1 {
+    color: var(--text-color);
+    margin-bottom: 30px;
+    text-align: center;
+    padding-right: 60px;
+    transition: color 0.3s ease;
+}
+.form-group {
+    margin-bottom: 20px;
+}
+label {
+    display: block;
+    margin-bottom: 5px;
+    font-weight: 600;
+    color: var(--text-secondary);
+    transition: color 0.3s ease;
+}
+input[type="text"],
+input[type="password"],
+input[type="url"],
+textarea {
+    width: 100%;
+    padding: 10px;
+    border: 1px solid var(--border-color);
+    border-radius: 5px;
+    font-size: 16px;
+    font-family: inherit;
+    background-color: var(--container-bg);
+    color: var(--text-color);
+    transition: border-color 0.3s ease, background-color 0.3s ease, color 0.3s ease;
+}
+input[type="text"]:focus,
+input[type="password"]:focus,
+input[type="url"]:focus,
+textarea:focus {
+    outline: none;
+    border-color: var(--primary-color);
+}
+textarea {
+    resize: vertical;
+    min-height: 100px;
+}
+button {
+    background-color: var(--primary-color);
+    color: white;
+    padding: 12px 24px;
+    border: none;
+    border-radius: 5px;
+    font-size: 16px;
+    cursor: pointer;
+    width: 100%;
+    margin-top: 10px;
+    transition: background-color 0.3s ease;
+}
+button:hover {
+    background-color: var(--primary-hover);
+}
+button:disabled {
+    background-color: #95a5a6;
+    cursor: not-allowed;
+}
+.alert {
+    padding: 12px;
+    margin-bottom: 20px;
+    border-radius: 5px;
+    transition: background-color 0.3s ease, color 0.3s ease, border-color 0.3s ease;
+}
+.alert-success {
+    background-color: var(--success-bg);
+    color: var(--success-color);
+    border: 1px solid var(--success-border);
+}
+.alert-error {
+    background-color: var(--error-bg);
+    color: var(--error-color);
+    border: 1px solid var(--error-border);
+}
+.alert-warning {
+    background-color: var(--debug-bg);
+    color: var(--debug-color);
+    border: 1px solid var(--debug-border);
+}
+.image-selector {
+    margin-top: 20px;
+}
+.image-grid {
+    display: grid;
+    grid-template-columns: repeat(auto-fill, minmax(150px, 1fr));
+    gap: 15px;
+    margin-top: 10px;
+}
+.image-option {
+    position: relative;
+    cursor: pointer;
+    border: 3px solid transparent;
+    border-radius: 5px;
+    overflow: hidden;
+    background-color: var(--image-bg);
+    transition: background-color 0.3s ease, border-color 0.3s ease;
+}
+.image-option img {
+    width: 100%;
+    height: 120px;
+    object-fit: cover;
+    display: block;
+}
+.image-option .image-size {
+    position: absolute;
+    right: 4px;
+    bottom: 4px;
+    padding: 0 4px;
+    font-size: 11px;
+    color: white;
+    background: rgba(0, 0, 0, 0.6);
+    border-radius: 3px;
+}
+.image-option.selected {
+    border-color: var(--primary-color);
+}
+.image-option input[type="radio"] {
+    position: absolute;
+    opacity: 0;
+}
+.loading {
+    display: none;
+    text-align: center;
+    margin: 20px 0;
+}
+.spinner {
+    border: 3px solid var(--border-color);
+    border-top: 3px solid var(--primary-color);
+    border-radius: 50%;
+    width: 40px;
+    height: 40px;
+    animation: spin 1s linear infinite;
+    margin: 0 auto;
+}
+@keyframes spin {
+    0% { transform: rotate(0deg); }
+    100% { transform: rotate(360deg); }
+}
+.help-text {
+    font-size: 14px;
+    color: var(--text-muted);
+    margin-top: 5px;
+    transition: color 0.3s ease;
+}
+#logout {
+    background-color: var(--danger-color);
+    margin-top: 30px;
+}
+#logout:hover {
+    background-color: var(--danger-hover);
+}
+.debug-output {
+    background-color: var(--debug-output-bg);
+    border: 2px dashed var(--debug-output-border);
+    border-radius: 5px;
+    padding: 20px;
+    margin-top: 20px;
+    font-family: 'Courier New', monospace;
+    white-space: pre-wrap;
+    word-break: break-all;
+    color: var(--text-color);
+    transition: background-color 0.3s ease, border-color 0.3s ease, color 0.3s ease;
+}
+.debug-notice {
+    background-color: var(--debug-bg);
+    border: 1px solid var(--debug-border);
+    color: var(--debug-color);
+    padding: 10px;
+    border-radius: 5px;
+    margin-bottom: 20px;
+    text-align: center;
+    transition: background-color 0.3s ease, color 0.3s ease, border-color 0.3s ease;
+}
+.modal {
+    display: none;
+    position: fixed;
+    z-index: 1000;
+    left: 0;
+    top: 0;
+    width: 100%;
+    height: 100%;
+    overflow: auto;
+    background-color: rgba(0, 0, 0, 0.7);
+    animation: fadeIn 0.3s ease;
+}
+@keyframes fadeIn {
+    from { opacity: 0; }
+    to { opacity: 1; }
+}
+@keyframes slideDown {
+    from {
+        opacity: 0;
+        transform: translateY(-20px);
+    }
+    to {
+        opacity: 1;
+        transform: translateY(0);
+    }
+}
+.modal-content {
+    background-color: var(--container-bg);
+    margin: 2% auto;
+    padding: 0;
+    border-radius: 10px;
+    width: 90%;
+    max-width: 800px;
+    box-shadow: 0 4px 20px rgba(0,0,0,0.3);
+    max-height: 90vh;
+    overflow: hidden;
+    display: flex;
+    flex-direction: column;
+}
+.modal-header {
+    padding: 20px;
+    border-bottom: 1px solid var(--border-color);
+    display: flex;
+    justify-content: space-between;
+    align-items: center;
+}
+.modal-header h2 {
+    margin: 0;
+    color: var(--text-color);
+}
+.modal-close {
+    color: var(--text-muted);
+    font-size: 28px;
+    font-weight: bold;
+    cursor: pointer;
+    background: none;
+    border: none;
+    padding: 0;
+    width: 30px;
+    height: 30px;
+    display: flex;
+    align-items: center;
+    justify-content: center;
+    transition: color 0.3s ease;
+}
+.modal-close:hover,
+.modal-close:focus {
+    color: var(--text-color);
+}
+.modal-body {
+    padding: 20px;
+    overflow-y: auto;
+    flex: 1;
+}
+.preview-post {
+    color: var(--text-color);
+}
+.preview-post h1 {
+    font-size: 28px;
+    margin-bottom: 10px;
+    color: var(--text-color);
+}
+.preview-meta {
+    color: var(--text-muted);
+    font-size: 14px;
+    margin-bottom: 20px;
+    padding-bottom: 10px;
+    border-bottom: 1px solid var(--border-color);
+}
+.preview-meta a {
+    color: var(--primary-color);
+    text-decoration: none;
+}
+.preview-meta a:hover {
+    text-decoration: underline;
+}
+.preview-image {
+    width: 100%;
+    max-width: 100%;
+    height: auto;
+    border-radius: 5px;
+    margin: 20px 0;
+}
+.preview-content {
+    line-height: 1.8;
+    color: var(--text-color);
+}
+.preview-excerpt {
+    font-style: italic;
+    color: var(--text-secondary);
+    padding: 15px;
+    background: var(--image-bg);
+    border-left: 3px solid var(--primary-color);
+    margin: 15px 0;
+    border-radius: 3px;
+}
+.youtube-embed {
+    position: relative;
+    padding-bottom: 56.25%;
+    height: 0;
+    overflow: hidden;
+    margin: 20px 0;
+    border-radius: 5px;
+}
+.youtube-embed iframe {
+    position: absolute;
+    top: 0;
+    left: 0;
+    width: 100%;
+    height: 100%;
+    border: 0;
+}
+.button-group {
+    display: flex;
+    gap: 10px;
+    margin-top: 10px;
+}
+.button-group button {
+    flex: 1;
+}
+.bulk-panel {
+    margin-top: 30px;
+    border-top: 1px solid var(--border-color);
+    padding-top: 15px;
+}
+.bulk-panel summary {
+    cursor: pointer;
+    font-weight: 600;
+    color: var(--text-secondary);
+    margin-bottom: 15px;
+}
+.checkbox-label {
+    font-weight: normal;
+}
+.bulk-results {
+    list-style: none;
+    padding: 0;
+    margin: 20px 0 0;
+}
+.bulk-results li {
+    padding: 8px 12px;
+    margin-bottom: 6px;
+    border-radius: 5px;
+    word-break: break-word;
+}
+.bulk-results li.ok {
+    background-color: var(--success-bg);
+    color: var(--success-color);
+}
+.bulk-results li.failed {
+    background-color: var(--error-bg);
+    color: var(--error-color);
+}
+.bulk-results li small {
+    display: block;
+    opacity: 0.8;
+}
+.button-secondary {
+    background-color: var(--text-muted);
+}
+.button-secondary:hover {
+    background-color: var(--text-secondary);
+}
+.success-notification {
+    position: fixed;
+    top: 20px;
+    left: 50%;
+    transform: translateX(-50%);
+    background-color: var(--success-bg);
+    color: var(--success-color);
+    border: 2px solid var(--success-border);
+    padding: 20px 30px;
+    border-radius: 10px;
+    box-shadow: 0 4px 20px rgba(0,0,0,0.3);
+    z-index: 2000;
+    min-width: 400px;
+    text-align: center;
+    animation: slideDown 0.5s ease;
+    font-size: 16px;
+}
+.success-notification strong {
+    display: block;
+    margin-bottom: 10px;
+    font-size: 18px;
+}
+.success-notification a {
+    color: var(--success-color);
+    text-decoration: underline;
+    font-weight: 600;
+}
+.success-notification a:hover {
+    opacity: 0.8;
+}
+'''
+
+# Dark/light theme toggle, shared by the login and editor pages
+THEME_JS = '''
+// Theme switching functionality
+function initTheme() {
+    const savedTheme = localStorage.getItem('theme') || 'dark';
+    const themeToggle = document.getElementById('themeToggle');
+    const themeIcon = document.getElementById('themeIcon');
+    
+    // Apply saved theme
+    document.documentElement.setAttribute('data-theme', savedTheme);
+    updateThemeIcon(savedTheme, themeIcon);
+    
+    // Theme toggle event listener
+    themeToggle.addEventListener('click', () => {
+        const currentTheme = document.documentElement.getAttribute('data-theme');
+        const newTheme = currentTheme === 'dark' ? 'light' : 'dark';
         
-        {% if not authenticated %}
-        document.getElementById('loginForm').addEventListener('submit', async (e) => {
-            e.preventDefault();
-            const token = document.getElementById('token').value;
-            
-            try {
-                const response = await fetch('/login', {
-                    method: 'POST',
-                    headers: {'Content-Type': 'application/json'},
-                    body: JSON.stringify({token})
-                });
-                
-                if (response.ok) {
-                    window.location.reload();
-                } else {
-                    alert('Invalid token');
-                }
-            } catch (error) {
-                alert('Login failed: ' + error.message);
-            }
+        document.documentElement.setAttribute('data-theme', newTheme);
+        localStorage.setItem('theme', newTheme);
+        updateThemeIcon(newTheme, themeIcon);
+    });
+}
+
+function updateThemeIcon(theme, iconElement) {
+    iconElement.textContent = theme === 'dark' ? '☀️' : '🌙';
+}
+
+// Initialize theme on page load
+document.addEventListener('DOMContentLoaded', initTheme);
+'''
+
+LOGIN_JS = '''
+document.getElementById('loginForm').addEventListener('submit', async (e) => {
+    e.preventDefault();
+    const token = document.getElementById('token').value;
+    
+    try {
+        const response = await fetch('/login', {
+            method: 'POST',
+            headers: {'Content-Type': 'application/json'},
+            body: JSON.stringify({token})
         });
-        {% else %}
-        function showAlert(message, type = 'success') {
-            const alertDiv = document.createElement('div');
-            alertDiv.className = `alert alert-${type}`;
-            alertDiv.textContent = message;
-            document.getElementById('alerts').appendChild(alertDiv);
-            setTimeout(() => alertDiv.remove(), 5000);
+        
+        if (response.ok) {
+            window.location.reload();
+        } else {
+            alert('Invalid token');
         }
+    } catch (error) {
+        alert('Login failed: ' + error.message);
+    }
+});
+'''
 
-        function showSuccessNotification(message, githubUrl = null) {
-            const notification = document.createElement('div');
-            notification.className = 'success-notification';
+EDITOR_JS = '''
+function showAlert(message, type = 'success') {
+    const alertDiv = document.createElement('div');
+    alertDiv.className = `alert alert-${type}`;
+    alertDiv.textContent = message;
+    document.getElementById('alerts').appendChild(alertDiv);
+    setTimeout(() => alertDiv.remove(), 5000);
+}
 
-            let content = `<strong>✓ ${message}</strong>`;
-            if (githubUrl) {
-                content += `<a href="${githubUrl}" target="_blank">View file on GitHub →</a>`;
-            }
-            notification.innerHTML = content;
+function showSuccessNotification(message, githubUrl = null) {
+    const notification = document.createElement('div');
+    notification.className = 'success-notification';
 
-            document.body.appendChild(notification);
+    let content = `<strong>✓ ${message}</strong>`;
+    if (githubUrl) {
+        content += `<a href="${githubUrl}" target="_blank">View file on GitHub →</a>`;
+    }
+    notification.innerHTML = content;
 
-            // Scroll to top to make it visible
-            window.scrollTo({ top: 0, behavior: 'smooth' });
+    document.body.appendChild(notification);
 
-            // Remove after 10 seconds
-            setTimeout(() => {
-                notification.style.opacity = '0';
-                setTimeout(() => notification.remove(), 300);
-            }, 10000);
-        }
+    // Scroll to top to make it visible
+    window.scrollTo({ top: 0, behavior: 'smooth' });
 
-        function extractYouTubeId(url) {
-            const patterns = [
-                /(?:https?:\/\/)?(?:www\.)?youtube\.com\/watch\?v=([a-zA-Z0-9_-]{11})/,
-                /(?:https?:\/\/)?(?:www\.)?youtube\.com\/embed\/([a-zA-Z0-9_-]{11})/,
-                /(?:https?:\/\/)?youtu\.be\/([a-zA-Z0-9_-]{11})/,
-                /(?:https?:\/\/)?(?:www\.)?youtube\.com\/v\/([a-zA-Z0-9_-]{11})/,
-                /(?:https?:\/\/)?(?:www\.)?youtube\.com\/shorts\/([a-zA-Z0-9_-]{11})/
-            ];
-
-            for (const pattern of patterns) {
-                const match = url.match(pattern);
-                if (match) return match[1];
-            }
-            return null;
-        }
+    // Remove after 10 seconds
+    setTimeout(() => {
+        notification.style.opacity = '0';
+        setTimeout(() => notification.remove(), 300);
+    }, 10000);
+}
 
-        function generatePreview() {
-            const url = document.getElementById('url').value;
-            const title = document.getElementById('title').value;
-            const source = document.getElementById('source').value;
-            const excerpt = document.getElementById('excerpt').value;
-            const content = document.getElementById('content').value;
-            const selectedImage = document.querySelector('input[name="selectedImage"]:checked')?.value;
-
-            if (!url || !title) {
-                showAlert('Please enter at least a URL and title to preview', 'error');
-                return;
-            }
+function extractYouTubeId(url) {
+    const patterns = [
+        /(?:https?:\/\/)?(?:www\.)?youtube\.com\/watch\?v=([a-zA-Z0-9_-]{11})/,
+        /(?:https?:\/\/)?(?:www\.)?youtube\.com\/embed\/([a-zA-Z0-9_-]{11})/,
+        /(?:https?:\/\/)?youtu\.be\/([a-zA-Z0-9_-]{11})/,
+        /(?:https?:\/\/)?(?:www\.)?youtube\.com\/v\/([a-zA-Z0-9_-]{11})/,
+        /(?:https?:\/\/)?(?:www\.)?youtube\.com\/shorts\/([a-zA-Z0-9_-]{11})/
+    ];
 
-            // Generate preview HTML
-            let previewHTML = `<h1>${escapeHtml(title)}</h1>`;
-
-            // Add metadata
-            const now = new Date();
-            const dateStr = now.toLocaleDateString('en-US', {
-                year: 'numeric',
-                month: 'long',
-                day: 'numeric'
-            });
-            previewHTML += `<div class="preview-meta">`;
-            previewHTML += `Posted on ${dateStr} | `;
-            previewHTML += `<a href="${escapeHtml(url)}" target="_blank">${source || new URL(url).hostname.replace(/^www\\./, '')}</a>`;
-            previewHTML += `</div>`;
-
-            // Check if it's a YouTube video
-            const youtubeId = extractYouTubeId(url);
-            if (youtubeId) {
-                previewHTML += `<div class="youtube-embed">`;
-                previewHTML += `<iframe src="https://www.youtube.com/embed/${youtubeId}" allowfullscreen></iframe>`;
-                previewHTML += `</div>`;
-            }
+    for (const pattern of patterns) {
+        const match = url.match(pattern);
+        if (match) return match[1];
+    }
+    return null;
+}
 
-            // Add featured image if selected
-            if (selectedImage) {
-                previewHTML += `<img src="${escapeHtml(selectedImage)}" alt="Featured image" class="preview-image">`;
-            }
+function generatePreview() {
+    const url = document.getElementById('url').value;
+    const title = document.getElementById('title').value;
+    const source = document.getElementById('source').value;
+    const excerpt = document.getElementById('excerpt').value;
+    const content = document.getElementById('content').value;
+    const selectedImage = document.querySelector('input[name="selectedImage"]:checked')?.value;
 
-            // Add excerpt if provided
-            if (excerpt) {
-                previewHTML += `<div class="preview-excerpt">${escapeHtml(excerpt)}</div>`;
-            }
+    if (!url || !title) {
+        showAlert('Please enter at least a URL and title to preview', 'error');
+        return;
+    }
 
-            // Add content if provided
-            if (content) {
-                previewHTML += `<div class="preview-content">${escapeHtml(content).replace(/\\n/g, '<br>')}</div>`;
-            }
+    // Generate preview HTML
+    let previewHTML = `<h1>${escapeHtml(title)}</h1>`;
 
-            // Display in modal
-            document.getElementById('previewContent').innerHTML = previewHTML;
-            document.getElementById('previewModal').style.display = 'block';
-        }
+    // Add metadata
+    const now = new Date();
+    const dateStr = now.toLocaleDateString('en-US', {
+        year: 'numeric',
+        month: 'long',
+        day: 'numeric'
+    });
+    previewHTML += `<div class="preview-meta">`;
+    previewHTML += `Posted on ${dateStr} | `;
+    previewHTML += `<a href="${escapeHtml(url)}" target="_blank">${source || new URL(url).hostname.replace(/^www\\./, '')}</a>`;
+    previewHTML += `</div>`;
 
-        function escapeHtml(text) {
-            const div = document.createElement('div');
-            div.textContent = text;
-            return div.innerHTML;
-        }
+    // Check if it's a YouTube video
+    const youtubeId = extractYouTubeId(url);
+    if (youtubeId) {
+        previewHTML += `<div class="youtube-embed">`;
+        previewHTML += `<iframe src="https://www.youtube.com/embed/${youtubeId}" allowfullscreen></iframe>`;
+        previewHTML += `</div>`;
+    }
 
-        // Preview modal functionality
-        document.getElementById('previewButton')?.addEventListener('click', generatePreview);
+    // Add featured image if selected
+    if (selectedImage) {
+        previewHTML += `<img src="${escapeHtml(selectedImage)}" alt="Featured image" class="preview-image">`;
+    }
 
-        document.getElementById('closeModal')?.addEventListener('click', () => {
-            document.getElementById('previewModal').style.display = 'none';
-        });
+    // Add excerpt if provided
+    if (excerpt) {
+        previewHTML += `<div class="preview-excerpt">${escapeHtml(excerpt)}</div>`;
+    }
 
-        // Close modal when clicking outside
-        window.addEventListener('click', (event) => {
-            const modal = document.getElementById('previewModal');
-            if (event.target === modal) {
-                modal.style.display = 'none';
-            }
-        });
+    // Add content if provided
+    if (content) {
+        previewHTML += `<div class="preview-content">${escapeHtml(content).replace(/\\n/g, '<br>')}</div>`;
+    }
 
-        // Close modal with Escape key
-        document.addEventListener('keydown', (event) => {
-            if (event.key === 'Escape') {
-                document.getElementById('previewModal').style.display = 'none';
-            }
+    // Display in modal
+    document.getElementById('previewContent').innerHTML = previewHTML;
+    document.getElementById('previewModal').style.display = 'block';
+}
+
+function escapeHtml(text) {
+    const div = document.createElement('div');
+    div.textContent = text;
+    return div.innerHTML;
+}
+
+// Preview modal functionality
+document.getElementById('previewButton')?.addEventListener('click', generatePreview);
+
+document.getElementById('closeModal')?.addEventListener('click', () => {
+    document.getElementById('previewModal').style.display = 'none';
+});
+
+// Close modal when clicking outside
+window.addEventListener('click', (event) => {
+    const modal = document.getElementById('previewModal');
+    if (event.target === modal) {
+        modal.style.display = 'none';
+    }
+});
+
+// Close modal with Escape key
+document.addEventListener('keydown', (event) => {
+    if (event.key === 'Escape') {
+        document.getElementById('previewModal').style.display = 'none';
+    }
+});
+
+document.getElementById('fetchMetadata').addEventListener('click', async () => {
+    const url = document.getElementById('url').value;
+    if (!url) {
+        showAlert('Please enter a URL first', 'error');
+        return;
+    }
+    
+    document.getElementById('loading').style.display = 'block';
+    
+    try {
+        const response = await fetch('/fetch-metadata', {
+            method: 'POST',
+            headers: {'Content-Type': 'application/json'},
+            body: JSON.stringify({url})
         });
         
-        document.getElementById('fetchMetadata').addEventListener('click', async () => {
-            const url = document.getElementById('url').value;
-            if (!url) {
-                showAlert('Please enter a URL first', 'error');
-                return;
+        const data = await response.json();
+        
+        if (data.error) {
+            showAlert(data.error, 'error');
+        } else {
+            if (data.title) {
+                document.getElementById('title').value = data.title;
+            }
+            if (data.source && !document.getElementById('source').value) {
+                document.getElementById('source').value = data.source;
             }
             
-            document.getElementById('loading').style.display = 'block';
-            
-            try {
-                const response = await fetch('/fetch-metadata', {
-                    method: 'POST',
-                    headers: {'Content-Type': 'application/json'},
-                    body: JSON.stringify({url})
-                });
-                
-                const data = await response.json();
-                
-                if (data.error) {
-                    showAlert(data.error, 'error');
-                } else {
-                    if (data.title) {
-                        document.getElementById('title').value = data.title;
-                    }
-                    if (data.source && !document.getElementById('source').value) {
-                        document.getElementById('source').value = data.source;
-                    }
-                    
-                    // Display images if found
-                    if (data.images && data.images.length > 0) {
-                        displayImages(data.images);
-                        showAlert('Metadata fetched successfully!');
-                    } else {
-                        showAlert('Metadata fetched, but no images found. Try "Load More Images" for dynamic content.', 'warning');
-                    }
-                }
-            } catch (error) {
-                showAlert('Failed to fetch metadata: ' + error.message, 'error');
-            } finally {
-                document.getElementById('loading').style.display = 'none';
+            // Display images if found
+            if (data.images && data.images.length > 0) {
+                await displayImages(data.images);
+                showAlert('Metadata fetched successfully!');
+            } else {
+                showAlert('Metadata fetched, but no images found. Try "Load More Images" for dynamic content.', 'warning');
             }
+        }
+    } catch (error) {
+        showAlert('Failed to fetch metadata: ' + error.message, 'error');
+    } finally {
+        document.getElementById('loading').style.display = 'none';
+    }
+});
+
+document.getElementById('loadMoreImages').addEventListener('click', async () => {
+    const url = document.getElementById('url').value;
+    if (!url) {
+        showAlert('Please enter a URL first', 'error');
+        return;
+    }
+    
+    document.getElementById('loading').style.display = 'block';
+    document.getElementById('loadMoreImages').disabled = true;
+    document.getElementById('loadMoreImages').textContent = 'Loading...';
+    
+    try {
+        const response = await fetch('/fetch-metadata-playwright', {
+            method: 'POST',
+            headers: {'Content-Type': 'application/json'},
+            body: JSON.stringify({url})
         });
         
-        document.getElementById('loadMoreImages').addEventListener('click', async () => {
-            const url = document.getElementById('url').value;
-            if (!url) {
-                showAlert('Please enter a URL first', 'error');
-                return;
-            }
-            
-            document.getElementById('loading').style.display = 'block';
-            document.getElementById('loadMoreImages').disabled = true;
-            document.getElementById('loadMoreImages').textContent = 'Loading...';
-            
-            try {
-                const response = await fetch('/fetch-metadata-playwright', {
-                    method: 'POST',
-                    headers: {'Content-Type': 'application/json'},
-                    body: JSON.stringify({url})
-                });
-                
-                const data = await response.json();
-                
-                if (data.error) {
-                    showAlert(data.error, 'error');
-                } else {
-                    if (data.images && data.images.length > 0) {
-                        displayImages(data.images);
-                        showAlert(`Found ${data.images.length} images using deep scraping!`);
-                    } else {
-                        showAlert('No additional images found even with deep scraping.', 'warning');
-                    }
-                }
-            } catch (error) {
-                showAlert('Failed to load more images: ' + error.message, 'error');
-            } finally {
-                document.getElementById('loading').style.display = 'none';
-                document.getElementById('loadMoreImages').disabled = false;
-                document.getElementById('loadMoreImages').textContent = 'Load More Images';
+        const data = await response.json();
+        
+        if (data.error) {
+            showAlert(data.error, 'error');
+        } else {
+            if (data.images && data.images.length > 0) {
+                await displayImages(data.images);
+                showAlert(`Found ${data.images.length} images using deep scraping!`);
+            } else {
+                showAlert('No additional images found even with deep scraping.', 'warning');
             }
+        }
+    } catch (error) {
+        showAlert('Failed to load more images: ' + error.message, 'error');
+    } finally {
+        document.getElementById('loading').style.display = 'none';
+        document.getElementById('loadMoreImages').disabled = false;
+        document.getElementById('loadMoreImages').textContent = 'Load More Images';
+    }
+});
+
+async function prefetchThumbnails(images) {
+    // Server fetches every candidate in parallel and returns small cached thumbnails
+    try {
+        const response = await fetch('/prefetch-thumbs', {
+            method: 'POST',
+            headers: {'Content-Type': 'application/json'},
+            body: JSON.stringify({images, referer: document.getElementById('url').value})
+        });
+        const data = await response.json();
+        if (data.images) {
+            return data.images;
+        }
+    } catch (error) {
+        // Fall through to the original URLs
+    }
+    return images.map(url => ({url, ok: true, thumb_url: url}));
+}
+
+async function displayImages(images) {
+    const imageGrid = document.getElementById('imageGrid');
+    imageGrid.innerHTML = '';
+    
+    // Drop broken and tiny candidates before they're shown
+    const candidates = (await prefetchThumbnails(images)).filter(candidate => candidate.ok);
+    
+    candidates.forEach((candidate, index) => {
+        const img = candidate.url;
+        const size = candidate.width ? `${candidate.width}×${candidate.height}` : '';
+        const div = document.createElement('div');
+        div.className = 'image-option';
+        div.innerHTML = `
+            <input type="radio" name="selectedImage" value="${img}" id="img${index}">
+            <label for="img${index}">
+                <img src="${candidate.thumb_url}" alt="Option ${index + 1}" loading="lazy">
+                ${size ? `<span class="image-size">${size}</span>` : ''}
+            </label>
+        `;
+        div.addEventListener('click', () => {
+            document.querySelectorAll('.image-option').forEach(el => el.classList.remove('selected'));
+            div.classList.add('selected');
+            div.querySelector('input').checked = true;
+            // Let the server start processing the image before "Create Post" is pressed
+            fetch('/prepare-image', {
+                method: 'POST',
+                headers: {'Content-Type': 'application/json'},
+                body: JSON.stringify({image: img})
+            }).catch(() => {});
+        });
+        imageGrid.appendChild(div);
+    });
+    
+    document.getElementById('imageSelector').style.display = 'block';
+    document.getElementById('loadMoreImages').style.display = 'inline-block';
+}
+
+const JOB_STAGE_LABELS = {
+    queued: 'Queued...',
+    starting: 'Starting...',
+    processing_image: 'Processing image...',
+    committing: 'Committing to GitHub...',
+    retrying: 'Retrying...'
+};
+
+async function waitForJob(jobId, submitButton) {
+    // Poll the background publish job until it finishes
+    while (true) {
+        await new Promise(resolve => setTimeout(resolve, 1000));
+        const response = await fetch(`/jobs/${jobId}`);
+        const job = await response.json();
+        if (job.error && !job.status) {
+            return job;
+        }
+        if (job.status === 'done') {
+            return job.result;
+        }
+        if (job.status === 'failed') {
+            return {error: job.error};
+        }
+        submitButton.textContent = JOB_STAGE_LABELS[job.stage] || 'Creating post...';
+    }
+}
+
+document.getElementById('linkForm').addEventListener('submit', async (e) => {
+    e.preventDefault();
+    
+    const submitButton = document.getElementById('submitButton');
+    submitButton.disabled = true;
+    submitButton.textContent = 'Creating post...';
+    
+    const formData = {
+        url: document.getElementById('url').value,
+        title: document.getElementById('title').value,
+        source: document.getElementById('source').value,
+        excerpt: document.getElementById('excerpt').value,
+        content: document.getElementById('content').value,
+        image: document.querySelector('input[name="selectedImage"]:checked')?.value || null,
+        async: document.body.dataset.asyncPublish === 'true'
+    };
+    
+    try {
+        const response = await fetch('/create-post', {
+            method: 'POST',
+            headers: {'Content-Type': 'application/json'},
+            body: JSON.stringify(formData)
         });
         
-        function displayImages(images) {
-            const imageGrid = document.getElementById('imageGrid');
-            imageGrid.innerHTML = '';
-            
-            images.forEach((img, index) => {
-                const div = document.createElement('div');
-                div.className = 'image-option';
-                div.innerHTML = `
-                    <input type="radio" name="selectedImage" value="${img}" id="img${index}">
-                    <label for="img${index}">
-                        <img src="${img}" alt="Option ${index + 1}" loading="lazy">
-                    </label>
+        let data = await response.json();
+        if (data.job_id) {
+            data = await waitForJob(data.job_id, submitButton);
+        }
+
+        if (data.error) {
+            showAlert(data.error, 'error');
+        } else {
+            // Show prominent success notification with GitHub link
+            showSuccessNotification('Post created successfully!', data.github_url);
+
+            // In debug mode, show the generated content
+            if (data.debug_content) {
+                const debugDiv = document.createElement('div');
+                debugDiv.className = 'debug-output';
+                debugDiv.innerHTML = `
+                    <h3>Generated Markdown File: ${data.filename}</h3>
+                    <pre>${data.debug_content}</pre>
+                    ${data.image_info ? `<h3>Image would be saved as: ${data.image_info}</h3>` : ''}
                 `;
-                div.addEventListener('click', () => {
-                    document.querySelectorAll('.image-option').forEach(el => el.classList.remove('selected'));
-                    div.classList.add('selected');
-                    div.querySelector('input').checked = true;
-                });
-                imageGrid.appendChild(div);
-            });
-            
-            document.getElementById('imageSelector').style.display = 'block';
-            document.getElementById('loadMoreImages').style.display = 'inline-block';
+                document.querySelector('.container').appendChild(debugDiv);
+            }
+
+            document.getElementById('linkForm').reset();
+            document.getElementById('imageSelector').style.display = 'none';
         }
-        
-        document.getElementById('linkForm').addEventListener('submit', async (e) => {
-            e.preventDefault();
-            
-            const submitButton = document.getElementById('submitButton');
-            submitButton.disabled = true;
-            submitButton.textContent = 'Creating post...';
-            
-            const formData = {
-                url: document.getElementById('url').value,
-                title: document.getElementById('title').value,
-                source: document.getElementById('source').value,
-                excerpt: document.getElementById('excerpt').value,
-                content: document.getElementById('content').value,
-                image: document.querySelector('input[name="selectedImage"]:checked')?.value || null
-            };
-            
-            try {
-                const response = await fetch('/create-post', {
-                    method: 'POST',
-                    headers: {'Content-Type': 'application/json'},
-                    body: JSON.stringify(formData)
-                });
-                
-                const data = await response.json();
-
-                if (data.error) {
-                    showAlert(data.error, 'error');
-                } else {
-                    // Show prominent success notification with GitHub link
-                    showSuccessNotification('Post created successfully!', data.github_url);
-
-                    // In debug mode, show the generated content
-                    if (data.debug_content) {
-                        const debugDiv = document.createElement('div');
-                        debugDiv.className = 'debug-output';
-                        debugDiv.innerHTML = `
-                            <h3>Generated Markdown File: ${data.filename}</h3>
-                            <pre>${data.debug_content}</pre>
-                            ${data.image_info ? `<h3>Image would be saved as: ${data.image_info}</h3>` : ''}
-                        `;
-                        document.querySelector('.container').appendChild(debugDiv);
-                    }
-
-                    document.getElementById('linkForm').reset();
-                    document.getElementById('imageSelector').style.display = 'none';
-                }
-            } catch (error) {
-                showAlert('Failed to create post: ' + error.message, 'error');
-            } finally {
-                submitButton.disabled = false;
-                submitButton.textContent = 'Create Post';
+    } catch (error) {
+        showAlert('Failed to create post: ' + error.message, 'error');
+    } finally {
+        submitButton.disabled = false;
+        submitButton.textContent = 'Create Post';
+    }
+});
+
+function parseBulkLinks(text, withImages) {
+    // One link per line; anything after the URL is a title override
+    return text.split('\\n').map(line => line.trim()).filter(Boolean).map(line => {
+        const [url, ...title] = line.split(/\\s+/);
+        const item = {url};
+        if (title.length) {
+            item.title = title.join(' ');
+        }
+        if (!withImages) {
+            item.image = null;
+        }
+        return item;
+    });
+}
+
+function showBulkResults(results) {
+    const list = document.getElementById('bulkResults');
+    list.innerHTML = '';
+    results.forEach(result => {
+        const li = document.createElement('li');
+        li.className = result.success ? 'ok' : 'failed';
+        const label = escapeHtml(result.title || result.url || '(no URL)');
+        if (result.success) {
+            li.innerHTML = result.github_url
+                ? `✓ <a href="${escapeHtml(result.github_url)}" target="_blank">${label}</a>`
+                : `✓ ${label}`;
+            if (result.warning) {
+                li.innerHTML += `<small>${escapeHtml(result.warning)}</small>`;
             }
+        } else {
+            li.innerHTML = `✗ ${label}<small>${escapeHtml(result.error)}</small>`;
+        }
+        list.appendChild(li);
+    });
+}
+
+document.getElementById('bulkForm').addEventListener('submit', async (e) => {
+    e.preventDefault();
+    
+    const items = parseBulkLinks(document.getElementById('bulkLinks').value, document.getElementById('bulkImages').checked);
+    if (!items.length) {
+        showAlert('Paste at least one link', 'error');
+        return;
+    }
+    
+    const bulkSubmit = document.getElementById('bulkSubmit');
+    bulkSubmit.disabled = true;
+    bulkSubmit.textContent = `Creating ${items.length} post${items.length === 1 ? '' : 's'}...`;
+    
+    try {
+        const response = await fetch('/create-posts', {
+            method: 'POST',
+            headers: {'Content-Type': 'application/json'},
+            body: JSON.stringify({items})
         });
+        const data = await response.json();
         
-        document.getElementById('logout').addEventListener('click', async () => {
-            await fetch('/logout', {method: 'POST'});
-            window.location.reload();
-        });
-        {% endif %}
-    </script>
-</body>
-</html>
+        if (data.results) {
+            showBulkResults(data.results);
+        }
+        if (data.error) {
+            showAlert(data.error, 'error');
+        } else if (data.created) {
+            showSuccessNotification(`${data.created} of ${items.length} posts created`);
+            // Keep only the lines that failed, so they can be fixed and retried
+            const failed = items.filter((item, index) => !data.results[index].success);
+            document.getElementById('bulkLinks').value = failed.map(item => item.url + (item.title ? ' ' + item.title : '')).join('\\n');
+        }
+    } catch (error) {
+        showAlert('Failed to create posts: ' + error.message, 'error');
+    } finally {
+        bulkSubmit.disabled = false;
+        bulkSubmit.textContent = 'Create Posts';
+    }
+});
+
+document.getElementById('logout').addEventListener('click', async () => {
+    await fetch('/logout', {method: 'POST'});
+    window.location.reload();
+});
 '''
 
+def new_request_id():
+    """Short random id for correlating log lines; unique even under concurrency"""
+    return uuid.uuid4().hex[:12]
+
+_metrics = None
+_metrics_lock = threading.Lock()
+# HTTP timings taken before prometheus_client is imported, so / and /login don't pay for it
+_pending_http_observations = deque(maxlen=1000)
+
+def get_metrics():
+    """Prometheus metrics, created on first use (prometheus_client is imported lazily).
+
+    With PROMETHEUS_MULTIPROC_DIR set (production.py does this for gunicorn)
+    every worker process writes its samples there and /metrics aggregates them.
+    """
+    global _metrics
+    if _metrics is None:
+        with _metrics_lock:
+            if _metrics is None:
+                _metrics = {
+                    'stage': prometheus.Histogram(
+                        'hugo_post_stage_duration_seconds', 'Time spent in each processing stage',
+                        ['stage'], buckets=LATENCY_BUCKETS
+                    ),
+                    'stage_errors': prometheus.Counter(
+                        'hugo_post_stage_errors_total', 'Processing stages that raised', ['stage']
+                    ),
+                    'http': prometheus.Histogram(
+                        'hugo_post_http_request_duration_seconds', 'HTTP request latency',
+                        ['endpoint', 'method', 'status'], buckets=LATENCY_BUCKETS
+                    ),
+                }
+                while _pending_http_observations:
+                    labels, elapsed = _pending_http_observations.popleft()
+                    _metrics['http'].labels(**labels).observe(elapsed)
+    return _metrics
+
+def observe_http_request(elapsed, **labels):
+    """Record one request's latency, holding it back until something else has imported prometheus_client"""
+    if _metrics is None and prometheus._module is None:
+        _pending_http_observations.append((labels, elapsed))
+    else:
+        get_metrics()['http'].labels(**labels).observe(elapsed)
+
+@contextmanager
+def span(stage, request_id=None):
+    """Time a named stage into the stage histogram.
+
+    Inside a request the duration is also collected on ``g.spans`` so the
+    request's summary log line shows where its time went.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        get_metrics()['stage_errors'].labels(stage=stage).inc()
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        get_metrics()['stage'].labels(stage=stage).observe(elapsed)
+        if has_request_context() and 'spans' in g:
+            g.spans.append((stage, elapsed))
+        elif request_id is not None:
+            logger.info(f"[{request_id}] span stage={stage} ms={elapsed * 1000:.1f}")
+
 def slugify(text):
     """Create a slug from text"""
     text = text.lower()
@@ -959,240 +1404,1043 @@ def is_youtube_url(url):
     """Check if URL is a YouTube video"""
     return extract_youtube_id(url) is not None
 
-def fetch_url_metadata(url):
-    """Fetch metadata from URL including Open Graph data"""
-    try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        }
-        response = requests.get(url, headers=headers, timeout=10)
+class _HeadScanner(HTMLParser):
+    """Incremental scanner that notices when enough of a page has arrived.
+
+    Metadata lives in <head> and fetch_url_metadata only considers the first
+    METADATA_MAX_IMG_TAGS <img> tags, so once both are in hand the rest of
+    the document can be skipped.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.head_closed = False
+        self.img_count = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'img':
+            self.img_count += 1
+        elif tag == 'body':
+            self.head_closed = True
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+
+    def handle_endtag(self, tag):
+        if tag == 'head':
+            self.head_closed = True
+
+    @property
+    def done(self):
+        return self.head_closed and self.img_count >= METADATA_MAX_IMG_TAGS
+
+class _HeadCollector:
+    """Accumulates streamed page chunks until the metadata we need has arrived or the byte cap is hit"""
+
+    def __init__(self, url, encoding, max_bytes):
+        self.url = url
+        self.max_bytes = max_bytes
+        try:
+            self.decoder = codecs.getincrementaldecoder(encoding or 'utf-8')(errors='replace')
+        except LookupError:
+            self.decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        self.scanner = _HeadScanner()
+        self.chunks = []
+        self.received = 0
+
+    def feed(self, chunk):
+        """Add a chunk; returns True once there's no point reading further"""
+        self.chunks.append(chunk)
+        self.received += len(chunk)
+        self.scanner.feed(self.decoder.decode(chunk))
+        if self.scanner.done:
+            logger.info(f"Stopped reading {self.url} early after {self.received} bytes")
+            return True
+        if self.received >= self.max_bytes:
+            logger.warning(f"Stopped reading {self.url} at byte cap ({self.max_bytes} bytes)")
+            return True
+        return False
+
+    def html(self):
+        return b''.join(self.chunks)
+
+def fetch_html_head(url, headers, max_bytes=METADATA_MAX_BYTES):
+    """Stream a page and return its bytes, stopping as soon as the metadata we need has arrived.
+
+    Reads at most ``max_bytes`` so huge or never-ending responses can't
+    exhaust memory.
+    """
+    with requests.get(url, headers=headers, timeout=FETCH_TIMEOUT, stream=True) as response:
         response.raise_for_status()
         
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Extract title
-        title = None
-        og_title = soup.find('meta', property='og:title')
-        if og_title and og_title.get('content'):
-            title = og_title['content']
-        else:
-            title_tag = soup.find('title')
-            if title_tag:
-                title = title_tag.text.strip()
+        collector = _HeadCollector(url, response.encoding, max_bytes)
+        for chunk in response.iter_content(chunk_size=METADATA_CHUNK_SIZE):
+            if collector.feed(chunk):
+                break
+    
+    return collector.html()
+
+async def fetch_html_head_async(client, url, headers, max_bytes=METADATA_MAX_BYTES):
+    """Async variant of fetch_html_head on a shared httpx.AsyncClient"""
+    async with client.stream('GET', url, headers=headers) as response:
+        response.raise_for_status()
         
-        # Extract images
-        images = []
+        collector = _HeadCollector(url, response.charset_encoding, max_bytes)
+        async for chunk in response.aiter_bytes(chunk_size=METADATA_CHUNK_SIZE):
+            if collector.feed(chunk):
+                break
+    
+    return collector.html()
+
+def parse_metadata_bs4(html):
+    """Extract raw metadata fields by building a full BeautifulSoup tree"""
+    soup = bs4.BeautifulSoup(html, 'html.parser')
+    
+    og_title = soup.find('meta', property='og:title')
+    title_tag = soup.find('title')
+    og_image = soup.find('meta', property='og:image')
+    twitter_image = soup.find('meta', {'name': 'twitter:image'})
+    
+    return {
+        'og_title': og_title.get('content') if og_title else None,
+        'title': title_tag.text if title_tag else None,
+        'og_image': og_image.get('content') if og_image else None,
+        'twitter_image': twitter_image.get('content') if twitter_image else None,
+        'img_attrs': [dict(img.attrs) for img in soup.find_all('img')[:METADATA_MAX_IMG_TAGS]],
+    }
+
+class _MetadataScanner(HTMLParser):
+    """Single-pass SAX-style scanner collecting only the fields parse_metadata_* return"""
+
+    META_FIELDS = (
+        ('og_title', 'property', 'og:title'),
+        ('og_image', 'property', 'og:image'),
+        ('twitter_image', 'name', 'twitter:image'),
+    )
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.fields = {'og_title': None, 'title': None, 'og_image': None, 'twitter_image': None, 'img_attrs': []}
+        self._seen = set()
+        self._title_parts = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'meta':
+            attrs = dict(attrs)
+            for target, key, value in self.META_FIELDS:
+                # First matching tag wins, mirroring BeautifulSoup's find()
+                if attrs.get(key) == value and target not in self._seen:
+                    self._seen.add(target)
+                    self.fields[target] = attrs.get('content')
+        elif tag == 'img':
+            if len(self.fields['img_attrs']) < METADATA_MAX_IMG_TAGS:
+                self.fields['img_attrs'].append(dict(attrs))
+        elif tag == 'title' and 'title' not in self._seen:
+            self._seen.add('title')
+            self._title_parts = []
+
+    def handle_data(self, data):
+        if self._title_parts is not None:
+            self._title_parts.append(data)
+
+    def handle_endtag(self, tag):
+        if tag == 'title' and self._title_parts is not None:
+            self.fields['title'] = ''.join(self._title_parts)
+            self._title_parts = None
+
+    def close(self):
+        super().close()
+        # Unterminated <title> (e.g. a truncated fetch): keep what we have
+        if self._title_parts is not None:
+            self.fields['title'] = ''.join(self._title_parts)
+            self._title_parts = None
+
+def _decode_html(html):
+    """Decode HTML bytes using the declared <meta charset>, falling back to UTF-8"""
+    if isinstance(html, str):
+        return html
+    match = re.search(rb'<meta[^>]+charset=["\']?([\w-]+)', html[:2048], re.IGNORECASE)
+    encoding = match.group(1).decode('ascii') if match else 'utf-8'
+    try:
+        return html.decode(encoding, errors='replace')
+    except LookupError:
+        return html.decode('utf-8', errors='replace')
+
+def parse_metadata_scanner(html):
+    """Extract raw metadata fields in one streaming pass without building a tree"""
+    scanner = _MetadataScanner()
+    scanner.feed(_decode_html(html))
+    scanner.close()
+    return scanner.fields
+
+METADATA_PARSERS = {
+    'scanner': parse_metadata_scanner,
+    'bs4': parse_metadata_bs4,
+}
+
+def extract_metadata(html, url, parser=None):
+    """Turn a page's HTML into title and candidate images using the configured parser backend"""
+    fields = METADATA_PARSERS[parser or METADATA_PARSER](html)
+    
+    # Extract title
+    title = None
+    if fields['og_title']:
+        title = fields['og_title']
+    elif fields['title'] is not None:
+        title = fields['title'].strip()
+    
+    # Extract images
+    images = []
+    
+    # Open Graph image
+    if fields['og_image']:
+        img_url = fields['og_image']
+        if not img_url.startswith('http'):
+            img_url = urllib.parse.urljoin(url, img_url)
+        images.append(img_url)
+    
+    # Twitter image
+    if fields['twitter_image']:
+        img_url = fields['twitter_image']
+        if not img_url.startswith('http'):
+            img_url = urllib.parse.urljoin(url, img_url)
+        if img_url not in images:
+            images.append(img_url)
+    
+    # Regular images (limit to first 10)
+    for attrs in fields['img_attrs']:
+        img_url = None
+        # Check for lazy-loaded images first (data-src, data-lazy-src, etc.)
+        for attr in ['data-src', 'data-lazy-src', 'data-original', 'src']:
+            if attrs.get(attr):
+                img_url = attrs[attr]
+                break
         
-        # Open Graph image
-        og_image = soup.find('meta', property='og:image')
-        if og_image and og_image.get('content'):
-            img_url = og_image['content']
+        if img_url:
             if not img_url.startswith('http'):
                 img_url = urllib.parse.urljoin(url, img_url)
-            images.append(img_url)
-        
-        # Twitter image
-        twitter_image = soup.find('meta', {'name': 'twitter:image'})
-        if twitter_image and twitter_image.get('content'):
-            img_url = twitter_image['content']
-            if not img_url.startswith('http'):
-                img_url = urllib.parse.urljoin(url, img_url)
-            if img_url not in images:
+            # Skip placeholder images and common non-content images
+            skip_keywords = ['logo', 'icon', 'avatar', 'blank.png', 'placeholder']
+            if img_url not in images and not any(skip in img_url.lower() for skip in skip_keywords):
                 images.append(img_url)
+    
+    return {
+        'title': title,
+        'images': images[:10]  # Limit to 10 images
+    }
+
+FETCH_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+}
+
+def fetch_url_metadata(url):
+    """Fetch metadata from URL including Open Graph data"""
+    try:
+        with span('fetch'):
+            html = fetch_html_head(url, FETCH_HEADERS)
         
-        # Regular images (limit to first 10)
-        for img in soup.find_all('img')[:10]:
-            img_url = None
-            # Check for lazy-loaded images first (data-src, data-lazy-src, etc.)
-            for attr in ['data-src', 'data-lazy-src', 'data-original', 'src']:
-                if img.get(attr):
-                    img_url = img[attr]
-                    break
-            
-            if img_url:
-                if not img_url.startswith('http'):
-                    img_url = urllib.parse.urljoin(url, img_url)
-                # Skip placeholder images and common non-content images
-                skip_keywords = ['logo', 'icon', 'avatar', 'blank.png', 'placeholder']
-                if img_url not in images and not any(skip in img_url.lower() for skip in skip_keywords):
-                    images.append(img_url)
+        with span('parse'):
+            metadata = extract_metadata(html, url)
         
         # Extract source from domain
         domain = urllib.parse.urlparse(url).netloc
-        source = domain.replace('www.', '')
+        metadata['source'] = domain.replace('www.', '')
         
-        return {
-            'title': title,
-            'images': images[:10],  # Limit to 10 images
-            'source': source
-        }
+        return metadata
     except Exception as e:
         return {'error': str(e)}
 
-def fetch_url_metadata_with_playwright(url):
-    """Fetch metadata from URL using Playwright for dynamic content"""
+async def fetch_url_metadata_async(url):
+    """Async variant of fetch_url_metadata; the download multiplexes on the shared fetch loop"""
     try:
-        with sync_playwright() as p:
-            # Launch browser (headless for production)
-            browser = p.chromium.launch(headless=True)
-            page = browser.new_page()
-            
-            # Set a reasonable timeout
-            page.set_default_timeout(15000)  # 15 seconds
-            
-            # Navigate to the page
-            page.goto(url, wait_until='networkidle')
-            
-            # Wait a bit more for any lazy loading
-            page.wait_for_timeout(3000)
-            
-            # Try to scroll down to trigger lazy loading
-            page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-            page.wait_for_timeout(1000)
+        fetcher = get_async_fetcher()
+        with span('fetch'):
+            html = await fetcher.run(lambda: fetch_html_head_async(fetcher.http_client(), url, FETCH_HEADERS),
+                                     timeout=FETCH_DEADLINE)
+        
+        # Parse on the caller's loop so CPU work never stalls other downloads
+        with span('parse'):
+            metadata = extract_metadata(html, url)
+        
+        # Extract source from domain
+        domain = urllib.parse.urlparse(url).netloc
+        metadata['source'] = domain.replace('www.', '')
+        
+        return metadata
+    except Exception as e:
+        return {'error': str(e) or type(e).__name__}
+
+class AsyncFetcher:
+    """One asyncio event loop, on its own thread, that every async scrape runs on.
+
+    Holds a shared httpx.AsyncClient and a pool of up to PLAYWRIGHT_POOL_SIZE
+    warm async Playwright browsers, so any number of concurrent fetches
+    multiplex over one thread instead of each holding its own. Callers on
+    other threads or event loops hand work over with ``run``. Browser
+    contexts are capped at PLAYWRIGHT_ASYNC_PAGES across the pool and go to
+    an idle browser, a newly launched one while the pool isn't full, or else
+    the least busy. Each checkout health-checks the pool: a browser that has
+    disconnected or served PLAYWRIGHT_MAX_PAGES_PER_BROWSER pages is retired,
+    taking no new contexts and closing once the scrapes still running on it
+    have finished.
+    """
+
+    def __init__(self, max_connections=FETCH_MAX_CONNECTIONS, max_pages=PLAYWRIGHT_ASYNC_PAGES,
+                 pages_per_browser=PLAYWRIGHT_MAX_PAGES_PER_BROWSER, pool_size=PLAYWRIGHT_POOL_SIZE):
+        self.max_connections = max_connections
+        self.max_pages = max_pages
+        self.pages_per_browser = pages_per_browser
+        self.pool_size = pool_size
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name='fetch-loop', daemon=True)
+        self._client = None
+        self._playwright = None
+        self._browsers = []
+        self._pages_served = {}  # browser -> contexts handed out
+        self._open_contexts = {}  # browser -> contexts not yet closed
+        self._retiring = set()
+        self._page_slots = None
+        self._browser_lock = None
+        self._closed = False
+
+    def start(self):
+        self._thread.start()
+        logger.info(f"Async fetch loop started - connections: {self.max_connections}, "
+                    f"browsers: {self.pool_size}, browser pages: {self.max_pages}")
+
+    async def run(self, make_coro, timeout=None):
+        """Await ``make_coro()`` on the fetch loop from any other event loop"""
+        if self._closed:
+            raise Exception("Async fetcher is shut down")
+        future = asyncio.run_coroutine_threadsafe(self._call(make_coro), self.loop)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError:
+            raise Exception(f"Timed out after {timeout}s")
+
+    async def _call(self, make_coro):
+        return await make_coro()
+
+    def http_client(self):
+        """The shared AsyncClient; only use it from coroutines running on the fetch loop"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=FETCH_TIMEOUT,
+                follow_redirects=True,
+                limits=httpx.Limits(max_connections=self.max_connections)
+            )
+        return self._client
+
+    async def _launch(self, playwright):
+        return await playwright.chromium.launch(headless=True)
+
+    async def _get_browser(self):
+        if self._browser_lock is None:
+            self._browser_lock = asyncio.Lock()
+        async with self._browser_lock:
+            # Health check before handing a browser out
+            for browser in list(self._browsers):
+                if not browser.is_connected() or self._pages_served[browser] >= self.pages_per_browser:
+                    logger.info(f"Recycling async browser after {self._pages_served[browser]} page(s) - "
+                                f"connected: {browser.is_connected()}, still open: {self._open_contexts[browser]}")
+                    self._browsers.remove(browser)
+                    self._retiring.add(browser)
+                    await self._close_if_retired(browser)
             
-            # Extract title
-            title = None
+            idle = [browser for browser in self._browsers if not self._open_contexts[browser]]
+            if idle:
+                browser = idle[0]
+            elif len(self._browsers) < self.pool_size:
+                if self._playwright is None:
+                    self._playwright = await playwright_async.async_playwright().start()
+                browser = await self._launch(self._playwright)
+                self._browsers.append(browser)
+                self._open_contexts[browser] = 0
+                self._pages_served[browser] = 0
+            else:
+                browser = min(self._browsers, key=lambda b: self._open_contexts[b])
+            self._pages_served[browser] += 1
+            self._open_contexts[browser] += 1
+            return browser
+
+    async def _close_if_retired(self, browser):
+        """Close a retired browser once no context is left open on it"""
+        if browser in self._retiring and not self._open_contexts[browser]:
+            self._retiring.discard(browser)
+            del self._open_contexts[browser]
+            del self._pages_served[browser]
             try:
-                title_element = page.locator('title').first
-                if title_element.count() > 0:
-                    title = title_element.text_content()
-            except:
+                await browser.close()
+            except Exception:
                 pass
-            
-            # Try Open Graph title as fallback
-            if not title:
+
+    @asynccontextmanager
+    async def browser_context(self):
+        """A fresh isolated browser context, waiting for a free page slot first"""
+        if self._page_slots is None:
+            self._page_slots = asyncio.Semaphore(self.max_pages)
+        async with self._page_slots:
+            browser = await self._get_browser()
+            try:
+                context = await browser.new_context()
                 try:
-                    og_title = page.locator('meta[property="og:title"]').first
-                    if og_title.count() > 0:
-                        title = og_title.get_attribute('content')
-                except:
-                    pass
-            
-            # Extract images
-            images = []
-            
-            # First, look for CSS background images (many modern sites use these)
-            import re
-            page_content = page.content()
-            bg_image_urls = re.findall(r'background-image:\s*url\(["\']?([^"\']+)["\']?\)', page_content)
+                    yield context
+                finally:
+                    try:
+                        await context.close()
+                    except Exception:
+                        pass
+            finally:
+                self._open_contexts[browser] -= 1
+                await self._close_if_retired(browser)
+
+    async def _close(self):
+        if self._client is not None:
+            await self._client.aclose()
+        for browser in [*self._browsers, *self._retiring]:
+            await browser.close()
+        if self._playwright is not None:
+            await self._playwright.stop()
+
+    def shutdown(self):
+        """Close the HTTP client and browsers, then stop the loop"""
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            asyncio.run_coroutine_threadsafe(self._close(), self.loop).result(timeout=10)
+        except Exception as e:
+            logger.warning(f"Async fetcher did not close cleanly: {str(e)}")
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=10)
+        logger.info("Async fetch loop shut down")
+
+_async_fetcher = None
+_async_fetcher_lock = threading.Lock()
+
+def get_async_fetcher():
+    """Return the shared AsyncFetcher, starting its loop on first use"""
+    global _async_fetcher
+    if _async_fetcher is None:
+        with _async_fetcher_lock:
+            if _async_fetcher is None:
+                fetcher = AsyncFetcher()
+                fetcher.start()
+                atexit.register(fetcher.shutdown)
+                _async_fetcher = fetcher
+    return _async_fetcher
+
+async def fetch_url_metadata_with_playwright_async(url):
+    """Fetch metadata from URL with Playwright, for dynamic content, on the shared fetch loop's browser"""
+    try:
+        fetcher = get_async_fetcher()
+        
+        async def scrape():
+            async with fetcher.browser_context() as context:
+                return await _scrape_page_extract_async(context, url)
+        
+        with span('playwright'):
+            extracted, readiness = await fetcher.run(scrape, timeout=PLAYWRIGHT_JOB_TIMEOUT)
+        return _page_metadata_from_extracted(extracted, url, readiness)
+    except Exception as e:
+        return {'error': f'Playwright scraping failed: {str(e)}'}
+
+# Injected before any page script runs: records when the image set last changed
+READINESS_TRACKER_JS = '''
+(() => {
+    const state = {lastChange: performance.now()};
+    window.__hugoPostReadiness = state;
+    const touch = () => { state.lastChange = performance.now(); };
+    document.addEventListener('load', (e) => {
+        if (e.target && e.target.tagName === 'IMG') touch();
+    }, true);
+    // Only image sources count; carousels, tickers and animations restyle
+    // elements constantly and would otherwise keep the page from going quiet
+    const probe = document.createElement('div');
+    const backgroundImage = (cssText) => { probe.style.cssText = cssText || ''; return probe.style.backgroundImage; };
+    const isImageChange = (record) => {
+        const el = record.target;
+        if (record.attributeName === 'style') {
+            return backgroundImage(record.oldValue) !== el.style.backgroundImage;
+        }
+        return el.tagName === 'IMG' || el.tagName === 'SOURCE';
+    };
+    new MutationObserver((records) => {
+        for (const record of records) {
+            if (record.type === 'attributes') {
+                if (isImageChange(record)) { touch(); return; }
+                continue;
+            }
+            for (const node of record.addedNodes) {
+                if (node.nodeType === 1 && (node.tagName === 'IMG' || (node.querySelector && node.querySelector('img')))) {
+                    touch();
+                    return;
+                }
+            }
+        }
+    }).observe(document, {
+        subtree: true,
+        childList: true,
+        attributes: true,
+        attributeOldValue: true,
+        attributeFilter: ['src', 'srcset', 'style']
+    });
+})();
+'''
+
+# Runs in the page and returns title, <img> candidates and background images as one JSON blob
+EXTRACT_PAGE_IMAGES_JS = '''
+() => {
+    const titleEl = document.querySelector('title');
+    const ogTitleEl = document.querySelector('meta[property="og:title"]');
+    const candidates = Array.from(document.images, (img) => {
+        const rect = img.getBoundingClientRect();
+        return {
+            'src': img.getAttribute('src'),
+            'srcset': img.getAttribute('srcset'),
+            'data-src': img.getAttribute('data-src'),
+            'data-lazy-src': img.getAttribute('data-lazy-src'),
+            'data-original': img.getAttribute('data-original'),
+            naturalWidth: img.naturalWidth,
+            naturalHeight: img.naturalHeight,
+            renderedWidth: rect.width,
+            renderedHeight: rect.height
+        };
+    });
+    const backgrounds = [];
+    const seen = new Set();
+    for (const el of document.querySelectorAll('*')) {
+        const bg = getComputedStyle(el).backgroundImage;
+        if (!bg || bg === 'none') continue;
+        for (const match of bg.matchAll(/url\\(["']?([^"')]+)["']?\\)/g)) {
+            if (!match[1].startsWith('data:') && !seen.has(match[1])) {
+                seen.add(match[1]);
+                backgrounds.push(match[1]);
+            }
+        }
+    }
+    return {
+        title: titleEl ? titleEl.textContent : null,
+        ogTitle: ogTitleEl ? ogTitleEl.getAttribute('content') : null,
+        candidates,
+        backgrounds
+    };
+}
+'''
+
+# Scrolls one viewport and restarts the quiet window so lazy loaders get a chance to react
+SCROLL_STEP_JS = '''
+() => {
+    window.scrollBy(0, window.innerHeight);
+    const state = window.__hugoPostReadiness;
+    state.lastChange = performance.now();
+    return {
+        scrolledAt: state.lastChange,
+        atBottom: window.innerHeight + window.scrollY >= document.documentElement.scrollHeight - 2
+    };
+}
+'''
+
+QUIET_CHECK_JS = "quiet => performance.now() - window.__hugoPostReadiness.lastChange >= quiet"
+
+async def _wait_for_page_ready_async(page):
+    """Wait until the page's images stop changing, scrolling while new ones appear.
+
+    Stops when the image set has been quiet for PLAYWRIGHT_QUIET_MS and a
+    scroll step no longer turns up new images, or when PLAYWRIGHT_DEADLINE_MS
+    runs out. Returns which condition fired and how long it took.
+    """
+    start_time = time.time()
+    deadline = start_time + PLAYWRIGHT_DEADLINE_MS / 1000
+    scroll_steps = 0
+
+    async def wait_quiet():
+        remaining_ms = (deadline - time.time()) * 1000
+        if remaining_ms <= 0:
+            return False
+        try:
+            await page.wait_for_function(QUIET_CHECK_JS, arg=PLAYWRIGHT_QUIET_MS, timeout=remaining_ms)
+            return True
+        except Exception:
+            return False
+
+    reason = 'stable'
+    while True:
+        if not await wait_quiet():
+            reason = 'deadline'
+            break
+
+        if scroll_steps >= PLAYWRIGHT_MAX_SCROLL_STEPS:
+            reason = 'max_scroll_steps'
+            break
+
+        # Scroll one viewport; keep going only while scrolling turns up new images
+        scroll = await page.evaluate(SCROLL_STEP_JS)
+        scroll_steps += 1
+        if not await wait_quiet():
+            reason = 'deadline'
+            break
+        if scroll['atBottom'] or await page.evaluate("window.__hugoPostReadiness.lastChange") <= scroll['scrolledAt']:
+            reason = 'stable'
+            break
+
+    return {
+        'reason': reason,
+        'elapsed_ms': int((time.time() - start_time) * 1000),
+        'scroll_steps': scroll_steps
+    }
+
+async def _scrape_page_extract_async(context, url):
+    """Scrape ``url`` in the given browser context; returns the raw DOM extract and readiness"""
+    page = await context.new_page()
+    page.set_default_timeout(15000)  # 15 seconds
+    
+    await page.add_init_script(READINESS_TRACKER_JS)
+    await page.goto(url, wait_until='domcontentloaded')
+    
+    readiness = await _wait_for_page_ready_async(page)
+    extracted = await page.evaluate(EXTRACT_PAGE_IMAGES_JS)
+    return extracted, readiness
+
+def _page_metadata_from_extracted(extracted, url, readiness):
+    """Turn the EXTRACT_PAGE_IMAGES_JS result into title, candidate images and source"""
+    # Extract title, with Open Graph title as fallback
+    title = extracted['title'] or extracted['ogTitle']
+    
+    # Extract images
+    images = []
+    
+    # First, look for CSS background images (many modern sites use these)
+    for bg_url in extracted['backgrounds']:
+        if not bg_url.startswith('http'):
+            bg_url = urllib.parse.urljoin(url, bg_url)
+        
+        # Skip common non-content images
+        skip_keywords = ['logo', 'icon', 'avatar', 'blank.png', 'placeholder', 'loading', 'default']
+        should_skip = any(skip in bg_url.lower() for skip in skip_keywords)
+        
+        if not should_skip and bg_url not in images:
+            images.append(bg_url)
+    
+    # Then use regular image elements if we don't have enough
+    if len(images) < 10:
+        for candidate in extracted['candidates']:
+            # Try different attributes for image URL
+            img_url = None
+            for attr in ['src', 'data-src', 'data-lazy-src', 'data-original']:
+                if candidate.get(attr):
+                    img_url = candidate[attr]
+                    break
             
-            for bg_url in bg_image_urls:
-                if not bg_url.startswith('http'):
-                    bg_url = urllib.parse.urljoin(url, bg_url)
-                
-                # Skip common non-content images
-                skip_keywords = ['logo', 'icon', 'avatar', 'blank.png', 'placeholder', 'loading', 'default']
-                should_skip = any(skip in bg_url.lower() for skip in skip_keywords)
-                
-                if not should_skip and bg_url not in images:
-                    images.append(bg_url)
+            if not img_url:
+                continue
             
-            # Then get regular image elements if we don't have enough
-            if len(images) < 10:
-                img_elements = page.locator('img').all()
-                
-                for img in img_elements:
-                    try:
-                        # Try different attributes for image URL
-                        img_url = None
-                        for attr in ['src', 'data-src', 'data-lazy-src', 'data-original']:
-                            url_value = img.get_attribute(attr)
-                            if url_value:
-                                img_url = url_value
-                                break
-                        
-                        if img_url:
-                            # Convert relative URLs to absolute
-                            if not img_url.startswith('http'):
-                                img_url = urllib.parse.urljoin(url, img_url)
-                            
-                            # Skip common non-content images
-                            skip_keywords = ['logo', 'icon', 'avatar', 'blank.png', 'placeholder', 'loading']
-                            should_skip = any(skip in img_url.lower() for skip in skip_keywords)
-                            
-                            # Also check if image is very small (likely an icon)
-                            try:
-                                bounding_box = img.bounding_box()
-                                if (bounding_box and 
-                                    bounding_box['width'] > 0 and bounding_box['height'] > 0 and
-                                    (bounding_box['width'] < 50 or bounding_box['height'] < 50)):
-                                    should_skip = True
-                            except:
-                                pass
-                            
-                            if not should_skip and img_url not in images:
-                                images.append(img_url)
-                                
-                                # Limit to 15 images to avoid too many
-                                if len(images) >= 15:
-                                    break
-                    
-                    except Exception as e:
-                        continue
+            # Convert relative URLs to absolute
+            if not img_url.startswith('http'):
+                img_url = urllib.parse.urljoin(url, img_url)
             
-            # Extract source from domain
-            domain = urllib.parse.urlparse(url).netloc
-            source = domain.replace('www.', '')
+            # Skip common non-content images
+            skip_keywords = ['logo', 'icon', 'avatar', 'blank.png', 'placeholder', 'loading']
+            should_skip = any(skip in img_url.lower() for skip in skip_keywords)
             
-            browser.close()
+            # Also check if image is very small (likely an icon)
+            width, height = candidate['renderedWidth'], candidate['renderedHeight']
+            if width > 0 and height > 0 and (width < 50 or height < 50):
+                should_skip = True
             
+            if not should_skip and img_url not in images:
+                images.append(img_url)
+                
+                # Limit the number of images to avoid too many
+                if len(images) >= THUMB_MAX_CANDIDATES:
+                    break
+    
+    # Extract source from domain
+    domain = urllib.parse.urlparse(url).netloc
+    source = domain.replace('www.', '')
+    
+    return {
+        'title': title,
+        'images': images[:THUMB_MAX_CANDIDATES],  # backgrounds alone can run past the limit
+        'source': source,
+        'readiness': readiness
+    }
+
+def normalize_url(url):
+    """Normalize a URL for use as a cache key.
+
+    Lowercases scheme and host, drops default ports, fragments and tracking
+    parameters (utm_*, fbclid, ...), and sorts the remaining query string.
+    Malformed URLs (a non-numeric port, unbalanced IPv6 brackets) come back
+    stripped but otherwise unchanged.
+    """
+    try:
+        parts = urllib.parse.urlsplit(url.strip())
+        port = parts.port
+    except ValueError:
+        return url.strip()
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if port and not ((scheme == 'http' and port == 80) or (scheme == 'https' and port == 443)):
+        host = f"{host}:{port}"
+    query = [
+        (key, value) for key, value in urllib.parse.parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PARAM_PREFIXES)
+    ]
+    return urllib.parse.urlunsplit((scheme, host, parts.path or '/', urllib.parse.urlencode(sorted(query)), ''))
+
+class MetadataCache:
+    """Size-bounded LRU cache of fetched page metadata with per-entry TTLs.
+
+    Entries can optionally be written through to a SQLite file so they
+    survive service restarts; the disk copy is consulted on memory misses.
+    """
+
+    def __init__(self, max_entries=METADATA_CACHE_SIZE, db_path=METADATA_CACHE_DB):
+        self.max_entries = max_entries
+        self.db_path = db_path
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if self.db_path:
+            with sqlite3.connect(self.db_path) as conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS metadata (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+                )
+                conn.execute("DELETE FROM metadata WHERE expires_at <= ?", (time.time(),))
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[1] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self._entries.pop(key, None)
+
+        if self.db_path:
+            with sqlite3.connect(self.db_path) as conn:
+                row = conn.execute(
+                    "SELECT value, expires_at FROM metadata WHERE key = ? AND expires_at > ?", (key, now)
+                ).fetchone()
+            if row:
+                value = json.loads(row[0])
+                self._store(key, value, row[1])
+                with self._lock:
+                    self.hits += 1
+                return value
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key, value, ttl):
+        expires_at = time.time() + ttl
+        self._store(key, value, expires_at)
+        if self.db_path:
+            with sqlite3.connect(self.db_path) as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO metadata (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(value), expires_at)
+                )
+
+    def _store(self, key, value, expires_at):
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
             return {
-                'title': title,
-                'images': images,
-                'source': source
+                'hits': self.hits,
+                'misses': self.misses,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'persistent': bool(self.db_path),
             }
-            
+
+metadata_cache = MetadataCache()
+
+def metadata_cache_key(url, deep=False):
+    return f"{'playwright' if deep else 'static'}:{normalize_url(url)}"
+
+def get_url_metadata(url, deep=False):
+    """Return page metadata via the cache, fetching with the static or Playwright scraper on a miss"""
+    key = metadata_cache_key(url, deep)
+    cached = metadata_cache.get(key)
+    if cached is not None:
+        return cached
+
+    if deep:
+        # Playwright only runs on the async fetch loop; this call blocks until it's done
+        return asyncio.run(get_url_metadata_async(url, deep=True))
+
+    metadata = fetch_url_metadata(url)
+    # Don't cache failures - a retry should actually retry
+    if 'error' not in metadata:
+        metadata_cache.set(key, metadata, METADATA_CACHE_TTL)
+    return metadata
+
+async def get_url_metadata_async(url, deep=False):
+    """Async variant of get_url_metadata using the async scrapers"""
+    key = metadata_cache_key(url, deep)
+    cached = metadata_cache.get(key)
+    if cached is not None:
+        return cached
+
+    if deep:
+        metadata = await fetch_url_metadata_with_playwright_async(url)
+        ttl = METADATA_CACHE_PLAYWRIGHT_TTL
+    else:
+        metadata = await fetch_url_metadata_async(url)
+        ttl = METADATA_CACHE_TTL
+
+    # Don't cache failures - a retry should actually retry
+    if 'error' not in metadata:
+        metadata_cache.set(key, metadata, ttl)
+    return metadata
+
+def check_image_header(img, request_id):
+    """Reject images we can't or don't want to process, based on header information only"""
+    if img.format not in IMAGE_ALLOWED_FORMATS:
+        raise Exception(f"Unsupported image format: {img.format}")
+    if img.width * img.height > IMAGE_MAX_PIXELS:
+        raise Exception(f"Image dimensions too large: {img.width}x{img.height} (limit {IMAGE_MAX_PIXELS} pixels)")
+    logger.info(f"[{request_id}] Image header probed - Format: {img.format}, Size: {img.width}x{img.height}")
+
+def jpeg_header_length(data):
+    """Bytes of a JPEG up to the end of its frame header (which holds the size), or None if ``data`` stops short of it.
+
+    Walks the segment lengths from SOI; anything that isn't a valid segment
+    ends the walk there, leaving Pillow to reject the file.
+    """
+    pos = 2
+    while pos + 4 <= len(data):
+        if data[pos] != 0xFF:
+            return pos
+        marker = data[pos + 1]
+        if marker == 0xFF:
+            # Fill byte before a marker
+            pos += 1
+            continue
+        end = pos + 2 + int.from_bytes(data[pos + 2:pos + 4], 'big')
+        # SOF0-SOF15, except DHT, JPG and DAC which share the range; SOS means there was no frame header
+        if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC) or marker == 0xDA:
+            return end if end <= len(data) else None
+        pos = end
+    return None
+
+def read_image_stream(response, request_id, max_bytes=IMAGE_MAX_BYTES):
+    """Read an image from a streaming response under a hard byte ceiling.
+
+    The header is probed from the first chunks so unsupported or oversized
+    images are rejected before the rest is downloaded. Only the compressed
+    body is held in memory; the returned image is opened but not yet
+    decoded, so callers can still pick a cheaper decode (see
+    decode_for_width). Returns the image and the number of bytes read.
+    """
+    declared_length = response.headers.get('Content-Length')
+    if declared_length and declared_length.isdigit() and int(declared_length) > max_bytes:
+        raise Exception(f"Image too large: {declared_length} bytes (limit {max_bytes})")
+    
+    buffer = BytesIO()
+    probed = False
+    deferred = False
+    for chunk in response.iter_content(chunk_size=IMAGE_CHUNK_SIZE):
+        buffer.write(chunk)
+        if buffer.tell() > max_bytes:
+            raise Exception(f"Image download aborted after exceeding {max_bytes} bytes")
+        if not probed and not deferred:
+            if buffer.getvalue()[:2] == b'\xff\xd8' and jpeg_header_length(buffer.getvalue()) is None:
+                # EXIF, ICC and XMP segments can push a photo's frame header well past IMAGE_PROBE_BYTES
+                continue
+            try:
+                # Image.open only parses the header, so a partial buffer is enough
+                check_image_header(Image.open(BytesIO(buffer.getvalue())), request_id)
+                probed = True
+            except (OSError, SyntaxError):
+                if buffer.getvalue()[8:12] == b'WEBP' or buffer.getvalue()[:4] in (b'II*\x00', b'MM\x00*'):
+                    # Pillow only opens WebP from the complete file, and a TIFF's directory
+                    # may come after the pixel data; they're checked once downloaded
+                    deferred = True
+                elif buffer.tell() >= IMAGE_PROBE_BYTES:
+                    raise Exception(f"Unrecognised image format (Content-Type: {response.headers.get('Content-Type', 'unknown')})")
+    
+    received = buffer.tell()
+    buffer.seek(0)
+    img = Image.open(buffer)
+    if not probed:
+        check_image_header(img, request_id)
+    return img, received
+
+def decode_for_width(img, width, request_id):
+    """Decode ``img`` as cheaply as possible given it will end up ``width`` pixels wide.
+
+    JPEGs are decoded in draft mode, letting libjpeg scale by 1/2, 1/4 or 1/8
+    during the DCT while staying at or above the target size.
+    """
+    if img.format == 'JPEG' and img.width > width:
+        full_size = img.size
+        img.draft(None, (width, int(img.height * width / img.width)))
+        if img.size != full_size:
+            logger.info(f"[{request_id}] JPEG draft decode at {img.width}x{img.height} instead of {full_size[0]}x{full_size[1]}")
+    img.load()
+    return img
+
+def encode_image_derivatives(img, filename, formats, widths, request_id):
+    """Encode ``img`` (already at most MAX_IMAGE_WIDTH wide) at each srcset width in each modern format"""
+    base = os.path.splitext(filename)[0]
+    # Never upscale; an image narrower than every width still gets one variant at its own size
+    target_widths = sorted({w for w in widths if w <= img.width} or {img.width})
+    
+    Image.init()  # make sure optional encoder plugins are registered in Image.SAVE
+    derivatives = []
+    for fmt in formats:
+        settings = IMAGE_DERIVATIVE_SETTINGS.get(fmt)
+        if settings is None or settings['pil_format'] not in Image.SAVE:
+            logger.warning(f"[{request_id}] Skipping unsupported derivative format: {fmt}")
+            continue
+        for width in target_widths:
+            if width == img.width:
+                resized = img
+            else:
+                height = int(img.height * width / img.width)
+                resized = img.resize((width, height), Image.Resampling.LANCZOS, reducing_gap=IMAGE_REDUCING_GAP)
+            output = BytesIO()
+            with span('encode_variant', request_id):
+                resized.save(output, settings['pil_format'], **settings['options'])
+            derivatives.append({
+                'filename': f"{base}-{width}w.{fmt}",
+                'data': output.getvalue(),
+                'width': width,
+                'format': fmt,
+                'mime': settings['mime'],
+            })
+    
+    if derivatives:
+        total_size = sum(len(d['data']) for d in derivatives)
+        logger.info(f"[{request_id}] Encoded {len(derivatives)} derivative(s) - Formats: {', '.join(formats)}, Widths: {target_widths}, Total size: {total_size} bytes")
+    return derivatives
+
+thumbnail_cache = MetadataCache(max_entries=THUMB_CACHE_SIZE, db_path='')
+thumbnail_executor = ThreadPoolExecutor(max_workers=THUMB_WORKERS, thread_name_prefix='thumb')
+
+def make_thumbnail(image_url, referer=None):
+    """Download a candidate image and return a small JPEG thumbnail plus its real dimensions.
+
+    The page URL is sent as Referer so hotlink-protected images that the
+    browser can't load directly still come through.
+    """
+    request_id = new_request_id()
+    headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
+    if referer:
+        headers['Referer'] = referer
+    
+    with requests.get(image_url, headers=headers, timeout=10, stream=True) as response:
+        response.raise_for_status()
+        img, _ = read_image_stream(response, request_id, max_bytes=THUMB_MAX_BYTES)
+    
+    width, height = img.size
+    img = decode_for_width(img, THUMB_WIDTH, request_id)
+    if img.mode not in ('RGB', 'L'):
+        img = img.convert('RGB')
+    img.thumbnail((THUMB_WIDTH, THUMB_WIDTH * 2), Image.Resampling.LANCZOS, reducing_gap=IMAGE_REDUCING_GAP)
+    
+    output = BytesIO()
+    img.save(output, 'JPEG', quality=THUMB_QUALITY)
+    data = output.getvalue()
+    return {'data': data, 'width': width, 'height': height, 'etag': hashlib.sha256(data).hexdigest()[:16]}
+
+def get_thumbnail(image_url, referer=None):
+    """Cached make_thumbnail; failures are cached briefly so a page's broken candidates aren't refetched on every request"""
+    cached = thumbnail_cache.get(image_url)
+    if cached is not None:
+        return cached
+    try:
+        thumb = make_thumbnail(image_url, referer)
+        ttl = THUMB_CACHE_TTL
     except Exception as e:
-        return {'error': f'Playwright scraping failed: {str(e)}'}
+        thumb = {'error': str(e)}
+        ttl = THUMB_ERROR_TTL
+    thumbnail_cache.set(image_url, thumb, ttl)
+    return thumb
 
 def download_and_process_image(image_url, filename):
     """Download and process image"""
-    request_id = int(time.time() * 1000)  # Simple request ID for tracking
+    image_data, _ = generate_image_derivatives(image_url, filename, formats=())
+    return image_data
+
+def generate_image_derivatives(image_url, filename, formats=None, widths=None):
+    """Download an image once and encode the featured image plus responsive derivatives.
+
+    The featured image is the usual JPEG/PNG at MAX_IMAGE_WIDTH. From the
+    same decode, each of ``formats`` (default IMAGE_DERIVATIVE_FORMATS) is
+    encoded at each of ``widths`` (default IMAGE_SRCSET_WIDTHS) that doesn't
+    upscale the source. Returns ``(image_data, derivatives)`` where each
+    derivative is a dict with filename, data, width, format and mime.
+    """
+    formats = IMAGE_DERIVATIVE_FORMATS if formats is None else formats
+    widths = IMAGE_SRCSET_WIDTHS if widths is None else widths
+    request_id = new_request_id()
     logger.info(f"[{request_id}] Starting image download - URL: {image_url}, Target: {filename}")
     
-    start_time = time.time()
+    img = fetch_image(image_url, request_id)
+    try:
+        image_data = encode_featured_image(img, filename, request_id)
+        derivatives = encode_image_derivatives(img, filename, formats, widths, request_id)
+    except Exception as e:
+        logger.error(f"[{request_id}] Image encoding failed - URL: {image_url}, Error: {str(e)}")
+        raise Exception(f"Failed to process image: {str(e)}")
+    return image_data, derivatives
+
+def fetch_image(image_url, request_id):
+    """Download and decode an image, flattened to RGB and at most MAX_IMAGE_WIDTH wide"""
     try:
         logger.info(f"[{request_id}] Sending HTTP request (timeout: 10s)")
-        response = requests.get(image_url, timeout=10)
-        response.raise_for_status()
-        
-        download_time = time.time() - start_time
-        content_length = len(response.content)
-        logger.info(f"[{request_id}] Image downloaded successfully - Size: {content_length} bytes, Time: {download_time:.2f}s")
-        
-        logger.info(f"[{request_id}] Processing image with PIL")
-        img = Image.open(BytesIO(response.content))
-        original_size = f"{img.width}x{img.height}"
-        logger.info(f"[{request_id}] Original image size: {original_size}, Mode: {img.mode}")
-        
-        # Convert RGBA to RGB if necessary
-        if img.mode in ('RGBA', 'LA'):
-            logger.info(f"[{request_id}] Converting {img.mode} to RGB")
-            background = Image.new('RGB', img.size, (255, 255, 255))
-            background.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
-            img = background
+        with span('image_download', request_id):
+            response = requests.get(image_url, timeout=10, stream=True)
+            try:
+                response.raise_for_status()
+                img, content_length = read_image_stream(response, request_id)
+            finally:
+                response.close()
         
-        # Resize if wider than max width
-        if img.width > MAX_IMAGE_WIDTH:
-            ratio = MAX_IMAGE_WIDTH / img.width
-            new_height = int(img.height * ratio)
-            logger.info(f"[{request_id}] Resizing image from {img.width}x{img.height} to {MAX_IMAGE_WIDTH}x{new_height}")
-            img = img.resize((MAX_IMAGE_WIDTH, new_height), Image.Resampling.LANCZOS)
+        logger.info(f"[{request_id}] Image downloaded - Size: {content_length} bytes")
         
-        # Save as JPEG or PNG
-        output = BytesIO()
-        if filename.lower().endswith('.png'):
-            img.save(output, 'PNG', optimize=True)
-            format_used = "PNG"
-        else:
-            img.save(output, 'JPEG', quality=JPEG_QUALITY, optimize=True)
-            format_used = f"JPEG (quality={JPEG_QUALITY})"
+        original_width, original_height = img.size
+        logger.info(f"[{request_id}] Original image size: {original_width}x{original_height}, Mode: {img.mode}")
+        with span('decode', request_id):
+            img = decode_for_width(img, MAX_IMAGE_WIDTH, request_id)
+            img.load()
         
-        final_size = len(output.getvalue())
-        total_time = time.time() - start_time
-        logger.info(f"[{request_id}] Image processing completed - Format: {format_used}, Final size: {final_size} bytes, Total time: {total_time:.2f}s")
+        with span('resize', request_id):
+            # Palette images (GIFs, some PNGs) can't be resampled or saved as JPEG
+            if img.mode == 'P':
+                img = img.convert('RGBA' if 'transparency' in img.info else 'RGB')
+
+            # Convert RGBA to RGB if necessary
+            if img.mode in ('RGBA', 'LA'):
+                logger.info(f"[{request_id}] Converting {img.mode} to RGB")
+                background = Image.new('RGB', img.size, (255, 255, 255))
+                background.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
+                img = background
+            elif img.mode not in ('RGB', 'L'):
+                img = img.convert('RGB')
+            
+            # Resize if wider than max width
+            if original_width > MAX_IMAGE_WIDTH:
+                ratio = MAX_IMAGE_WIDTH / original_width
+                new_height = int(original_height * ratio)
+                logger.info(f"[{request_id}] Resizing image from {img.width}x{img.height} to {MAX_IMAGE_WIDTH}x{new_height}")
+                # reducing_gap shrinks in cheap integer steps before the final LANCZOS pass
+                img = img.resize((MAX_IMAGE_WIDTH, new_height), Image.Resampling.LANCZOS, reducing_gap=IMAGE_REDUCING_GAP)
         
-        return output.getvalue()
+        logger.info(f"[{request_id}] Image decoded - Size: {img.width}x{img.height}")
+        return img
     except requests.exceptions.Timeout:
         logger.error(f"[{request_id}] Image download timed out after 10 seconds - URL: {image_url}")
         raise Exception(f"Image download timed out: {image_url}")
@@ -1203,14 +2451,828 @@ def download_and_process_image(image_url, filename):
         logger.error(f"[{request_id}] HTTP error downloading image - URL: {image_url}, Status: {response.status_code if 'response' in locals() else 'unknown'}")
         raise Exception(f"HTTP error downloading image: {str(e)}")
     except Exception as e:
-        total_time = time.time() - start_time
-        logger.error(f"[{request_id}] Image processing failed after {total_time:.2f}s - URL: {image_url}, Error: {str(e)}")
+        logger.error(f"[{request_id}] Image processing failed - URL: {image_url}, Error: {str(e)}")
+        raise Exception(f"Failed to process image: {str(e)}")
+
+def encode_featured_image(img, filename, request_id):
+    """Encode the featured image as PNG or JPEG depending on ``filename``"""
+    output = BytesIO()
+    with span('encode', request_id):
+        if filename.lower().endswith('.png'):
+            img.save(output, 'PNG', optimize=True)
+            format_used = "PNG"
+        else:
+            img.save(output, 'JPEG', quality=JPEG_QUALITY, optimize=True)
+            format_used = f"JPEG (quality={JPEG_QUALITY})"
+    
+    final_size = len(output.getvalue())
+    logger.info(f"[{request_id}] Featured image encoded - Format: {format_used}, Final size: {final_size} bytes")
+    return output.getvalue()
+
+def image_dhash(img, hash_size=8):
+    """64-bit difference hash: robust to re-encoding, resizing and small edits"""
+    small = img.convert('L').resize((hash_size + 1, hash_size), Image.Resampling.BILINEAR)
+    pixels = small.tobytes()
+    value = 0
+    for row in range(hash_size):
+        for col in range(hash_size):
+            left = pixels[row * (hash_size + 1) + col]
+            right = pixels[row * (hash_size + 1) + col + 1]
+            value = (value << 1) | (left > right)
+    return value
+
+def image_fingerprint(img):
+    """What ImageIndex matches near-duplicates on: coarse and fine dHash plus aspect ratio"""
+    return {'dhash': image_dhash(img), 'fine_dhash': image_dhash(img, hash_size=16), 'aspect': img.width / img.height}
+
+def dhash_has_detail(dhash, min_detail=IMAGE_DEDUP_MIN_DETAIL):
+    """False for near-uniform images, whose hashes sit next to every other flat image's"""
+    bits = bin(dhash).count('1')
+    return min_detail <= bits <= 64 - min_detail
+
+class ImageIndex:
+    """Persistent index of images already committed to the repository.
+
+    Maps source URLs and perceptual hashes to the content-addressed file (and
+    its responsive variants) so a repeat or near-duplicate image can be
+    reused without downloading, encoding or uploading it again. The hashes
+    are held in memory and reloaded whenever another process (a sibling
+    worker, the importer) has added images since.
+    """
+
+    def __init__(self, db_path=IMAGE_INDEX_DB, max_distance=IMAGE_DEDUP_MAX_DISTANCE,
+                 max_fine_distance=IMAGE_DEDUP_MAX_FINE_DISTANCE):
+        self.db_path = db_path
+        self.max_distance = max_distance
+        self.max_fine_distance = max_fine_distance
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS images (
+                    filename TEXT PRIMARY KEY,
+                    dhash TEXT NOT NULL,
+                    derivatives TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS image_sources (
+                    source_url TEXT PRIMARY KEY,
+                    filename TEXT NOT NULL REFERENCES images (filename)
+                )
+            ''')
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(images)")]
+            # Images recorded before these existed are only ever reused for their own URL
+            if 'fine_dhash' not in columns:
+                conn.execute("ALTER TABLE images ADD COLUMN fine_dhash TEXT")
+            if 'aspect' not in columns:
+                conn.execute("ALTER TABLE images ADD COLUMN aspect REAL")
+        self._hashes = []
+        self._version = None
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=10)
+
+    def _entry(self, conn, filename):
+        row = conn.execute("SELECT filename, dhash, fine_dhash, aspect, derivatives FROM images WHERE filename = ?",
+                           (filename,)).fetchone()
+        if row is None:
+            return None
+        fingerprint = {'dhash': int(row[1], 16), 'fine_dhash': int(row[2], 16) if row[2] else None, 'aspect': row[3]}
+        return {'filename': row[0], 'fingerprint': fingerprint, 'derivatives': json.loads(row[4])}
+
+    def _load_hashes(self, conn):
+        """Reload the in-memory hashes if the table changed since they were read"""
+        version = conn.execute("SELECT COUNT(*), MAX(created_at) FROM images").fetchone()
+        with self._lock:
+            if version == self._version:
+                return self._hashes
+        rows = conn.execute("SELECT filename, dhash, fine_dhash, aspect FROM images").fetchall()
+        hashes = [(int(dhash, 16), int(fine_dhash, 16) if fine_dhash else None, aspect, filename)
+                  for filename, dhash, fine_dhash, aspect in rows]
+        with self._lock:
+            self._hashes, self._version = hashes, version
+        return hashes
+
+    def find_by_source(self, source_url):
+        with self._connect() as conn:
+            row = conn.execute("SELECT filename FROM image_sources WHERE source_url = ?", (source_url,)).fetchone()
+            return self._entry(conn, row[0]) if row else None
+
+    def find_similar(self, fingerprint):
+        """Closest indexed image that is the same picture as ``fingerprint`` (see image_fingerprint), if any.
+
+        A candidate must be within max_distance bits on the coarse hash,
+        have the same aspect ratio and be within max_fine_distance bits on
+        the fine hash. Near-uniform images (solid colours, plain gradients)
+        are never matched: their hashes say almost nothing about the picture.
+        """
+        dhash, fine_dhash, aspect = fingerprint['dhash'], fingerprint['fine_dhash'], fingerprint['aspect']
+        if not dhash_has_detail(dhash):
+            return None
+        with self._connect() as conn:
+            candidates = []
+            for other, other_fine, other_aspect, filename in self._load_hashes(conn):
+                distance = bin(dhash ^ other).count('1')
+                if distance > self.max_distance or not dhash_has_detail(other) or other_fine is None:
+                    continue
+                if abs(other_aspect - aspect) > aspect * IMAGE_DEDUP_ASPECT_TOLERANCE:
+                    continue
+                fine_distance = bin(fine_dhash ^ other_fine).count('1')
+                if fine_distance <= self.max_fine_distance:
+                    candidates.append((fine_distance, distance, filename))
+            if not candidates:
+                return None
+            return self._entry(conn, min(candidates)[2])
+
+    def record(self, source_url, filename, fingerprint, derivatives):
+        """Remember a committed image (derivative data is not stored, only names and sizes)"""
+        meta = [{k: v for k, v in d.items() if k != 'data'} for d in derivatives]
+        fine_dhash = fingerprint.get('fine_dhash')
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO images (filename, dhash, fine_dhash, aspect, derivatives, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (filename, f"{fingerprint['dhash']:016x}", f"{fine_dhash:064x}" if fine_dhash is not None else None,
+                 fingerprint.get('aspect'), json.dumps(meta), time.time())
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO image_sources (source_url, filename) VALUES (?, ?)",
+                (source_url, filename)
+            )
+
+_image_index = None
+_image_index_lock = threading.Lock()
+
+def get_image_index():
+    """Return the shared ImageIndex, opening it on first use"""
+    global _image_index
+    if _image_index is None:
+        with _image_index_lock:
+            if _image_index is None:
+                _image_index = ImageIndex()
+    return _image_index
+
+def resolve_post_image(image_url, ext, path_index, request_id):
+    """Find or produce the content-addressed image files for a post.
+
+    Returns a dict with ``filename``, ``fingerprint``, ``derivatives`` and ``data``;
+    ``data`` is None (and derivatives carry no bytes) when an already
+    committed image is reused.
+    """
+    index = get_image_index()
+    
+    def still_committed(entry):
+        return entry and path_index.exists(f"static/images/{entry['filename']}")
+    
+    entry = index.find_by_source(image_url)
+    if still_committed(entry):
+        logger.info(f"[{request_id}] Reusing image previously committed for this URL: {entry['filename']}")
+        return dict(entry, data=None)
+    
+    # Processed speculatively when the image was picked in the UI?
+    prepared = prepared_images.get(image_url, ext)
+    if prepared is not None:
+        logger.info(f"[{request_id}] Using speculatively processed image: {prepared['filename']}")
+        img = None
+        fingerprint = prepared['fingerprint']
+    else:
+        img = fetch_image(image_url, request_id)
+        fingerprint = image_fingerprint(img)
+    
+    entry = index.find_similar(fingerprint)
+    if still_committed(entry):
+        logger.info(f"[{request_id}] Reusing near-duplicate image {entry['filename']} (dhash {fingerprint['dhash']:016x})")
+        return dict(entry, data=None)
+    
+    if prepared is not None:
+        return prepared
+    return encode_post_image(img, image_url, ext, fingerprint, request_id)
+
+def encode_post_image(img, image_url, ext, fingerprint, request_id):
+    """Encode the featured image and its derivatives under a content-addressed name"""
+    try:
+        image_data = encode_featured_image(img, f"image{ext}", request_id)
+        # Content-addressed name: identical output always maps to the same file
+        filename = f"{hashlib.sha256(image_data).hexdigest()[:IMAGE_HASH_LENGTH]}{ext}"
+        derivatives = encode_image_derivatives(img, filename, IMAGE_DERIVATIVE_FORMATS, IMAGE_SRCSET_WIDTHS, request_id)
+    except Exception as e:
+        logger.error(f"[{request_id}] Image encoding failed - URL: {image_url}, Error: {str(e)}")
         raise Exception(f"Failed to process image: {str(e)}")
+    return {'filename': filename, 'fingerprint': fingerprint, 'derivatives': derivatives, 'data': image_data}
+
+def prepare_post_image(image_url, ext):
+    """Download and fully process an image ahead of the create-post request"""
+    request_id = new_request_id()
+    logger.info(f"[{request_id}] Speculatively processing selected image: {image_url}")
+    img = fetch_image(image_url, request_id)
+    return encode_post_image(img, image_url, ext, image_fingerprint(img), request_id)
+
+class PreparedImageCache:
+    """Short-lived, size-bounded cache of speculatively processed images.
+
+    Keyed by image URL plus every setting that affects the output, so a
+    config change never serves stale bytes. In-flight work is cached as a
+    Future, letting create-post wait for a half-finished job instead of
+    starting over; at most ``max_pending`` are queued or running at once.
+    Entries stay until committed (see discard) or evicted, so a publish
+    retried after a failed commit doesn't process the image again.
+    """
+
+    def __init__(self, ttl=PREPARED_IMAGE_TTL, max_bytes=PREPARED_IMAGE_CACHE_BYTES, max_pending=PREPARED_IMAGE_MAX_PENDING):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.max_pending = max_pending
+        self._entries = OrderedDict()  # key -> (future, expires_at)
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=PREPARED_IMAGE_WORKERS, thread_name_prefix='prepare')
+
+    @staticmethod
+    def _key(image_url, ext):
+        return (image_url, ext, MAX_IMAGE_WIDTH, JPEG_QUALITY,
+                tuple(IMAGE_DERIVATIVE_FORMATS), tuple(IMAGE_SRCSET_WIDTHS))
+
+    def submit(self, image_url, ext):
+        """Start processing ``image_url`` in the background unless it's already cached.
+
+        Returns False, doing nothing, when ``max_pending`` images are already queued or running.
+        """
+        self._evict()
+        key = self._key(image_url, ext)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[1] > time.time():
+                return True
+            if sum(not future.done() for future, _ in self._entries.values()) >= self.max_pending:
+                return False
+            future = self._executor.submit(prepare_post_image, image_url, ext)
+            self._entries[key] = (future, time.time() + self.ttl)
+        future.add_done_callback(lambda _: self._evict())
+        return True
+
+    def get(self, image_url, ext, timeout=30):
+        """Return the processed image if it was (or is being) prepared, else None; the entry is kept"""
+        key = self._key(image_url, ext)
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None or entry[1] <= time.time():
+            return None
+        try:
+            return entry[0].result(timeout=timeout)
+        except Exception as e:
+            logger.info(f"Speculative image processing unusable, processing again - Error: {str(e)}")
+            self.discard(image_url, ext)
+            return None
+
+    def discard(self, image_url, ext):
+        """Forget a prepared image once it's committed (or turned out unusable)"""
+        with self._lock:
+            self._entries.pop(self._key(image_url, ext), None)
+
+    def _size(self, future):
+        if not future.done() or future.exception():
+            return 0
+        result = future.result()
+        return len(result['data']) + sum(len(d['data']) for d in result['derivatives'])
+
+    def _evict(self):
+        """Drop expired entries, then the oldest finished ones until under the byte budget"""
+        now = time.time()
+        with self._lock:
+            for key in [k for k, (_, expires_at) in self._entries.items() if expires_at <= now]:
+                del self._entries[key]
+            total = sum(self._size(future) for future, _ in self._entries.values())
+            for key in list(self._entries):
+                if total <= self.max_bytes:
+                    break
+                future = self._entries[key][0]
+                if future.done():
+                    total -= self._size(future)
+                    del self._entries[key]
+
+prepared_images = PreparedImageCache()
+
+class RepoPathIndex:
+    """In-memory set of existing post and image paths in the target repository.
+
+    Warmed from a single recursive tree fetch, updated in place after each of
+    our own commits, and refreshed in the background once it is older than
+    PATH_INDEX_REFRESH_SECONDS so pushes made elsewhere are picked up.
+    """
+
+    def __init__(self, client, prefixes=PATH_INDEX_PREFIXES, refresh_seconds=PATH_INDEX_REFRESH_SECONDS):
+        self.client = client
+        self.prefixes = prefixes
+        self.refresh_seconds = refresh_seconds
+        self._paths = None
+        self._committed = set()
+        self._loaded_at = 0
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+    def load(self):
+        """Fetch the full tree at the branch head and rebuild the index"""
+        head = self.client.head_commit()
+        tree = self.client.repo.get_git_tree(head.tree.sha, recursive=True)
+        if tree.raw_data.get('truncated'):
+            logger.warning("Repository tree listing was truncated - path index may be incomplete")
+        paths = {
+            element.path for element in tree.tree
+            if element.type == 'blob' and element.path.startswith(self.prefixes)
+        }
+        with self._lock:
+            # Keep our own commits even if they landed after the tree was fetched
+            self._paths = paths | self._committed
+            self._loaded_at = time.time()
+        logger.info(f"Path index loaded - {len(paths)} paths at {head.sha[:7]}")
+
+    def _refresh_in_background(self):
+        try:
+            self.load()
+        except Exception as e:
+            logger.error(f"Path index refresh failed - Error: {str(e)}")
+        finally:
+            self._refreshing = False
+
+    def _ensure_loaded(self):
+        if self._paths is None:
+            # First use blocks; errors propagate rather than reading as "missing"
+            self.load()
+        elif time.time() - self._loaded_at > self.refresh_seconds and not self._refreshing:
+            self._refreshing = True
+            threading.Thread(target=self._refresh_in_background, daemon=True).start()
+
+    def exists(self, path):
+        self._ensure_loaded()
+        return path in self._paths
+
+    def add(self, paths):
+        """Record paths we just committed"""
+        with self._lock:
+            self._committed.update(p for p in paths if p.startswith(self.prefixes))
+            if self._paths is not None:
+                self._paths |= self._committed
+
+class PathExistsError(Exception):
+    """Raised by commit_files when a path that must be new already exists on the branch"""
+
+    def __init__(self, paths):
+        super().__init__(f"Already in repository: {', '.join(paths)}")
+        self.paths = paths
+
+class GitHubClient:
+    """Process-wide GitHub client for the target repository.
+
+    Keeps one PyGithub session (and its pooled keep-alive connections) for the
+    lifetime of the process, caches the repository handle and the branch head,
+    and revalidates the head with conditional requests so unchanged refs come
+    back as 304s that don't count against the rate limit.
+    """
+
+    def __init__(self, token, repo_name, branch=GITHUB_BRANCH):
+        self.repo_name = repo_name
+        self.branch = branch
+        self.github = github.Github(
+            token,
+            base_url=GITHUB_API_URL,
+            pool_size=GITHUB_POOL_SIZE,
+            seconds_between_requests=None,
+            seconds_between_writes=GITHUB_SECONDS_BETWEEN_WRITES,
+        )
+        # Lazy handle: no metadata fetch, only used to build API URLs
+        self.repo = self.github.get_repo(repo_name, lazy=True)
+        self._ref = None
+        self._head_commit = None
+        self._tree_paths = (None, set())  # (tree SHA, every path in it) of the last tree seen
+        # Re-entrant: commit_files holds it while calling head_commit
+        self._write_lock = threading.RLock()
+        self.path_index = RepoPathIndex(self)
+
+    def head_commit(self, revalidate=True):
+        """Return the cached head commit of the branch, revalidating the ref if asked"""
+        # Serialized with commit_files, which moves the cached ref and head
+        with self._write_lock:
+            if self._ref is None:
+                self._ref = self.repo.get_git_ref(f"heads/{self.branch}")
+            elif revalidate:
+                # Conditional GET - a 304 leaves the cached ref untouched
+                self._ref.update()
+
+            if self._head_commit is None or self._head_commit.sha != self._ref.object.sha:
+                self._head_commit = self.repo.get_git_commit(self._ref.object.sha)
+            return self._head_commit
+
+    def tree_paths(self, commit):
+        """Every file path in ``commit``'s tree; free when it's the tree of our own last commit"""
+        tree_sha, paths = self._tree_paths
+        if tree_sha != commit.tree.sha:
+            tree = self.repo.get_git_tree(commit.tree.sha, recursive=True)
+            paths = {element.path for element in tree.tree if element.type == 'blob'}
+            self._tree_paths = (commit.tree.sha, paths)
+        return paths
+
+    def contains_commit(self, sha, depth=PUBLISH_LANDED_SEARCH_DEPTH):
+        """Whether ``sha`` is among the branch's last ``depth`` first-parent commits"""
+        commit = self.head_commit(revalidate=True)
+        for _ in range(depth):
+            if commit.sha == sha:
+                return True
+            if not commit.parents:
+                return False
+            commit = commit.parents[0]
+        return False
+
+    def commit_files(self, files, commit_message, new_paths=(), on_commit=None):
+        """Commit several files to the branch as a single commit via the Git Data API.
+
+        ``files`` maps repository paths to their content: ``str`` values are sent
+        inline in the tree, ``bytes`` values are uploaded as base64 blobs first.
+        A tree built on the parent silently replaces existing files, so each of
+        ``new_paths`` is checked against the parent's tree first and
+        PathExistsError is raised if any is already there.
+        The cached head is used optimistically; if the branch moved underneath us
+        the fast-forward update is rejected and we rebuild on the new head, up
+        to GITHUB_COMMIT_ATTEMPTS times. ``on_commit`` is called with each
+        commit's SHA just before the branch is moved to it. Returns the new
+        commit SHA.
+        """
+        with self._write_lock:
+            elements = []
+            for path, content in files.items():
+                if isinstance(content, bytes):
+                    with span('github_blob'):
+                        blob = self.repo.create_git_blob(base64.b64encode(content).decode('ascii'), 'base64')
+                    elements.append(github.InputGitTreeElement(path, '100644', 'blob', sha=blob.sha))
+                else:
+                    elements.append(github.InputGitTreeElement(path, '100644', 'blob', content=content))
+
+            parent = self.head_commit(revalidate=False)
+            for attempt in range(1, GITHUB_COMMIT_ATTEMPTS + 1):
+                existing = [path for path in new_paths if path in self.tree_paths(parent)]
+                if existing:
+                    self.path_index.add(existing)
+                    raise PathExistsError(existing)
+                try:
+                    commit = self._commit_tree(elements, parent, commit_message, on_commit)
+                    break
+                except github.GithubException as e:
+                    if e.status != 422 or attempt == GITHUB_COMMIT_ATTEMPTS:
+                        raise
+                    logger.info(f"Branch {self.branch} moved since last commit, retrying on new head (attempt {attempt + 1})")
+                    # Spread out workers that all lost the same race
+                    time.sleep(random.uniform(0, 0.1 * attempt))
+                    parent = self.head_commit(revalidate=True)
+
+            self._head_commit = commit
+            self._tree_paths = (commit.tree.sha, self.tree_paths(parent) | set(files))
+            self.path_index.add(files)
+            return commit.sha
+
+    def _commit_tree(self, elements, parent, commit_message, on_commit=None):
+        with span('github_tree'):
+            tree = self.repo.create_git_tree(elements, parent.tree)
+        with span('github_commit'):
+            commit = self.repo.create_git_commit(commit_message, tree, [parent])
+        if on_commit:
+            on_commit(commit.sha)
+        with span('github_ref'):
+            self._ref.edit(commit.sha)
+        return commit
+
+    def rate_limit_status(self):
+        """Remaining rate-limit budget as seen on the last API response (no request made).
+
+        Read straight from the requester: Github.rate_limiting would call
+        GET /rate_limit itself until some response has been seen. Values are
+        None until then.
+        """
+        requester = self.repo._requester
+        remaining, limit = requester.rate_limiting
+        reset = requester.rate_limiting_resettime
+        return {
+            'remaining': remaining if limit >= 0 else None,
+            'limit': limit if limit >= 0 else None,
+            'reset': reset or None,
+        }
+
+_github_client = None
+_github_client_lock = threading.Lock()
+
+def get_github_client():
+    """Return the shared GitHubClient, creating it on first use"""
+    global _github_client
+    if _github_client is None:
+        with _github_client_lock:
+            if _github_client is None:
+                logger.info(f"Connecting to GitHub repository: {GITHUB_REPO}")
+                _github_client = GitHubClient(GITHUB_TOKEN, GITHUB_REPO)
+    return _github_client
+
+def process_alive(pid):
+    """Whether a process with this pid is still running on this machine"""
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+class PublishQueue:
+    """Durable SQLite-backed queue of publish jobs drained by background workers.
+
+    Jobs survive restarts: anything left ``running`` by a process that no
+    longer exists is put back on the queue at startup. Several server worker
+    processes can share one database; each claims jobs atomically and records
+    its pid so siblings never requeue work that's still in progress. Failed attempts are retried with
+    exponential backoff up to PUBLISH_MAX_ATTEMPTS. Each attempt records its
+    commit before moving the branch, and a retry first checks whether that
+    commit landed after all (say the branch update's response was lost),
+    so a post is never published twice.
+    """
+
+    def __init__(self, db_path=PUBLISH_QUEUE_DB, workers=PUBLISH_WORKERS):
+        self.db_path = db_path
+        self.workers = workers
+        self._wakeup = threading.Event()
+        self._threads = []
+        with self._connect() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    stage TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    next_run_at REAL NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            ''')
+            columns = [row['name'] for row in conn.execute("PRAGMA table_info(jobs)")]
+            if 'claimed_by' not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN claimed_by INTEGER")
+            if 'pending_commit' not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN pending_commit TEXT")
+            running = conn.execute("SELECT id, claimed_by FROM jobs WHERE status = 'running'").fetchall()
+            for row in running:
+                if not process_alive(row['claimed_by']):
+                    conn.execute(
+                        "UPDATE jobs SET status = 'queued', stage = 'queued', claimed_by = NULL "
+                        "WHERE id = ? AND status = 'running'",
+                        (row['id'],)
+                    )
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def start(self):
+        """Start the worker threads (idempotent)"""
+        if self._threads:
+            return
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"publish-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        logger.info(f"Publish queue started with {self.workers} worker(s) - DB: {self.db_path}")
+
+    def enqueue(self, data):
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, payload, status, stage, next_run_at, created_at, updated_at) "
+                "VALUES (?, ?, 'queued', 'queued', ?, ?, ?)",
+                (job_id, json.dumps(data), now, now, now)
+            )
+        self._wakeup.set()
+        return job_id
+
+    def get(self, job_id):
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        return {
+            'id': row['id'],
+            'status': row['status'],
+            'stage': row['stage'],
+            'attempts': row['attempts'],
+            'result': json.loads(row['result']) if row['result'] else None,
+            'error': row['error'],
+        }
+
+    def _update(self, job_id, **fields):
+        fields['updated_at'] = time.time()
+        columns = ', '.join(f"{name} = ?" for name in fields)
+        with self._connect() as conn:
+            conn.execute(f"UPDATE jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+
+    def _claim(self):
+        """Atomically move the next due job to ``running`` and return it"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT id, payload, attempts, pending_commit FROM jobs WHERE status = 'queued' AND next_run_at <= ? "
+                "ORDER BY next_run_at LIMIT 1",
+                (time.time(),)
+            ).fetchone()
+            if row is None:
+                return None
+            claimed = conn.execute(
+                "UPDATE jobs SET status = 'running', stage = 'starting', attempts = attempts + 1, "
+                "claimed_by = ?, updated_at = ? WHERE id = ? AND status = 'queued'",
+                (os.getpid(), time.time(), row['id'])
+            ).rowcount
+        if not claimed:
+            return None
+        pending_commit = json.loads(row['pending_commit']) if row['pending_commit'] else None
+        return row['id'], json.loads(row['payload']), row['attempts'] + 1, pending_commit
+
+    def _landed(self, pending_commit, request_id):
+        """The result of an earlier attempt whose commit is on the branch despite the attempt failing"""
+        if pending_commit and get_github_client().contains_commit(pending_commit['sha']):
+            logger.info(f"[{request_id}] Commit {pending_commit['sha'][:7]} from the failed attempt landed, not publishing again")
+            return pending_commit['result']
+        return None
+
+    def _worker(self):
+        while True:
+            job = self._claim()
+            if job is None:
+                # Poll periodically so retries with a backoff delay get picked up
+                self._wakeup.wait(timeout=1)
+                self._wakeup.clear()
+                continue
+
+            job_id, data, attempt, pending_commit = job
+            request_id = new_request_id()
+            logger.info(f"[{request_id}] Publishing job {job_id} (attempt {attempt}/{PUBLISH_MAX_ATTEMPTS})")
+            try:
+                result = self._landed(pending_commit, request_id)
+                if result is None:
+                    result = publish_post(
+                        data, request_id, progress=lambda stage: self._update(job_id, stage=stage),
+                        on_commit=lambda sha, result: self._update(
+                            job_id, pending_commit=json.dumps({'sha': sha, 'result': result}))
+                    )
+                self._update(job_id, status='done', stage='done', result=json.dumps(result), error=None)
+            except Exception as e:
+                if attempt < PUBLISH_MAX_ATTEMPTS:
+                    delay = PUBLISH_RETRY_BASE_SECONDS * (2 ** (attempt - 1))
+                    logger.warning(f"[{request_id}] Job {job_id} failed, retrying in {delay:.0f}s - Error: {str(e)}")
+                    self._update(job_id, status='queued', stage='retrying', error=str(e), next_run_at=time.time() + delay)
+                else:
+                    logger.error(f"[{request_id}] Job {job_id} failed permanently - Error: {str(e)}")
+                    self._update(job_id, status='failed', stage='failed', error=str(e))
+
+_publish_queue = None
+_publish_queue_lock = threading.Lock()
+
+def get_publish_queue():
+    """Return the shared PublishQueue, creating it and starting its workers on first use"""
+    global _publish_queue
+    if _publish_queue is None:
+        with _publish_queue_lock:
+            if _publish_queue is None:
+                publish_queue = PublishQueue()
+                publish_queue.start()
+                _publish_queue = publish_queue
+    return _publish_queue
+
+class CompressedBody:
+    """A response body encoded once up front in every Content-Encoding we serve"""
+
+    def __init__(self, data, mimetype):
+        self.mimetype = mimetype
+        self.etag = hashlib.sha256(data).hexdigest()[:16]
+        self.encodings = {'identity': data, 'gzip': gzip.compress(data, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            self.encodings['br'] = brotli.compress(data, quality=11)
+
+    def response(self, headers):
+        """Serve the best encoding the client accepts, or a 304 if its copy is current"""
+        encoding = 'identity'
+        for candidate in ('br', 'gzip'):
+            if candidate in self.encodings and request.accept_encodings[candidate]:
+                encoding = candidate
+                break
+        
+        # Each encoding is a different representation, so it needs its own ETag
+        etag = self.etag if encoding == 'identity' else f"{self.etag}-{encoding}"
+        headers = dict(headers, ETag=f'"{etag}"', Vary='Accept-Encoding')
+        if request.if_none_match.contains(etag):
+            return Response(status=304, headers=headers)
+        if encoding != 'identity':
+            headers['Content-Encoding'] = encoding
+        return Response(self.encodings[encoding], mimetype=self.mimetype, headers=headers)
+
+STATIC_ASSET_SOURCES = {
+    'app.css': (APP_CSS, 'text/css'),
+    'theme.js': (THEME_JS, 'text/javascript'),
+    'login.js': (LOGIN_JS, 'text/javascript'),
+    'editor.js': (EDITOR_JS, 'text/javascript'),
+}
+
+class PageBundle:
+    """The page shell and its CSS/JS, rendered and compressed once per process.
+
+    Assets are published under content-fingerprinted names so browsers can
+    cache them indefinitely; the page itself is pre-rendered for every
+    (authenticated, debug_mode) combination since nothing else varies.
+    """
+
+    def __init__(self):
+        self.assets = {}      # fingerprinted filename -> CompressedBody
+        self.asset_urls = {}  # logical name -> /assets/ URL
+        for name, (text, mimetype) in STATIC_ASSET_SOURCES.items():
+            body = CompressedBody(text.encode('utf-8'), mimetype)
+            stem, ext = os.path.splitext(name)
+            filename = f"{stem}.{body.etag[:12]}{ext}"
+            self.assets[filename] = body
+            self.asset_urls[name] = f"/assets/{filename}"
+        
+        template = app.jinja_env.from_string(HTML_TEMPLATE)
+        self.pages = {
+            (authenticated, debug_mode): CompressedBody(
+                template.render(
+                    authenticated=authenticated,
+                    debug_mode=debug_mode,
+                    async_publish=ASYNC_PUBLISH,
+                    assets=self.asset_urls
+                ).encode('utf-8'),
+                'text/html'
+            )
+            for authenticated in (False, True)
+            for debug_mode in (False, True)
+        }
+
+_page_bundle = None
+_page_bundle_lock = threading.Lock()
+
+def get_page_bundle():
+    """Return the shared PageBundle, building it on first use"""
+    global _page_bundle
+    if _page_bundle is None:
+        with _page_bundle_lock:
+            if _page_bundle is None:
+                start = time.perf_counter()
+                _page_bundle = PageBundle()
+                logger.info(f"Rendered page variants and assets in {(time.perf_counter() - start) * 1000:.0f} ms - brotli: {brotli is not None}")
+    return _page_bundle
+
+@app.before_request
+def start_request_timer():
+    g.request_id = new_request_id()
+    g.request_started = time.perf_counter()
+    g.spans = []
+
+@app.after_request
+def record_request_metrics(response):
+    if 'request_started' not in g:
+        return response
+    elapsed = time.perf_counter() - g.request_started
+    endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+    observe_http_request(elapsed, endpoint=endpoint, method=request.method, status=str(response.status_code))
+    response.headers['X-Request-Id'] = g.request_id
+    if g.spans:
+        stages = ' '.join(f"{stage}={seconds * 1000:.1f}" for stage, seconds in g.spans)
+        logger.info(f"[{g.request_id}] {request.method} {endpoint} status={response.status_code} ms={elapsed * 1000:.1f} {stages}")
+    return response
+
+@app.route('/metrics')
+def metrics():
+    # Scrapers can't log in, so they authenticate with METRICS_TOKEN instead
+    token_ok = METRICS_TOKEN and request.headers.get('Authorization') == f"Bearer {METRICS_TOKEN}"
+    if not DEBUG_MODE and not session.get('authenticated') and not token_ok:
+        return jsonify({'error': 'Not authenticated'}), 401
+    
+    get_metrics()
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = prometheus.CollectorRegistry()
+        prometheus_multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = prometheus.REGISTRY
+    return Response(prometheus.generate_latest(registry), mimetype=prometheus.CONTENT_TYPE_LATEST)
 
 @app.route('/')
 def index():
     authenticated = session.get('authenticated', False) or DEBUG_MODE
-    return render_template_string(HTML_TEMPLATE, authenticated=authenticated, debug_mode=DEBUG_MODE)
+    page = get_page_bundle().pages[(bool(authenticated), DEBUG_MODE)]
+    # Always revalidate: the ETag is cheap to check and login state may have changed
+    return page.response({'Cache-Control': 'private, no-cache'})
+
+@app.route('/assets/<filename>')
+def static_asset(filename):
+    asset = get_page_bundle().assets.get(filename)
+    if asset is None:
+        return jsonify({'error': 'Not found'}), 404
+    return asset.response({'Cache-Control': f'public, max-age={ASSET_MAX_AGE}, immutable'})
 
 @app.route('/login', methods=['POST'])
 def login():
@@ -1230,8 +3292,32 @@ def logout():
     session.pop('authenticated', None)
     return jsonify({'success': True})
 
+@app.route('/github-status')
+def github_status():
+    if not DEBUG_MODE and not session.get('authenticated'):
+        return jsonify({'error': 'Not authenticated'}), 401
+    
+    if DEBUG_MODE or not GITHUB_TOKEN:
+        return jsonify({'error': 'GitHub integration disabled'}), 404
+    
+    return jsonify({'rate_limit': get_github_client().rate_limit_status()})
+
+@app.route('/cache-status')
+def cache_status():
+    if not DEBUG_MODE and not session.get('authenticated'):
+        return jsonify({'error': 'Not authenticated'}), 401
+    
+    return jsonify({'metadata_cache': metadata_cache.stats(), 'thumbnail_cache': thumbnail_cache.stats()})
+
+@app.route('/startup-status')
+def startup_status():
+    if not DEBUG_MODE and not session.get('authenticated'):
+        return jsonify({'error': 'Not authenticated'}), 401
+    
+    return jsonify(startup_report())
+
 @app.route('/fetch-metadata', methods=['POST'])
-def fetch_metadata():
+async def fetch_metadata():
     if not DEBUG_MODE and not session.get('authenticated'):
         return jsonify({'error': 'Not authenticated'}), 401
     
@@ -1241,11 +3327,11 @@ def fetch_metadata():
     if not url:
         return jsonify({'error': 'URL is required'}), 400
     
-    metadata = fetch_url_metadata(url)
+    metadata = await get_url_metadata_async(url)
     return jsonify(metadata)
 
 @app.route('/fetch-metadata-playwright', methods=['POST'])
-def fetch_metadata_playwright():
+async def fetch_metadata_playwright():
     if not DEBUG_MODE and not session.get('authenticated'):
         return jsonify({'error': 'Not authenticated'}), 401
     
@@ -1255,22 +3341,39 @@ def fetch_metadata_playwright():
     if not url:
         return jsonify({'error': 'URL is required'}), 400
     
-    metadata = fetch_url_metadata_with_playwright(url)
+    metadata = await get_url_metadata_async(url, deep=True)
     return jsonify(metadata)
 
-@app.route('/create-post', methods=['POST'])
-def create_post():
-    if not DEBUG_MODE and not session.get('authenticated'):
-        return jsonify({'error': 'Not authenticated'}), 401
-    
-    if not DEBUG_MODE and not GITHUB_TOKEN:
-        return jsonify({'error': 'GitHub token not configured'}), 500
-    
-    data = request.json
+def image_extension(image_url):
+    """Featured images are saved as PNG when the source is PNG, otherwise JPEG"""
+    return '.png' if image_url.lower().endswith('.png') else '.jpg'
+
+def format_image_sources(derivatives):
+    """Front matter listing responsive image variants, one srcset per format.
+
+    Renders as ``featuredImageSources`` so the theme can emit
+    ``<picture><source type=... srcset=...>`` ahead of featuredImage.
+    """
+    if not derivatives:
+        return ''
     
-    # Generate request ID for tracking
-    request_id = int(time.time() * 1000)
-    logger.info(f"[{request_id}] Post creation request - Title: '{data.get('title', 'No title')}', Has image: {bool(data.get('image'))}")
+    lines = ['\nfeaturedImageSources:']
+    by_mime = OrderedDict()
+    for derivative in derivatives:
+        by_mime.setdefault(derivative['mime'], []).append(derivative)
+    for mime, variants in by_mime.items():
+        srcset = ', '.join(f"/images/{v['filename']} {v['width']}w" for v in variants)
+        lines.append(f'\n  - type: "{mime}"\n    srcset: "{srcset}"')
+    return ''.join(lines)
+
+def build_post(data, request_id, progress=None):
+    """Process the image and render the markdown for one post, without committing it.
+
+    ``progress`` is called with a stage name as the post moves along.
+    Returns a dict describing the post, ready for post_files/commit_posts;
+    raises if the image can't be processed.
+    """
+    report = progress or (lambda stage: None)
     
     # Check if this is a YouTube URL
     is_youtube = is_youtube_url(data['url'])
@@ -1296,31 +3399,33 @@ sourceUrl: "{data.get('source', '')}"'''
     logger.info(f"[{request_id}] Processing post - Title: {data['title']}, Slug: {slug}, Image URL: {data.get('image', 'None')}")
     
     image_filename = None
-    image_data = None
+    image = None
     if data.get('image'):
         # Process and save image
         logger.info(f"[{request_id}] Starting image processing for URL: {data['image']}")
         try:
-            ext = '.jpg'
-            if data['image'].lower().endswith('.png'):
-                ext = '.png'
-            image_filename = f"{slug}{ext}"
-            logger.info(f"[{request_id}] Generated image filename: {image_filename}")
+            ext = image_extension(data['image'])
             
             if not DEBUG_MODE:
-                # Download and process image
+                # Download and process image, or reuse an identical/near-identical committed one
+                report('processing_image')
                 logger.info(f"[{request_id}] Downloading and processing image (production mode)")
-                image_data = download_and_process_image(data['image'], image_filename)
+                image = resolve_post_image(data['image'], ext, get_github_client().path_index, request_id)
+                image_filename = image['filename']
                 logger.info(f"[{request_id}] Image processing completed successfully")
             else:
+                # Real names are content hashes, unknown without downloading
+                image_filename = f"{slug}{ext}"
                 logger.info(f"[{request_id}] Skipping image download (debug mode)")
+            logger.info(f"[{request_id}] Image filename: {image_filename}")
             
             front_matter += f'\nfeaturedImage: "/images/{image_filename}"'
+            front_matter += format_image_sources(image['derivatives'] if image else [])
             logger.info(f"[{request_id}] Added featuredImage field to front matter")
         except Exception as e:
             logger.error(f"[{request_id}] Image processing failed - Error: {str(e)}")
             logger.error(f"[{request_id}] Post creation aborted due to image processing failure")
-            return jsonify({'error': f'Failed to process image: {str(e)}'}), 500
+            raise Exception(f'Failed to process image: {str(e)}')
     
     # Add excerpt if provided (independent of image)
     if data.get('excerpt'):
@@ -1340,83 +3445,996 @@ sourceUrl: "{data.get('source', '')}"'''
     if data.get('content'):
         content += f"\n{data['content']}"
     
+    return {
+        'title': data['title'],
+        'image_url': data.get('image'),
+        'slug': slug,
+        'filename': filename,
+        'content': content,
+        'image': image,
+        'image_filename': image_filename,
+    }
+
+def debug_post_result(post):
+    """Response for a post that debug mode renders instead of committing"""
+    response = {
+        'success': True,
+        'filename': post['filename'],
+        'debug_content': post['content']
+    }
+    if post['image_filename']:
+        response['image_info'] = f"/static/images/{post['image_filename']}"
+    return response
+
+def post_files(post, path_index, files, request_id):
+    """Add a built post's markdown and new image files to ``files`` (path -> content).
+
+    Picks a unique markdown path, both against the repository and against
+    posts already in ``files``, and updates ``post['filename']`` to match.
+    """
+    file_path = f"content/links/{post['filename']}"
+    
+    # Check if file already exists
+    if path_index.exists(file_path) or file_path in files:
+        # File exists - append timestamp to make unique
+        timestamp = datetime.now().strftime('%Y%m%d%H%M%S')
+        post['filename'] = f"{post['slug']}_{timestamp}.md"
+        file_path = f"content/links/{post['filename']}"
+        counter = 2
+        while path_index.exists(file_path) or file_path in files:
+            # Same title twice in one batch, within the same second
+            post['filename'] = f"{post['slug']}_{timestamp}_{counter}.md"
+            file_path = f"content/links/{post['filename']}"
+            counter += 1
+    
+    files[file_path] = post['content']
+    
+    # Add image to the same commit if provided
+    image = post['image']
+    if image and image['data']:
+        image_files = {f"static/images/{post['image_filename']}": image['data']}
+        for derivative in image['derivatives']:
+            image_files[f"static/images/{derivative['filename']}"] = derivative['data']
+        for image_path, image_bytes in image_files.items():
+            if path_index.exists(image_path) or image_path in files:
+                logger.info(f"[{request_id}] Image already in repository (same content): {image_path}")
+            else:
+                logger.info(f"[{request_id}] Adding image to commit: {image_path}")
+                files[image_path] = image_bytes
+    elif image:
+        logger.info(f"[{request_id}] Reusing committed image, nothing to upload: {post['image_filename']}")
+    else:
+        logger.info(f"[{request_id}] No image to upload")
+
+def committed_post_result(post):
+    """Response payload for a post committed to the repository"""
+    github_url = f"https://github.com/{GITHUB_REPO}/blob/{GITHUB_BRANCH}/content/links/{post['filename']}"
+    return {'success': True, 'filename': post['filename'], 'github_url': github_url}
+
+def commit_posts(posts, request_id, progress=None, summary=None, on_commit=None):
+    """Commit built posts and their images to GitHub as a single commit.
+
+    ``summary`` replaces the "Add N links" first line of a multi-post commit
+    message. ``on_commit`` is called with the commit SHA and the payloads
+    before the branch is moved, so a caller whose request failed can later
+    tell whether the commit landed anyway. Returns one response payload per
+    post; raises on failure, in which case none of the posts were committed
+    (unless the failure was a lost response to the branch update).
+    """
+    report = progress or (lambda stage: None)
+    github_client = get_github_client()
+    
+    if len(posts) == 1:
+        commit_message = f"Add link: {posts[0]['title']}"
+    else:
+        commit_message = f"{summary or f'Add {len(posts)} links'}\n\n" + '\n'.join(f"- {post['title']}" for post in posts)
+    
+    # Create the posts and images in a single commit
+    report('committing')
+    for attempt in range(1, GITHUB_COMMIT_ATTEMPTS + 1):
+        files = {}
+        for post in posts:
+            post_files(post, github_client.path_index, files, request_id)
+        logger.info(f"[{request_id}] Committing {len(files)} file(s): {', '.join(files)}")
+        try:
+            commit_sha = github_client.commit_files(
+                files, commit_message, new_paths=[f"content/links/{post['filename']}" for post in posts],
+                on_commit=on_commit and (lambda sha: on_commit(sha, [committed_post_result(post) for post in posts]))
+            )
+            break
+        except PathExistsError as e:
+            # Posted by another worker or pushed from elsewhere since the path index was loaded;
+            # commit_files has added the paths to the index, so post_files now picks new names
+            if attempt == GITHUB_COMMIT_ATTEMPTS:
+                raise
+            logger.warning(f"[{request_id}] Post path taken on the branch, renaming - {str(e)}")
+    logger.info(f"[{request_id}] Commit created successfully - SHA: {commit_sha}")
+    
+    for post in posts:
+        if post['image']:
+            get_image_index().record(post['image_url'], post['image_filename'], post['image']['fingerprint'], post['image']['derivatives'])
+            prepared_images.discard(post['image_url'], image_extension(post['image_url']))
+    return [committed_post_result(post) for post in posts]
+
+def publish_post(data, request_id, progress=None, on_commit=None):
+    """Build the post markdown, process the image and commit both to GitHub.
+
+    ``progress`` is called with a stage name as publishing moves along, and
+    ``on_commit`` as in commit_posts, with the single post's payload.
+    Returns the response payload for the client; raises on failure.
+    """
+    post = build_post(data, request_id, progress)
+    
     # In debug mode, just return the generated content
     if DEBUG_MODE:
         logger.info(f"[{request_id}] Debug mode - returning generated content without GitHub upload")
-        response = {
-            'success': True,
-            'filename': filename,
-            'debug_content': content
-        }
-        if image_filename:
-            response['image_info'] = f"/static/images/{image_filename}"
         logger.info(f"[{request_id}] Post creation completed successfully (debug mode)")
-        return jsonify(response)
+        return debug_post_result(post)
     
     try:
-        # Connect to GitHub
-        logger.info(f"[{request_id}] Connecting to GitHub repository: {GITHUB_REPO}")
-        g = Github(GITHUB_TOKEN)
-        repo = g.get_repo(GITHUB_REPO)
-        
-        # Create the markdown file
-        file_path = f"content/links/{filename}"
-        commit_message = f"Add link: {data['title']}"
-        
-        # Check if file already exists
+        result = commit_posts([post], request_id, progress,
+                              on_commit=on_commit and (lambda sha, results: on_commit(sha, results[0])))[0]
+        logger.info(f"[{request_id}] Post creation completed successfully - File: {result['filename']}")
+        return result
+    except Exception as e:
+        logger.error(f"[{request_id}] Post creation failed - Error: {str(e)}")
+        raise Exception(f'Failed to create post: {str(e)}')
+
+batch_metadata_executor = ThreadPoolExecutor(max_workers=BATCH_METADATA_WORKERS, thread_name_prefix='batch-metadata')
+batch_image_executor = ThreadPoolExecutor(max_workers=BATCH_IMAGE_WORKERS, thread_name_prefix='batch-image')
+
+def batch_item_data(item):
+    """Fill in a batch item's title, source and image from the page's metadata where not given"""
+    data = dict(item)
+    # An explicit "image": null means no image; only a missing key picks one
+    needs_image = 'image' not in item
+    if not item.get('title') or needs_image:
+        metadata = get_url_metadata(item['url'])
+        if 'error' in metadata:
+            raise Exception(f"Failed to fetch metadata: {metadata['error']}")
+        if not data.get('title'):
+            data['title'] = metadata.get('title')
+        if not data.get('source'):
+            data['source'] = metadata.get('source', '')
+        if needs_image:
+            candidates = [url for url in metadata.get('images', []) if not url.lower().endswith('.svg')]
+            data['image'] = candidates[0] if candidates else None
+            data['image_picked'] = bool(candidates)
+    if not data.get('title'):
+        raise Exception('No title given and none found on the page')
+    return data
+
+def build_batch_post(data, request_id):
+    """build_post, falling back to no image when an automatically picked one can't be processed"""
+    try:
+        return build_post(data, request_id)
+    except Exception as e:
+        if not data.get('image_picked'):
+            raise
+        logger.warning(f"[{request_id}] Picked image unusable, posting without it - Error: {str(e)}")
+        post = build_post(dict(data, image=None), request_id)
+        post['warning'] = f"Posted without an image: {str(e)}"
+        return post
+
+def publish_posts(items, request_id):
+    """Prepare many posts concurrently, then commit every one that succeeded in a single commit.
+
+    Metadata is fetched on the batch metadata pool and each post moves on to
+    the (smaller) image pool as soon as its metadata arrives. Returns a list
+    of per-item results in input order plus the commit error, if any.
+    """
+    results = [None] * len(items)
+    seen = {}
+    metadata_futures = {}
+    for index, item in enumerate(items):
+        if not isinstance(item, dict) or not isinstance(item.get('url'), str) or not item['url']:
+            results[index] = {'success': False, 'error': 'URL is required'}
+        elif item['url'] in seen:
+            results[index] = {'url': item['url'], 'success': False, 'error': f"Duplicate of item {seen[item['url']] + 1}"}
+        else:
+            seen[item['url']] = index
+            metadata_futures[batch_metadata_executor.submit(batch_item_data, item)] = index
+    
+    build_futures = {}
+    for future in as_completed(metadata_futures):
+        index = metadata_futures[future]
         try:
-            existing_file = repo.get_contents(file_path)
-            # If we're here, file exists - append timestamp to make unique
-            timestamp = datetime.now().strftime('%Y%m%d%H%M%S')
-            filename = f"{slug}_{timestamp}.md"
-            file_path = f"content/links/{filename}"
-        except:
-            # File doesn't exist, which is what we want
-            pass
-        
-        # Create the post
-        logger.info(f"[{request_id}] Creating markdown file: {file_path}")
-        repo.create_file(file_path, commit_message, content)
-        logger.info(f"[{request_id}] Markdown file created successfully")
+            data = future.result()
+        except Exception as e:
+            logger.error(f"[{request_id}] Item {index + 1} failed - URL: {items[index]['url']}, Error: {str(e)}")
+            results[index] = {'url': items[index]['url'], 'success': False, 'error': str(e)}
+            continue
+        build_futures[batch_image_executor.submit(build_batch_post, data, f"{request_id}.{index + 1}")] = index
+    
+    posts = {}
+    for future in as_completed(build_futures):
+        index = build_futures[future]
+        try:
+            posts[index] = future.result()
+        except Exception as e:
+            results[index] = {'url': items[index]['url'], 'success': False, 'error': str(e)}
+    
+    commit_error = None
+    ready = sorted(posts)
+    if DEBUG_MODE:
+        for index in ready:
+            results[index] = debug_post_result(posts[index])
+    elif ready:
+        try:
+            committed = commit_posts([posts[index] for index in ready], request_id)
+            for index, result in zip(ready, committed):
+                results[index] = result
+        except Exception as e:
+            logger.error(f"[{request_id}] Batch commit failed - Error: {str(e)}")
+            commit_error = f'Failed to commit posts: {str(e)}'
+            for index in ready:
+                results[index] = {'success': False, 'error': commit_error}
+    
+    for index in ready:
+        results[index]['url'] = items[index]['url']
+        results[index]['title'] = posts[index]['title']
+        if 'warning' in posts[index] and results[index]['success']:
+            results[index]['warning'] = posts[index]['warning']
+    return results, commit_error
+
+class _BookmarkScanner(HTMLParser):
+    """Collects the links of a Netscape bookmarks file (the format browsers, Pocket and Raindrop export)"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.entries = []
+        self._link = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'a':
+            href = (dict(attrs).get('href') or '').strip()
+            self._link = {'url': href, 'title': ''} if href.lower().startswith(('http://', 'https://')) else None
+
+    def handle_data(self, data):
+        if self._link is not None:
+            self._link['title'] += data
+
+    def handle_endtag(self, tag):
+        if tag == 'a' and self._link is not None:
+            self._link['title'] = ' '.join(self._link['title'].split())
+            self.entries.append(self._link)
+            self._link = None
+
+def iter_bookmarks_html(stream):
+    """Yield {url, title} for each link in a bookmarks HTML export, reading it a chunk at a time"""
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    scanner = _BookmarkScanner()
+    while True:
+        chunk = stream.read(IMPORT_READ_CHUNK)
+        scanner.feed(decoder.decode(chunk, final=not chunk))
+        if not chunk:
+            scanner.close()
+        yield from scanner.entries
+        scanner.entries.clear()
+        if not chunk:
+            return
+
+def _local_name(tag):
+    """Element name without its XML namespace"""
+    return tag.rsplit('}', 1)[-1]
+
+def _feed_entry(element):
+    """{url, title} of an RSS <item> or Atom <entry>, or None if it has no web link"""
+    url = title = None
+    for child in element:
+        name = _local_name(child.tag)
+        if name == 'title':
+            title = ' '.join(''.join(child.itertext()).split())
+        elif name == 'link' and not url:
+            # Atom puts the URL in href (rel defaults to alternate); RSS in the text
+            if child.get('href'):
+                if child.get('rel', 'alternate') == 'alternate':
+                    url = child.get('href')
+            else:
+                url = (child.text or '').strip()
+    if not url or not url.lower().startswith(('http://', 'https://')):
+        return None
+    return {'url': url, 'title': title or ''}
+
+def iter_feed_xml(stream):
+    """Yield {url, title} for each entry of an RSS/Atom feed or each site in an OPML outline.
+
+    Parsed incrementally, dropping each entry from the tree once read, so
+    memory stays flat however long the feed is.
+    """
+    # Open elements; each handled one is removed from its parent, not just emptied
+    parents = []
+    try:
+        for event, element in ElementTree.iterparse(stream, events=('start', 'end')):
+            if event == 'start':
+                parents.append(element)
+                continue
+            parents.pop()
+            name = _local_name(element.tag)
+            if name in ('item', 'entry'):
+                entry = _feed_entry(element)
+            elif name == 'outline':
+                # Feed subscriptions list the site as htmlUrl; plain link lists use url
+                url = element.get('htmlUrl') or element.get('url') or ''
+                entry = {'url': url, 'title': element.get('title') or element.get('text') or ''}
+                if not url.lower().startswith(('http://', 'https://')):
+                    entry = None
+            else:
+                continue
+            element.clear()
+            if parents:
+                parents[-1].remove(element)
+            if entry:
+                yield entry
+    except ElementTree.ParseError as e:
+        raise Exception(f'Feed is not well-formed XML: {str(e)}')
+
+def iter_csv_export(stream):
+    """Yield {url, title} for each row of a CSV export with a ``url`` column (Pocket, Raindrop)"""
+    text = TextIOWrapper(stream, encoding='utf-8-sig', errors='replace', newline='')
+    try:
+        for row in csv.DictReader(text):
+            row = {(key or '').strip().lower(): (value or '').strip() for key, value in row.items() if isinstance(value, str)}
+            url = row.get('url', '')
+            if url.lower().startswith(('http://', 'https://')):
+                yield {'url': url, 'title': row.get('title', '')}
+    finally:
+        # Leave the underlying stream for its owner to close
+        text.detach()
+
+IMPORT_FORMATS = {
+    'bookmarks': iter_bookmarks_html,
+    'feed': iter_feed_xml,
+    'csv': iter_csv_export,
+}
+
+def sniff_import_format(stream):
+    """Guess an export's format from its first few KB, without consuming them"""
+    head = stream.peek(IMPORT_SNIFF_BYTES)[:IMPORT_SNIFF_BYTES].lstrip(b'\xef\xbb\xbf \t\r\n').lower()
+    if b'netscape-bookmark' in head or head.startswith((b'<!doctype html', b'<html', b'<dl', b'<dt', b'<ul')):
+        return 'bookmarks'
+    if head.startswith((b'<?xml', b'<rss', b'<feed', b'<opml', b'<rdf')):
+        return 'feed'
+    if b'url' in head.split(b'\n', 1)[0]:
+        return 'csv'
+    raise Exception('Unrecognised export - expected bookmarks HTML, an RSS/Atom/OPML feed or a CSV with a url column')
+
+def iter_import_entries(stream, fmt='auto'):
+    """Yield {url, title} for every link in an export; ``fmt`` is a key of IMPORT_FORMATS or 'auto'"""
+    if not hasattr(stream, 'peek'):
+        stream = BufferedReader(stream, IMPORT_SNIFF_BYTES)
+    if fmt == 'auto':
+        fmt = sniff_import_format(stream)
+    return IMPORT_FORMATS[fmt](stream)
+
+@contextmanager
+def open_import_source(source):
+    """Open an export for streaming: a local path, ``-`` for stdin, or an http(s) URL (e.g. a feed)"""
+    if source == '-':
+        yield sys.stdin.buffer
+    elif source.lower().startswith(('http://', 'https://')):
+        with requests.get(source, headers=FETCH_HEADERS, timeout=FETCH_TIMEOUT, stream=True) as response:
+            response.raise_for_status()
+            response.raw.decode_content = True
+            yield response.raw
+    else:
+        with open(source, 'rb') as f:
+            yield f
+
+EXTERNAL_LINK_PATTERN = re.compile(r'^externalLink:\s*"?([^"\n]*)"?\s*$', re.MULTILINE)
+
+class PostedLinkIndex:
+    """Persistent index of the ``externalLink`` of every post in the repository.
+
+    Rows are keyed by path and blob SHA, so a refresh only downloads posts
+    that are new or changed since the last one. Links are stored normalized
+    (normalize_url), so tracking parameters and fragments don't hide a repeat.
+    """
+
+    def __init__(self, db_path=IMPORT_DB):
+        self.db_path = db_path
+        with self._connect() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS posted_links (
+                    path TEXT PRIMARY KEY,
+                    blob_sha TEXT NOT NULL,
+                    url_key TEXT
+                )
+            ''')
+            conn.execute("CREATE INDEX IF NOT EXISTS posted_links_url_key ON posted_links (url_key)")
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=10)
+
+    def refresh(self, client):
+        """Bring the index up to date with the branch head"""
+        head = client.head_commit()
+        tree = client.repo.get_git_tree(head.tree.sha, recursive=True)
+        posts = {
+            element.path: element.sha for element in tree.tree
+            if element.type == 'blob' and element.path.startswith('content/links/') and element.path.endswith('.md')
+        }
+        with self._connect() as conn:
+            known = dict(conn.execute("SELECT path, blob_sha FROM posted_links").fetchall())
+        changed = [(path, sha) for path, sha in posts.items() if known.get(path) != sha]
         
-        # Upload image if provided
-        if image_filename and image_data:
-            image_path = f"static/images/{image_filename}"
-            logger.info(f"[{request_id}] Uploading image to GitHub: {image_path}")
+        def read_link(post):
+            path, sha = post
             try:
-                # Check if image already exists
-                existing_image = repo.get_contents(image_path)
-                logger.warning(f"[{request_id}] Image already exists in repository: {image_path}")
-            except:
-                # Image doesn't exist, create it
-                logger.info(f"[{request_id}] Creating new image file in repository: {image_path}")
-                repo.create_file(
-                    image_path,
-                    f"Add image for: {data['title']}",
-                    image_data,
-                    branch="main"
+                content = base64.b64decode(client.repo.get_git_blob(sha).content).decode('utf-8', errors='replace')
+                match = EXTERNAL_LINK_PATTERN.search(content)
+                return path, sha, normalize_url(match.group(1)) if match and match.group(1) else None
+            except Exception as e:
+                # Left out of the index, so the next refresh tries this post again
+                logger.warning(f"Could not read posted link from {path} - Error: {str(e)}")
+                return None
+        
+        with ThreadPoolExecutor(max_workers=GITHUB_POOL_SIZE, thread_name_prefix='posted-links') as executor:
+            rows = [row for row in executor.map(read_link, changed) if row]
+        with self._connect() as conn:
+            conn.executemany("INSERT OR REPLACE INTO posted_links (path, blob_sha, url_key) VALUES (?, ?, ?)", rows)
+            removed = [(path,) for path in known if path not in posts]
+            conn.executemany("DELETE FROM posted_links WHERE path = ?", removed)
+        logger.info(f"Posted link index refreshed - {len(posts)} posts at {head.sha[:7]}, {len(rows)} read")
+
+    def contains(self, url):
+        with self._connect() as conn:
+            row = conn.execute("SELECT 1 FROM posted_links WHERE url_key = ? LIMIT 1", (normalize_url(url),)).fetchone()
+        return row is not None
+
+    def add(self, path, url):
+        """Record a post we just committed; its blob SHA is filled in by the next refresh"""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO posted_links (path, blob_sha, url_key) VALUES (?, '', ?)",
+                (path, normalize_url(url))
+            )
+
+_posted_link_index = None
+_posted_link_index_lock = threading.Lock()
+
+def get_posted_link_index():
+    """Return the shared PostedLinkIndex, opening it on first use"""
+    global _posted_link_index
+    if _posted_link_index is None:
+        with _posted_link_index_lock:
+            if _posted_link_index is None:
+                _posted_link_index = PostedLinkIndex()
+    return _posted_link_index
+
+def is_web_link(url):
+    """True for a well-formed http(s) URL with a host"""
+    try:
+        parts = urllib.parse.urlsplit(url)
+        parts.port
+    except ValueError:
+        return False
+    return parts.scheme.lower() in ('http', 'https') and bool(parts.hostname)
+
+class DomainThrottle:
+    """Spaces out requests to the same host by at least ``delay`` seconds.
+
+    Each caller reserves the host's next free slot and sleeps until it, so
+    concurrent workers queue up politely instead of bursting one site.
+    """
+
+    def __init__(self, delay=IMPORT_DOMAIN_DELAY):
+        self.delay = delay
+        self._next_slot = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url):
+        host = (urllib.parse.urlsplit(url).hostname or '').lower()
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, 0))
+            self._next_slot[host] = slot + self.delay
+        if slot > now:
+            time.sleep(slot - now)
+
+class ImportState:
+    """SQLite record of every import and what became of each of its entries.
+
+    An entry is ``done`` once its commit has landed, ``duplicate`` if the
+    link was already posted, or ``failed`` with the error; running the same
+    import again skips done and duplicate entries and retries failed ones.
+    Like PublishQueue, a running import records its pid so a crashed one
+    can be told apart from one still in progress.
+    """
+
+    def __init__(self, db_path=IMPORT_DB):
+        self.db_path = db_path
+        with self._connect() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS imports (
+                    id TEXT PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    source TEXT NOT NULL,
+                    format TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    entries INTEGER NOT NULL DEFAULT 0,
+                    error TEXT,
+                    pid INTEGER,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
                 )
-                logger.info(f"[{request_id}] Image uploaded successfully")
-        elif image_filename and not image_data:
-            logger.warning(f"[{request_id}] Image filename generated ({image_filename}) but no image data processed - this indicates a bug")
-        elif data.get('image') and not image_filename:
-            logger.warning(f"[{request_id}] Image URL provided ({data.get('image')}) but no filename generated - this indicates a bug")
-        else:
-            logger.info(f"[{request_id}] No image to upload")
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS import_items (
+                    import_id TEXT NOT NULL,
+                    url_key TEXT NOT NULL,
+                    url TEXT NOT NULL,
+                    title TEXT,
+                    status TEXT NOT NULL,
+                    filename TEXT,
+                    error TEXT,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (import_id, url_key)
+                )
+            ''')
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def claim(self, import_id, name, source, fmt):
+        """Mark an import running in this process; False if it is already running somewhere"""
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute("SELECT status, pid FROM imports WHERE id = ?", (import_id,)).fetchone()
+            if row is None:
+                conn.execute(
+                    "INSERT INTO imports (id, name, source, format, status, pid, created_at, updated_at) "
+                    "VALUES (?, ?, ?, ?, 'running', ?, ?, ?)",
+                    (import_id, name, source, fmt, os.getpid(), now, now)
+                )
+                return True
+            if row['status'] == 'running' and process_alive(row['pid']):
+                return False
+            claimed = conn.execute(
+                "UPDATE imports SET status = 'running', source = ?, format = ?, error = NULL, pid = ?, updated_at = ? "
+                "WHERE id = ? AND status = ? AND pid IS ?",
+                (source, fmt, os.getpid(), now, import_id, row['status'], row['pid'])
+            ).rowcount
+        return bool(claimed)
+
+    def update(self, import_id, **fields):
+        fields['updated_at'] = time.time()
+        columns = ', '.join(f"{name} = ?" for name in fields)
+        with self._connect() as conn:
+            conn.execute(f"UPDATE imports SET {columns} WHERE id = ?", (*fields.values(), import_id))
+
+    def finished_keys(self, import_id):
+        """Normalized URLs a previous run already dealt with for good"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT url_key FROM import_items WHERE import_id = ? AND status IN ('done', 'duplicate')",
+                (import_id,)
+            ).fetchall()
+        return {row['url_key'] for row in rows}
+
+    def record(self, import_id, items):
+        """Store the outcome of entries: (url_key, url, title, status, filename, error) tuples"""
+        now = time.time()
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO import_items (import_id, url_key, url, title, status, filename, error, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(import_id, *item, now) for item in items]
+            )
+
+    def get(self, import_id):
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM imports WHERE id = ?", (import_id,)).fetchone()
+            if row is None:
+                return None
+            counts = dict(conn.execute(
+                "SELECT status, COUNT(*) FROM import_items WHERE import_id = ? GROUP BY status", (import_id,)
+            ).fetchall())
+            failures = conn.execute(
+                "SELECT url, error FROM import_items WHERE import_id = ? AND status = 'failed' "
+                "ORDER BY updated_at DESC LIMIT 20",
+                (import_id,)
+            ).fetchall()
+        status = row['status']
+        if status == 'running' and not process_alive(row['pid']):
+            status = 'interrupted'
+        return {
+            'id': row['id'],
+            'name': row['name'],
+            'source': row['source'],
+            'format': row['format'],
+            'status': status,
+            'entries': row['entries'],
+            'done': counts.get('done', 0),
+            'duplicate': counts.get('duplicate', 0),
+            'failed': counts.get('failed', 0),
+            'failures': [{'url': failure['url'], 'error': failure['error']} for failure in failures],
+            'error': row['error'],
+        }
+
+_import_state = None
+_import_state_lock = threading.Lock()
+
+def get_import_state():
+    """Return the shared ImportState, opening it on first use"""
+    global _import_state
+    if _import_state is None:
+        with _import_state_lock:
+            if _import_state is None:
+                _import_state = ImportState()
+    return _import_state
+
+def import_id_for(name):
+    """Imports are identified by name, so re-running the same export resumes it"""
+    return hashlib.sha256(name.encode('utf-8')).hexdigest()[:16]
+
+class LinkImporter:
+    """Streams the links of an export through the publish pipeline, committing in batches.
+
+    Entries are read lazily and at most ``in_flight`` are being fetched or
+    processed at once, so memory stays flat however large the export is.
+    Requests to any one host are paced by a DomainThrottle; the waiting and
+    page fetches happen on the import's own pool, so only image processing
+    shares the batch image pool with /create-posts, and never sleeps there. Links already in the repository are skipped.
+    Every ``batch_size`` prepared posts are committed together, and only
+    then marked done in ImportState, so an interrupted import loses at most
+    the uncommitted batch and picks up where it stopped when run again.
+    """
+
+    def __init__(self, name, images=True, batch_size=IMPORT_BATCH_SIZE, in_flight=IMPORT_IN_FLIGHT,
+                 domain_delay=IMPORT_DOMAIN_DELAY, limit=None, dry_run=False, progress=None):
+        self.name = name
+        self.import_id = import_id_for(name)
+        self.images = images
+        self.batch_size = batch_size
+        self.in_flight = in_flight
+        self.throttle = DomainThrottle(domain_delay)
+        self.limit = limit
+        self.dry_run = dry_run
+        self.progress = progress or (lambda counts: None)
+        self.counts = {'entries': 0, 'skipped': 0, 'duplicate': 0, 'new': 0, 'done': 0, 'failed': 0}
+        self._results = queue.Queue()
+        self._executor = None
+
+    def claim(self, source, fmt='auto'):
+        return get_import_state().claim(self.import_id, self.name, source, fmt)
+
+    def run(self, source, fmt='auto'):
+        """Import every new link from ``source`` (see open_import_source); claim() it first.
+
+        A dry run only reads the export and counts what would be imported.
+        Returns the counts; raises if the import stops early.
+        """
+        state = get_import_state()
+        request_id = new_request_id()
+        logger.info(f"[{request_id}] Import '{self.name}' ({self.import_id}) started - Source: {source}")
+        try:
+            if DEBUG_MODE and not self.dry_run:
+                raise Exception('Imports commit straight to GitHub; only dry runs work in debug mode')
+            posted = None if DEBUG_MODE else get_posted_link_index()
+            if posted:
+                posted.refresh(get_github_client())
+            finished = state.finished_keys(self.import_id)
+            self._executor = ThreadPoolExecutor(max_workers=self.in_flight, thread_name_prefix='import')
+            with open_import_source(source) as stream:
+                self._import(iter_import_entries(stream, fmt), finished, posted, request_id)
+        except BaseException as e:
+            # KeyboardInterrupt included: what was committed so far is kept for the next run
+            error = str(e) or type(e).__name__
+            logger.error(f"[{request_id}] Import '{self.name}' stopped - Error: {error}")
+            if not self.dry_run:
+                status = 'interrupted' if isinstance(e, KeyboardInterrupt) else 'failed'
+                state.update(self.import_id, status=status, error=error, entries=self.counts['entries'])
+            raise
+        finally:
+            if self._executor:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+        if not self.dry_run:
+            state.update(self.import_id, status='done', entries=self.counts['entries'])
+        logger.info(f"[{request_id}] Import '{self.name}' finished - {self.counts}")
+        return self.counts
+
+    def _import(self, entries, finished, posted, request_id):
+        state = get_import_state()
+        seen = set()
+        pending = 0
+        ready = []
+        for entry in entries:
+            self.counts['entries'] += 1
+            key = normalize_url(entry['url'])
+            if key in seen or key in finished:
+                self.counts['skipped'] += 1
+                continue
+            seen.add(key)
+            if not is_web_link(entry['url']):
+                # Recorded and passed over, so one bad entry can't stop every run at the same place
+                self.counts['failed'] += 1
+                if not self.dry_run:
+                    state.record(self.import_id, [(key, entry['url'], entry['title'], 'failed', None, 'Malformed URL')])
+                continue
+            if posted and posted.contains(key):
+                self.counts['duplicate'] += 1
+                if not self.dry_run:
+                    state.record(self.import_id, [(key, entry['url'], entry['title'], 'duplicate', None, None)])
+                continue
+            if self.limit is not None and self.counts['new'] >= self.limit:
+                break
+            self.counts['new'] += 1
+            if self.dry_run:
+                continue
+            
+            # Bound the work in progress; deal with finished entries while waiting
+            while pending >= self.in_flight:
+                pending -= self._collect(self._results.get(), ready)
+            self._executor.submit(self._prepare, entry, key, f"{request_id}.{self.counts['new']}")
+            pending += 1
+            while True:
+                try:
+                    pending -= self._collect(self._results.get_nowait(), ready)
+                except queue.Empty:
+                    break
+            if len(ready) >= self.batch_size:
+                self._commit(ready[:self.batch_size], posted, request_id)
+                del ready[:self.batch_size]
         
-        # Generate GitHub file URL
-        github_url = f"https://github.com/{GITHUB_REPO}/blob/main/content/links/{filename}"
-
-        logger.info(f"[{request_id}] Post creation completed successfully - File: {filename}")
-        return jsonify({
-            'success': True,
-            'filename': filename,
-            'github_url': github_url
+        while pending:
+            pending -= self._collect(self._results.get(), ready)
+        while ready:
+            self._commit(ready[:self.batch_size], posted, request_id)
+            del ready[:self.batch_size]
+
+    def _prepare(self, entry, key, request_id):
+        """Metadata stage, on the import's pool; waits its turn for the image host, then hands over to the image pool"""
+        item = {'url': entry['url'], 'title': entry['title']}
+        if not self.images:
+            item['image'] = None
+        try:
+            if not item['title'] or 'image' not in item:
+                self.throttle.wait(item['url'])
+            data = batch_item_data(item)
+            if data.get('image'):
+                self.throttle.wait(data['image'])
+            batch_image_executor.submit(self._build, entry, key, data, request_id)
+        except Exception as e:
+            self._results.put((entry, key, None, str(e)))
+
+    def _build(self, entry, key, data, request_id):
+        """Image stage, on the batch image pool"""
+        try:
+            self._results.put((entry, key, build_batch_post(data, request_id), None))
+        except Exception as e:
+            self._results.put((entry, key, None, str(e)))
+
+    def _collect(self, result, ready):
+        entry, key, post, error = result
+        if error:
+            logger.error(f"[{self.import_id}] Import entry failed - URL: {entry['url']}, Error: {error}")
+            self.counts['failed'] += 1
+            get_import_state().record(self.import_id, [(key, entry['url'], entry['title'], 'failed', None, error)])
+            self.progress(self.counts)
+        else:
+            ready.append((entry, key, post))
+        return 1
+
+    def _commit(self, batch, posted, request_id):
+        posts = [post for _, _, post in batch]
+        logger.info(f"[{request_id}] Import '{self.name}' committing {len(posts)} post(s)")
+        # Raises if the commit fails; the batch stays unrecorded and is retried on the next run
+        results = commit_posts(posts, request_id, summary=f"Import {len(posts)} links from {self.name}")
+        items = []
+        for (entry, key, post), result in zip(batch, results):
+            posted.add(f"content/links/{result['filename']}", entry['url'])
+            items.append((key, entry['url'], post['title'], 'done', result['filename'], None))
+        state = get_import_state()
+        state.record(self.import_id, items)
+        self.counts['done'] += len(items)
+        state.update(self.import_id, entries=self.counts['entries'])
+        self.progress(self.counts)
+
+@app.route('/thumb')
+def thumb():
+    if not DEBUG_MODE and not session.get('authenticated'):
+        return jsonify({'error': 'Not authenticated'}), 401
+    
+    image_url = request.args.get('url')
+    if not image_url:
+        return jsonify({'error': 'URL is required'}), 400
+    
+    thumb = get_thumbnail(image_url, request.args.get('referer'))
+    if 'error' in thumb:
+        return jsonify({'error': thumb['error']}), 502
+    
+    headers = {'Cache-Control': f'private, max-age={THUMB_CACHE_TTL}', 'ETag': f'"{thumb["etag"]}"'}
+    if request.if_none_match.contains(thumb['etag']):
+        return Response(status=304, headers=headers)
+    return Response(thumb['data'], mimetype='image/jpeg', headers=headers)
+
+@app.route('/prefetch-thumbs', methods=['POST'])
+def prefetch_thumbs():
+    if not DEBUG_MODE and not session.get('authenticated'):
+        return jsonify({'error': 'Not authenticated'}), 401
+    
+    data = request.json or {}
+    images = data.get('images') or []
+    if not isinstance(images, list) or len(images) > THUMB_MAX_CANDIDATES:
+        return jsonify({'error': f'At most {THUMB_MAX_CANDIDATES} images at once'}), 400
+    referer = data.get('referer')
+    
+    # Fetch all candidates concurrently through the bounded thumbnail pool
+    futures = [thumbnail_executor.submit(get_thumbnail, url, referer) for url in images]
+    wait(futures, timeout=20)
+    
+    results = []
+    for url, future in zip(images, futures):
+        if not future.done():
+            results.append({'url': url, 'ok': False, 'error': 'Timed out'})
+            continue
+        thumb = future.result()
+        if 'error' in thumb:
+            results.append({'url': url, 'ok': False, 'error': thumb['error']})
+            continue
+        query = urllib.parse.urlencode({'url': url, 'referer': referer or ''})
+        results.append({
+            'url': url,
+            'ok': thumb['width'] >= THUMB_MIN_DIMENSION and thumb['height'] >= THUMB_MIN_DIMENSION,
+            'thumb_url': f"/thumb?{query}",
+            'width': thumb['width'],
+            'height': thumb['height'],
         })
-        
+    return jsonify({'images': results})
+
+@app.route('/prepare-image', methods=['POST'])
+def prepare_image():
+    if not DEBUG_MODE and not session.get('authenticated'):
+        return jsonify({'error': 'Not authenticated'}), 401
+    
+    image_url = (request.json or {}).get('image')
+    if not image_url:
+        return jsonify({'error': 'Image URL is required'}), 400
+    
+    # Debug mode never processes images, so there's nothing to get ahead of
+    if not DEBUG_MODE and not prepared_images.submit(image_url, image_extension(image_url)):
+        return jsonify({'error': 'Too many images being prepared'}), 429
+    return jsonify({'success': True}), 202
+
+@app.route('/create-post', methods=['POST'])
+def create_post():
+    if not DEBUG_MODE and not session.get('authenticated'):
+        return jsonify({'error': 'Not authenticated'}), 401
+    
+    if not DEBUG_MODE and not GITHUB_TOKEN:
+        return jsonify({'error': 'GitHub token not configured'}), 500
+    
+    data = request.json
+    if not data or not data.get('url') or not data.get('title'):
+        return jsonify({'error': 'URL and title are required'}), 400
+    
+    # Same id as the X-Request-Id response header
+    request_id = g.request_id
+    logger.info(f"[{request_id}] Post creation request - Title: '{data.get('title', 'No title')}', Has image: {bool(data.get('image'))}")
+    
+    # Async mode: queue the job and let the client poll /jobs/<id>
+    if data.get('async'):
+        job_id = get_publish_queue().enqueue(data)
+        logger.info(f"[{request_id}] Post queued for background publishing - Job: {job_id}")
+        return jsonify({'success': True, 'job_id': job_id, 'status_url': f'/jobs/{job_id}'}), 202
+    
+    try:
+        return jsonify(publish_post(data, request_id))
     except Exception as e:
-        logger.error(f"[{request_id}] Post creation failed - Error: {str(e)}")
-        return jsonify({'error': f'Failed to create post: {str(e)}'}), 500
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/create-posts', methods=['POST'])
+def create_posts():
+    if not DEBUG_MODE and not session.get('authenticated'):
+        return jsonify({'error': 'Not authenticated'}), 401
+    
+    if not DEBUG_MODE and not GITHUB_TOKEN:
+        return jsonify({'error': 'GitHub token not configured'}), 500
+    
+    data = request.json
+    items = data.get('items') if data else None
+    if not items or not isinstance(items, list):
+        return jsonify({'error': 'A list of items is required'}), 400
+    if len(items) > BATCH_MAX_ITEMS:
+        return jsonify({'error': f'At most {BATCH_MAX_ITEMS} items per batch'}), 400
+    
+    request_id = g.request_id
+    logger.info(f"[{request_id}] Batch post creation request - Items: {len(items)}")
+    
+    results, commit_error = publish_posts(items, request_id)
+    succeeded = sum(1 for result in results if result['success'])
+    logger.info(f"[{request_id}] Batch completed - {succeeded}/{len(items)} posts created")
+    response = {'success': succeeded == len(items), 'created': succeeded, 'results': results}
+    if commit_error:
+        response['error'] = commit_error
+        return jsonify(response), 500
+    return jsonify(response)
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    if not DEBUG_MODE and not session.get('authenticated'):
+        return jsonify({'error': 'Not authenticated'}), 401
+    
+    job = get_publish_queue().get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job)
+
+@app.route('/import', methods=['POST'])
+def start_import():
+    if not DEBUG_MODE and not session.get('authenticated'):
+        return jsonify({'error': 'Not authenticated'}), 401
+    
+    if DEBUG_MODE:
+        return jsonify({'error': 'Imports commit straight to GitHub and are not available in debug mode'}), 400
+    if not GITHUB_TOKEN:
+        return jsonify({'error': 'GitHub token not configured'}), 500
+    
+    # Either a multipart upload of the export file, or JSON naming a feed URL
+    upload = request.files.get('file')
+    options = request.form if upload else (request.get_json(silent=True) or {})
+    fmt = options.get('format') or 'auto'
+    if fmt != 'auto' and fmt not in IMPORT_FORMATS:
+        return jsonify({'error': f"Unknown format, expected one of: auto, {', '.join(IMPORT_FORMATS)}"}), 400
+    images = str(options.get('images', 'true')).lower() != 'false'
+    
+    upload_path = None
+    if upload and upload.filename:
+        name = options.get('name') or secure_filename(upload.filename) or 'upload'
+        source = upload.filename
+        handle, upload_path = tempfile.mkstemp(prefix='hugo-post-import-')
+        with os.fdopen(handle, 'wb') as f:
+            upload.save(f)
+    elif options.get('url'):
+        name = options.get('name') or options['url']
+        source = options['url']
+    else:
+        return jsonify({'error': 'An export file or a feed URL is required'}), 400
+    
+    importer = LinkImporter(name, images=images)
+    status_url = f'/imports/{importer.import_id}'
+    if not importer.claim(source, fmt):
+        if upload_path:
+            os.remove(upload_path)
+        return jsonify({'error': 'This import is already running', 'import_id': importer.import_id, 'status_url': status_url}), 409
+    
+    logger.info(f"[{g.request_id}] Import '{name}' queued - ID: {importer.import_id}, Source: {source}")
+    threading.Thread(target=run_import, args=(importer, upload_path or source, fmt, upload_path),
+                     name=f"import-{importer.import_id}", daemon=True).start()
+    return jsonify({'success': True, 'import_id': importer.import_id, 'status_url': status_url}), 202
+
+def run_import(importer, source, fmt, cleanup_path=None):
+    """Background thread body for /import; the outcome is recorded in ImportState"""
+    try:
+        importer.run(source, fmt)
+    except Exception:
+        pass  # already logged and recorded by LinkImporter.run
+    finally:
+        if cleanup_path:
+            os.remove(cleanup_path)
+
+@app.route('/imports/<import_id>')
+def import_status(import_id):
+    if not DEBUG_MODE and not session.get('authenticated'):
+        return jsonify({'error': 'Not authenticated'}), 401
+    
+    status = get_import_state().get(import_id)
+    if status is None:
+        return jsonify({'error': 'Import not found'}), 404
+    return jsonify(status)
+
+if not LAZY_IMPORTS:
+    warm_lazy_modules()
+
+_module_ready = time.perf_counter()
+logger.info(
+    f"App module ready in {(_module_ready - _startup_began) * 1000:.0f} ms "
+    f"(imports {(_imports_done - _startup_began) * 1000:.0f} ms) - deferred: "
+    f"{', '.join(name for name, module in LazyModule.registry.items() if module._module is None) or 'none'}"
+)
 
 if __name__ == '__main__':
     # Check configuration
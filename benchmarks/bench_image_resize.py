@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Benchmark the image resize pipeline used by download_and_process_image.
+
+Compares the original path (full-resolution decode + single LANCZOS resize)
+with the current one (JPEG draft-mode decode + reducing_gap resize) on
+synthetic camera-sized images. Each run happens in a fresh process so the
+reported peak RSS belongs to that run alone.
+
+Usage:
+    python benchmarks/bench_image_resize.py [--runs 5]
+"""
+
+import os
+import sys
+import argparse
+import logging
+import resource
+import time
+from io import BytesIO
+from multiprocessing import get_context
+
+from PIL import Image
+
+# Add the repository root to Python path to import app functions
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app import MAX_IMAGE_WIDTH, JPEG_QUALITY, IMAGE_REDUCING_GAP, decode_for_width
+
+# Keep per-image app logging out of the results table
+logging.disable(logging.INFO)
+
+SIZES = [(6000, 4000), (4000, 3000), (2400, 1600)]
+
+
+def make_photo(width, height):
+    """Photo-like JPEG: a gradient with noise so the encoder has real work to do"""
+    gradient = Image.linear_gradient('L').resize((width, height))
+    noise = Image.effect_noise((width, height), 40)
+    img = Image.merge('RGB', (gradient, noise, gradient.transpose(Image.Transpose.FLIP_LEFT_RIGHT)))
+    output = BytesIO()
+    img.save(output, 'JPEG', quality=92)
+    return output.getvalue()
+
+
+def legacy_pipeline(data):
+    img = Image.open(BytesIO(data))
+    if img.width > MAX_IMAGE_WIDTH:
+        new_height = int(img.height * MAX_IMAGE_WIDTH / img.width)
+        img = img.resize((MAX_IMAGE_WIDTH, new_height), Image.Resampling.LANCZOS)
+    output = BytesIO()
+    img.save(output, 'JPEG', quality=JPEG_QUALITY, optimize=True)
+    return output.getvalue()
+
+
+def current_pipeline(data):
+    img = Image.open(BytesIO(data))
+    original_width, original_height = img.size
+    img = decode_for_width(img, MAX_IMAGE_WIDTH, 'bench')
+    if original_width > MAX_IMAGE_WIDTH:
+        new_height = int(original_height * MAX_IMAGE_WIDTH / original_width)
+        img = img.resize((MAX_IMAGE_WIDTH, new_height), Image.Resampling.LANCZOS, reducing_gap=IMAGE_REDUCING_GAP)
+    output = BytesIO()
+    img.save(output, 'JPEG', quality=JPEG_QUALITY, optimize=True)
+    return output.getvalue()
+
+
+PIPELINES = {'legacy': legacy_pipeline, 'current': current_pipeline}
+
+
+def _measure(name, data, conn):
+    baseline_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.process_time()
+    output = PIPELINES[name](data)
+    cpu = time.process_time() - start
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    conn.send((cpu, (peak_rss - baseline_rss) / 1024, len(output)))
+    conn.close()
+
+
+def measure(name, data):
+    """Run one pipeline in a fresh process; returns (cpu seconds, extra peak RSS in MB, output bytes)"""
+    ctx = get_context('fork')
+    parent, child = ctx.Pipe()
+    process = ctx.Process(target=_measure, args=(name, data, child))
+    process.start()
+    result = parent.recv()
+    process.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'source':>11}  {'pipeline':>8}  {'cpu ms':>8}  {'peak MB':>8}  {'out KB':>7}")
+    for width, height in SIZES:
+        data = make_photo(width, height)
+        results = {}
+        for name in PIPELINES:
+            runs = [measure(name, data) for _ in range(args.runs)]
+            cpu = sorted(r[0] for r in runs)[len(runs) // 2]
+            rss = sorted(r[1] for r in runs)[len(runs) // 2]
+            results[name] = (cpu, rss)
+            print(f"{width}x{height:<6}  {name:>8}  {cpu * 1000:8.1f}  {rss:8.1f}  {runs[0][2] / 1024:7.1f}")
+        legacy_cpu, legacy_rss = results['legacy']
+        current_cpu, current_rss = results['current']
+        print(f"{'':>11}  {'saved':>8}  {(1 - current_cpu / legacy_cpu) * 100:7.0f}%  {legacy_rss - current_rss:8.1f}")
+
+
+if __name__ == '__main__':
+    main()
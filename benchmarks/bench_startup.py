@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Benchmark cold start: time from launching production.py to the first response.
+
+Starts the server in debug mode (no GitHub needed) repeatedly, with heavy
+imports deferred (LAZY_IMPORTS=true) and loaded up front (LAZY_IMPORTS=false),
+and polls / (the login page) until it answers. Also prints the app's own import-time
+breakdown from /startup-status.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 5] [--modes gunicorn,werkzeug]
+"""
+
+import os
+import sys
+import time
+import argparse
+import subprocess
+
+import requests
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+
+
+def first_response(mode, lazy, port, settle):
+    """Launch the server and return (seconds until / answered, startup report)"""
+    env = dict(os.environ, DEBUG_MODE='true', HOST='127.0.0.1', PORT=str(port), WEB_SERVER=mode,
+               WEB_WORKERS='1', LAZY_IMPORTS='true' if lazy else 'false')
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, 'production.py'], cwd=ROOT, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while True:
+            if time.perf_counter() - start > 60:
+                raise Exception(f"{mode} server did not answer within 60s")
+            try:
+                if requests.get(f"http://127.0.0.1:{port}/", timeout=5).status_code == 200:
+                    elapsed = time.perf_counter() - start
+                    break
+            except requests.RequestException:
+                time.sleep(0.01)
+        # Give the background warm-up a moment so the report covers the deferred imports too
+        time.sleep(settle)
+        report = requests.get(f"http://127.0.0.1:{port}/startup-status", timeout=5).json()
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+    return elapsed, report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--modes', default='gunicorn,werkzeug')
+    parser.add_argument('--port', type=int, default=5097)
+    parser.add_argument('--settle', type=float, default=3, help='seconds to wait before reading /startup-status')
+    args = parser.parse_args()
+
+    print(f"{'server':>9}  {'imports':>8}  {'first ms':>8}  {'app imports ms':>14}  {'module ms':>9}")
+    for mode in args.modes.split(','):
+        for lazy in (False, True):
+            runs = [first_response(mode, lazy, args.port, args.settle) for _ in range(args.runs)]
+            elapsed = sorted(r[0] for r in runs)[len(runs) // 2]
+            report = runs[-1][1]
+            print(f"{mode:>9}  {'lazy' if lazy else 'eager':>8}  {elapsed * 1000:8.0f}  "
+                  f"{report['imports_ms']:14.0f}  {report['module_ms']:9.0f}")
+        deferred = ', '.join(f"{name} {ms:.0f} ms" for name, ms in report['deferred'].items() if ms is not None)
+        print(f"{'':>9}  deferred imports, warmed after first response: {deferred or 'none yet'}")
+
+
+if __name__ == '__main__':
+    main()
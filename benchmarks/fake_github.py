@@ -0,0 +1,574 @@
+#!/usr/bin/env python3
+"""
+In-memory stand-in for the parts of the GitHub REST API the app uses.
+
+Implements the Git Data endpoints GitHubClient talks to (refs, commits,
+trees, blobs) and the contents API for a single repository, with git-style
+SHAs, ETags and conditional GETs so PyGithub behaves exactly as it does
+against GitHub. Point the app at it with GITHUB_API_URL;
+publish_load_test.py hosts one in-process for the server it starts.
+
+Faults can be injected to see how publishing holds up when GitHub doesn't:
+
+    latency        every call sleeps latency_ms ± jitter_ms (writes also write_latency_ms)
+    errors         error_rate of calls fail with error_status (5xx is retried by PyGithub)
+    rate limit     rate_limit calls per rate_limit_window seconds, then 403 until the reset
+    secondary      secondary_rate of writes get a secondary-rate-limit 403 with Retry-After
+    conflicts      conflict_rate of ref updates find the branch moved by another pusher
+
+Each is a command-line flag here and in publish_load_test.py (e.g.
+--latency-ms 150). Request and injection counts are served at /_fake/stats.
+
+Usage:
+    python benchmarks/fake_github.py [--port 8770] [--repo owner/name] [--latency-ms 150] [--error-rate 0.05]
+"""
+
+import re
+import json
+import time
+import base64
+import random
+import hashlib
+import argparse
+import threading
+import urllib.parse
+from collections import Counter
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+
+def git_sha(kind, data):
+    return hashlib.sha1(f"{kind} {len(data)}\0".encode('ascii') + data).hexdigest()
+
+
+class FakeRepository:
+    """Object store and refs for one repository; trees are flat path -> blob SHA maps"""
+
+    def __init__(self, full_name, branch='main'):
+        self.full_name = full_name
+        self.default_branch = branch
+        self.blobs = {}
+        self.trees = {}
+        self.commits = {}
+        self.refs = {}
+        self.lock = threading.Lock()
+        self.writes = 0
+
+        tree_sha = self.put_tree({})
+        self.refs[f"heads/{branch}"] = self.put_commit('Initial commit', tree_sha, [])
+
+    def put_blob(self, data):
+        sha = git_sha('blob', data)
+        self.blobs[sha] = data
+        return sha
+
+    def put_tree(self, entries):
+        sha = git_sha('tree', json.dumps(sorted(entries.items())).encode('utf-8'))
+        self.trees[sha] = dict(entries)
+        return sha
+
+    def put_commit(self, message, tree_sha, parents):
+        body = json.dumps({'message': message, 'tree': tree_sha, 'parents': parents, 'time': time.time()})
+        sha = git_sha('commit', body.encode('utf-8'))
+        self.commits[sha] = {'message': message, 'tree': tree_sha, 'parents': parents}
+        return sha
+
+    def head_tree(self, branch):
+        return self.trees[self.commits[self.refs[f"heads/{branch}"]]['tree']]
+
+    def commit_changes(self, branch, changes, message):
+        """Commit ``changes`` (path -> bytes, or None to delete) on top of ``branch``; returns the commit SHA"""
+        entries = dict(self.head_tree(branch))
+        for path, data in changes.items():
+            if data is None:
+                entries.pop(path, None)
+            else:
+                entries[path] = self.put_blob(data)
+        sha = self.put_commit(message, self.put_tree(entries), [self.refs[f"heads/{branch}"]])
+        self.refs[f"heads/{branch}"] = sha
+        self.writes += 1
+        return sha
+
+    def is_ancestor(self, ancestor, sha):
+        pending = [sha]
+        while pending:
+            current = pending.pop()
+            if current == ancestor:
+                return True
+            pending.extend(self.commits[current]['parents'])
+        return False
+
+
+class Faults:
+    """Latency, error and rate-limit injection; the defaults inject nothing"""
+
+    OPTIONS = {
+        'latency_ms': (float, 0),
+        'jitter_ms': (float, 0),
+        'write_latency_ms': (float, 0),
+        'error_rate': (float, 0.0),
+        'error_status': (int, 502),
+        'rate_limit': (int, 5000),
+        'rate_limit_window': (float, 3600),
+        'secondary_rate': (float, 0.0),
+        'conflict_rate': (float, 0.0),
+        'seed': (int, None),
+    }
+
+    def __init__(self, **options):
+        unknown = set(options) - set(self.OPTIONS)
+        if unknown:
+            raise Exception(f"Unknown fault option(s): {', '.join(sorted(unknown))}")
+        for name, (_, default) in self.OPTIONS.items():
+            setattr(self, name, options.get(name, default))
+        self.rng = random.Random(self.seed)
+        self.lock = threading.Lock()
+        self.window_started = time.time()
+        self.used = 0
+
+    @classmethod
+    def add_arguments(cls, parser):
+        for name, (kind, default) in cls.OPTIONS.items():
+            parser.add_argument(f"--{name.replace('_', '-')}", type=kind, default=default)
+
+    @classmethod
+    def from_args(cls, args):
+        return cls(**{name: getattr(args, name) for name in cls.OPTIONS})
+
+    def delay(self, write):
+        with self.lock:
+            jitter = self.rng.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0
+        return max(0, self.latency_ms + jitter + (self.write_latency_ms if write else 0)) / 1000
+
+    def roll(self, rate):
+        if not rate:
+            return False
+        with self.lock:
+            return self.rng.random() < rate
+
+    def consume(self):
+        """Count one call against the primary rate limit; returns False once it's used up"""
+        with self.lock:
+            self._roll_window()
+            if self.used >= self.rate_limit:
+                return False
+            self.used += 1
+            return True
+
+    def rate_status(self):
+        """(limit, remaining, reset epoch) for the current window"""
+        with self.lock:
+            self._roll_window()
+            return self.rate_limit, max(0, self.rate_limit - self.used), int(self.window_started + self.rate_limit_window)
+
+    def _roll_window(self):
+        now = time.time()
+        if now >= self.window_started + self.rate_limit_window:
+            self.window_started = now
+            self.used = 0
+
+    def describe(self):
+        return {name: getattr(self, name) for name in self.OPTIONS}
+
+
+class FakeGitHubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    ROUTES = [
+        ('GET', r'/repos/(?P<repo>[^/]+/[^/]+)', 'get_repo'),
+        ('GET', r'/repos/(?P<repo>[^/]+/[^/]+)/contents(?:/(?P<path>.*))?', 'get_contents'),
+        ('PUT', r'/repos/(?P<repo>[^/]+/[^/]+)/contents/(?P<path>.+)', 'put_contents'),
+        ('DELETE', r'/repos/(?P<repo>[^/]+/[^/]+)/contents/(?P<path>.+)', 'delete_contents'),
+        ('GET', r'/repos/(?P<repo>[^/]+/[^/]+)/git/refs/(?P<ref>.+)', 'get_ref'),
+        ('PATCH', r'/repos/(?P<repo>[^/]+/[^/]+)/git/refs/(?P<ref>.+)', 'update_ref'),
+        ('GET', r'/repos/(?P<repo>[^/]+/[^/]+)/git/commits/(?P<sha>[0-9a-f]+)', 'get_commit'),
+        ('POST', r'/repos/(?P<repo>[^/]+/[^/]+)/git/commits', 'create_commit'),
+        ('GET', r'/repos/(?P<repo>[^/]+/[^/]+)/git/trees/(?P<sha>[0-9a-f]+)', 'get_tree'),
+        ('POST', r'/repos/(?P<repo>[^/]+/[^/]+)/git/trees', 'create_tree'),
+        ('GET', r'/repos/(?P<repo>[^/]+/[^/]+)/git/blobs/(?P<sha>[0-9a-f]+)', 'get_blob'),
+        ('POST', r'/repos/(?P<repo>[^/]+/[^/]+)/git/blobs', 'create_blob'),
+        ('GET', r'/rate_limit', 'rate_limit'),
+        ('GET', r'/_fake/stats', 'fake_stats'),
+    ]
+
+    # Like GitHub, checking the rate limit doesn't count against it
+    UNMETERED = {'rate_limit', 'fake_stats'}
+
+    def log_message(self, format, *args):
+        pass
+
+    # -- plumbing -----------------------------------------------------------
+
+    def _dispatch(self):
+        path, _, query = self.path.partition('?')
+        path = urllib.parse.unquote(path)
+        self.query = dict(urllib.parse.parse_qsl(query))
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        self.body = json.loads(body) if body else {}
+
+        for method, pattern, handler in self.ROUTES:
+            match = re.fullmatch(pattern, path)
+            if method == self.command and match:
+                params = match.groupdict()
+                if 'repo' in params and params.pop('repo') != self.server.repo.full_name:
+                    return self.send_json(404, {'message': 'Not Found'})
+                if handler not in self.UNMETERED:
+                    if self.inject_fault():
+                        return
+                    self.server.count('requests', handler)
+                return getattr(self, handler)(**params)
+        self.send_json(404, {'message': 'Not Found'})
+
+    do_GET = do_POST = do_PATCH = do_PUT = do_DELETE = _dispatch
+
+    def inject_fault(self):
+        """Apply latency and maybe answer with an injected failure; returns True if it did"""
+        faults = self.server.faults
+        write = self.command != 'GET'
+        time.sleep(faults.delay(write))
+
+        if not faults.consume():
+            self.server.count('injected', 'rate_limited')
+            self.send_json(403, {
+                'message': 'API rate limit exceeded for user ID 1.',
+                'documentation_url': 'https://docs.github.com/rest/overview/resources-in-the-rest-api#rate-limiting',
+            })
+            return True
+        if write and faults.roll(faults.secondary_rate):
+            self.server.count('injected', 'secondary_rate_limited')
+            self.send_json(403, {
+                'message': 'You have exceeded a secondary rate limit. Please wait a few minutes before you try again.',
+                'documentation_url': 'https://docs.github.com/rest/overview/resources-in-the-rest-api#secondary-rate-limits',
+            }, headers={'Retry-After': '1'})
+            return True
+        if faults.roll(faults.error_rate):
+            self.server.count('injected', f"error_{faults.error_status}")
+            self.send_json(faults.error_status, {'message': 'Server Error'})
+            return True
+        return False
+
+    def send_json(self, status, payload, conditional=False, headers=None):
+        body = json.dumps(payload).encode('utf-8')
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        if conditional and self.headers.get('If-None-Match') == etag:
+            status, body = 304, b''
+        limit, remaining, reset = self.server.faults.rate_status()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.send_header('X-RateLimit-Limit', str(limit))
+        self.send_header('X-RateLimit-Remaining', str(remaining))
+        self.send_header('X-RateLimit-Reset', str(reset))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def api_url(self, path):
+        return f"{self.server.base_url}/repos/{self.server.repo.full_name}{path}"
+
+    # -- representations ----------------------------------------------------
+
+    def repo_json(self):
+        repo = self.server.repo
+        owner, name = repo.full_name.split('/')
+        return {
+            'id': 1,
+            'name': name,
+            'full_name': repo.full_name,
+            'owner': {'login': owner, 'type': 'User'},
+            'private': True,
+            'default_branch': repo.default_branch,
+            'url': self.api_url(''),
+        }
+
+    def content_json(self, path, blob_sha, with_content=True):
+        data = self.server.repo.blobs[blob_sha]
+        content = {
+            'type': 'file',
+            'name': path.rsplit('/', 1)[-1],
+            'path': path,
+            'sha': blob_sha,
+            'size': len(data),
+            'url': self.api_url(f"/contents/{path}"),
+            'git_url': self.api_url(f"/git/blobs/{blob_sha}"),
+        }
+        if with_content:
+            content.update(encoding='base64', content=base64.b64encode(data).decode('ascii'))
+        return content
+
+    def ref_json(self, ref):
+        sha = self.server.repo.refs[ref]
+        return {
+            'ref': f"refs/{ref}",
+            'url': self.api_url(f"/git/refs/{ref}"),
+            'object': {'sha': sha, 'type': 'commit', 'url': self.api_url(f"/git/commits/{sha}")},
+        }
+
+    def commit_json(self, sha):
+        commit = self.server.repo.commits[sha]
+        return {
+            'sha': sha,
+            'url': self.api_url(f"/git/commits/{sha}"),
+            'message': commit['message'],
+            'tree': {'sha': commit['tree'], 'url': self.api_url(f"/git/trees/{commit['tree']}")},
+            'parents': [{'sha': parent, 'url': self.api_url(f"/git/commits/{parent}")} for parent in commit['parents']],
+        }
+
+    def tree_json(self, sha):
+        entries = self.server.repo.trees[sha]
+        return {
+            'sha': sha,
+            'url': self.api_url(f"/git/trees/{sha}"),
+            'truncated': False,
+            'tree': [
+                {'path': path, 'mode': '100644', 'type': 'blob', 'sha': blob_sha,
+                 'size': len(self.server.repo.blobs[blob_sha]), 'url': self.api_url(f"/git/blobs/{blob_sha}")}
+                for path, blob_sha in sorted(entries.items())
+            ],
+        }
+
+    # -- endpoints ----------------------------------------------------------
+
+    def get_repo(self):
+        self.send_json(200, self.repo_json(), conditional=True)
+
+    def get_contents(self, path=None):
+        repo = self.server.repo
+        path = (path or '').strip('/')
+        branch = self.query.get('ref', repo.default_branch)
+        with repo.lock:
+            if f"heads/{branch}" not in repo.refs:
+                return self.send_json(404, {'message': f"No commit found for the ref {branch}"})
+            tree = repo.head_tree(branch)
+            if path in tree:
+                return self.send_json(200, self.content_json(path, tree[path]), conditional=True)
+
+            # A directory: list its immediate children
+            prefix = f"{path}/" if path else ''
+            children = {}
+            for entry_path, blob_sha in tree.items():
+                if entry_path.startswith(prefix):
+                    name, _, rest = entry_path[len(prefix):].partition('/')
+                    children[name] = None if rest else blob_sha
+            if not children:
+                return self.send_json(404, {'message': 'Not Found'})
+            listing = [
+                self.content_json(prefix + name, blob_sha, with_content=False) if blob_sha else
+                {'type': 'dir', 'name': name, 'path': prefix + name, 'sha': git_sha('tree', (prefix + name).encode('utf-8')),
+                 'size': 0, 'url': self.api_url(f"/contents/{prefix}{name}")}
+                for name, blob_sha in sorted(children.items())
+            ]
+            self.send_json(200, listing, conditional=True)
+
+    def put_contents(self, path):
+        repo = self.server.repo
+        branch = self.body.get('branch', repo.default_branch)
+        with repo.lock:
+            if f"heads/{branch}" not in repo.refs:
+                return self.send_json(404, {'message': f"Branch {branch} not found"})
+            existing = repo.head_tree(branch).get(path)
+            if existing and self.body.get('sha') != existing:
+                return self.send_json(409, {'message': f"{path} does not match {self.body.get('sha')}"})
+            if not existing and self.body.get('sha'):
+                return self.send_json(422, {'message': f"{path} does not exist"})
+            commit_sha = repo.commit_changes(branch, {path: base64.b64decode(self.body['content'])}, self.body['message'])
+            blob_sha = repo.head_tree(branch)[path]
+            self.send_json(200 if existing else 201, {
+                'content': self.content_json(path, blob_sha, with_content=False),
+                'commit': self.commit_json(commit_sha),
+            })
+
+    def delete_contents(self, path):
+        repo = self.server.repo
+        branch = self.body.get('branch', repo.default_branch)
+        with repo.lock:
+            if f"heads/{branch}" not in repo.refs:
+                return self.send_json(404, {'message': f"Branch {branch} not found"})
+            existing = repo.head_tree(branch).get(path)
+            if not existing:
+                return self.send_json(404, {'message': 'Not Found'})
+            if self.body.get('sha') != existing:
+                return self.send_json(409, {'message': f"{path} does not match {self.body.get('sha')}"})
+            commit_sha = repo.commit_changes(branch, {path: None}, self.body['message'])
+            self.send_json(200, {'content': None, 'commit': self.commit_json(commit_sha)})
+
+    def get_ref(self, ref):
+        with self.server.repo.lock:
+            if ref not in self.server.repo.refs:
+                return self.send_json(404, {'message': 'Not Found'})
+            self.send_json(200, self.ref_json(ref), conditional=True)
+
+    def update_ref(self, ref):
+        repo = self.server.repo
+        with repo.lock:
+            sha = self.body['sha']
+            if ref not in repo.refs or sha not in repo.commits:
+                return self.send_json(422, {'message': 'Reference update failed'})
+            if self.server.faults.roll(self.server.faults.conflict_rate):
+                # Someone else pushed first; the update below is no longer a fast-forward
+                self.server.count('injected', 'conflicts')
+                head = repo.refs[ref]
+                repo.refs[ref] = repo.put_commit('Concurrent push', repo.commits[head]['tree'], [head])
+            if not self.body.get('force') and not repo.is_ancestor(repo.refs[ref], sha):
+                return self.send_json(422, {'message': 'Update is not a fast forward'})
+            repo.refs[ref] = sha
+            repo.writes += 1
+            self.send_json(200, self.ref_json(ref))
+
+    def get_commit(self, sha):
+        with self.server.repo.lock:
+            if sha not in self.server.repo.commits:
+                return self.send_json(404, {'message': 'Not Found'})
+            self.send_json(200, self.commit_json(sha), conditional=True)
+
+    def create_commit(self):
+        repo = self.server.repo
+        with repo.lock:
+            parents = self.body.get('parents', [])
+            if self.body['tree'] not in repo.trees or any(p not in repo.commits for p in parents):
+                return self.send_json(422, {'message': 'Tree or parent SHA not found'})
+            sha = repo.put_commit(self.body['message'], self.body['tree'], parents)
+            repo.writes += 1
+            self.send_json(201, self.commit_json(sha))
+
+    def get_tree(self, sha):
+        with self.server.repo.lock:
+            if sha not in self.server.repo.trees:
+                return self.send_json(404, {'message': 'Not Found'})
+            self.send_json(200, self.tree_json(sha), conditional=True)
+
+    def create_tree(self):
+        repo = self.server.repo
+        with repo.lock:
+            base = self.body.get('base_tree')
+            if base and base not in repo.trees:
+                return self.send_json(422, {'message': 'base_tree not found'})
+            entries = dict(repo.trees[base]) if base else {}
+            for element in self.body['tree']:
+                if element.get('sha') is None and 'content' not in element:
+                    entries.pop(element['path'], None)
+                elif 'content' in element:
+                    entries[element['path']] = repo.put_blob(element['content'].encode('utf-8'))
+                elif element['sha'] in repo.blobs:
+                    entries[element['path']] = element['sha']
+                else:
+                    return self.send_json(422, {'message': f"Blob {element['sha']} not found"})
+            sha = repo.put_tree(entries)
+            repo.writes += 1
+            self.send_json(201, self.tree_json(sha))
+
+    def get_blob(self, sha):
+        with self.server.repo.lock:
+            data = self.server.repo.blobs.get(sha)
+        if data is None:
+            return self.send_json(404, {'message': 'Not Found'})
+        self.send_json(200, {'sha': sha, 'size': len(data), 'encoding': 'base64',
+                             'content': base64.b64encode(data).decode('ascii'), 'url': self.api_url(f"/git/blobs/{sha}")})
+
+    def create_blob(self):
+        repo = self.server.repo
+        content = self.body['content']
+        data = base64.b64decode(content) if self.body.get('encoding') == 'base64' else content.encode('utf-8')
+        with repo.lock:
+            sha = repo.put_blob(data)
+            repo.writes += 1
+        self.send_json(201, {'sha': sha, 'url': self.api_url(f"/git/blobs/{sha}")})
+
+    def rate_limit(self):
+        limit, remaining, reset = self.server.faults.rate_status()
+        core = {'limit': limit, 'remaining': remaining, 'reset': reset, 'used': limit - remaining}
+        self.send_json(200, {'resources': {'core': core}, 'rate': core})
+
+    def fake_stats(self):
+        self.send_json(200, self.server.stats())
+
+
+class FakeGitHubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, address, repo, faults):
+        super().__init__(address, FakeGitHubHandler)
+        self.repo = repo
+        self.faults = faults
+        self.base_url = f"http://{address[0]}:{self.server_address[1]}"
+        self.counters = {'requests': Counter(), 'injected': Counter()}
+        self.counters_lock = threading.Lock()
+
+    def count(self, kind, name):
+        with self.counters_lock:
+            self.counters[kind][name] += 1
+
+    def stats(self):
+        """Calls served per endpoint, failures injected, and the repository's size"""
+        with self.counters_lock:
+            counters = {kind: dict(counter) for kind, counter in self.counters.items()}
+        with self.repo.lock:
+            files = len(self.repo.head_tree(self.repo.default_branch))
+            writes = self.repo.writes
+        return dict(counters, writes=writes, files=files, faults=self.faults.describe())
+
+
+class FakeGitHub:
+    """Runs the fake API on a background thread; use as a context manager"""
+
+    def __init__(self, repo='owner/blog', branch='main', host='127.0.0.1', port=0, faults=None):
+        self.server = FakeGitHubServer((host, port), FakeRepository(repo, branch), faults or Faults())
+        self._thread = threading.Thread(target=self.server.serve_forever, name='fake-github', daemon=True)
+
+    @property
+    def url(self):
+        return self.server.base_url
+
+    @property
+    def repo(self):
+        return self.server.repo
+
+    def files(self, branch='main'):
+        """Paths and contents at the head of ``branch``"""
+        repo = self.server.repo
+        with repo.lock:
+            return {path: repo.blobs[sha] for path, sha in repo.head_tree(branch).items()}
+
+    def stats(self):
+        return self.server.stats()
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--port', type=int, default=8770)
+    parser.add_argument('--repo', default='owner/blog')
+    parser.add_argument('--branch', default='main')
+    Faults.add_arguments(parser)
+    args = parser.parse_args()
+
+    fake = FakeGitHub(args.repo, args.branch, port=args.port, faults=Faults.from_args(args))
+    print(f"Fake GitHub API for {args.repo} at {fake.url} (set GITHUB_API_URL to this)")
+    injected = {name: value for name, value in fake.server.faults.describe().items() if value != Faults.OPTIONS[name][1]}
+    if injected:
+        print(f"  faults: {', '.join(f'{name}={value}' for name, value in injected.items())}")
+    try:
+        fake.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Local HTTP server for the recorded page corpus and synthetic image set.
+
+Serves fixtures/html/<name>.html at /pages/<name> and the images listed in
+fixtures/images/manifest.json at /images/<name>, so benchmarks never touch
+the network. Images are generated deterministically on first request (a
+photo-like gradient with noise, in the recorded size and format) and
+cached; ``?seed=N`` gives a visually different image of the same shape,
+which defeats the app's content-addressed and perceptual-hash dedup.
+
+Pages accept ``?pad_head_kb=N`` and ``?pad_body_kb=N`` to stand in for
+heavy news sites (inline JSON bundles in <head>, long article bodies), and
+every route accepts ``?delay_ms=N`` to simulate a slow origin.
+
+Usage:
+    python benchmarks/fixture_server.py [--port 8771]
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+import urllib.parse
+from io import BytesIO
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from PIL import Image
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), '..', 'fixtures')
+HTML_DIR = os.path.join(FIXTURES_DIR, 'html')
+
+with open(os.path.join(FIXTURES_DIR, 'images', 'manifest.json'), encoding='utf-8') as f:
+    IMAGE_MANIFEST = json.load(f)
+
+# Relative <img> paths in the recorded pages resolve to small placeholder images
+ASSET_PREFIXES = ('/media/', '/img/', '/images/')
+
+MIME_TYPES = {'JPEG': 'image/jpeg', 'PNG': 'image/png', 'WEBP': 'image/webp', 'GIF': 'image/gif'}
+
+
+def make_image(width, height, fmt='JPEG', mode='RGB', quality=85, seed=0):
+    """Photo-like test image: gradients plus noise so encoders and resizers have real work to do"""
+    rng = random.Random(seed)
+    gradient = Image.linear_gradient('L').resize((width, height))
+    if seed:
+        gradient = gradient.rotate(rng.randrange(360))
+    # Seeded, so the same (name, seed) always produces the same bytes
+    grain = (max(1, width // 3), max(1, height // 3))
+    noise = Image.frombytes('L', grain, rng.randbytes(grain[0] * grain[1])).resize((width, height))
+    img = Image.merge('RGB', (gradient, noise, gradient.transpose(Image.Transpose.FLIP_LEFT_RIGHT)))
+    if mode == 'RGBA':
+        img.putalpha(gradient.transpose(Image.Transpose.FLIP_TOP_BOTTOM))
+    elif mode == 'P':
+        img = img.convert('P', palette=Image.Palette.ADAPTIVE)
+
+    output = BytesIO()
+    options = {'quality': quality} if fmt in ('JPEG', 'WEBP') else {}
+    img.save(output, fmt, **options)
+    return output.getvalue()
+
+
+def pad_page(html, pad_head_kb=0, pad_body_kb=0):
+    """Inflate a recorded page the way heavy sites are: a big inline script in <head>, a long body"""
+    if pad_head_kb:
+        blob = json.dumps({'articles': ['x' * 1000] * pad_head_kb})
+        html = html.replace(b'</title>', b'</title>\n<script>window.__STATE__ = ' + blob.encode('ascii') + b';</script>', 1)
+    if pad_body_kb:
+        paragraph = b'<p>' + b'Lorem ipsum dolor sit amet, consectetur adipiscing elit. ' * 17 + b'</p>\n'
+        html = html.replace(b'</body>', paragraph * pad_body_kb + b'</body>', 1)
+    return html
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Headers and body go out in separate writes; without this, Nagle plus
+    # delayed ACKs add ~40 ms to every keep-alive response
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        parts = urllib.parse.urlsplit(self.path)
+        params = dict(urllib.parse.parse_qsl(parts.query))
+        path = urllib.parse.unquote(parts.path)
+        if params.get('delay_ms'):
+            time.sleep(int(params['delay_ms']) / 1000)
+
+        if path.startswith('/pages/'):
+            name = path[len('/pages/'):]
+            page_path = os.path.join(HTML_DIR, f"{name}.html")
+            if '/' in name or not os.path.exists(page_path):
+                return self.send_body(404, b'Not found', 'text/plain')
+            with open(page_path, 'rb') as f:
+                html = pad_page(f.read(), int(params.get('pad_head_kb', 0)), int(params.get('pad_body_kb', 0)))
+            return self.send_body(200, html, 'text/html')
+
+        name = path.rsplit('/', 1)[-1]
+        if path.startswith('/images/') and name in IMAGE_MANIFEST:
+            spec = IMAGE_MANIFEST[name]
+            data = self.server.image(name, int(params.get('seed', 0)))
+            return self.send_body(200, data, MIME_TYPES[spec['format']])
+
+        if path.startswith(ASSET_PREFIXES):
+            return self.send_body(200, self.server.placeholder(), 'image/jpeg')
+
+        self.send_body(404, b'Not found', 'text/plain')
+
+    def send_body(self, status, body, content_type):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class FixtureHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # The default backlog of 5 drops SYNs under a concurrent burst, costing a 1 s retransmit
+    request_queue_size = 128
+
+    def handle_error(self, request, client_address):
+        # The app stops reading pages once it has the <head>, so hang-ups are expected
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class Fixtures:
+    """URLs for a running fixture server; cheap to pass to other processes"""
+
+    def __init__(self, url):
+        self.url = url
+
+    def page_url(self, name, **params):
+        query = urllib.parse.urlencode(params)
+        return f"{self.url}/pages/{name}{'?' + query if query else ''}"
+
+    def image_url(self, name, **params):
+        query = urllib.parse.urlencode(params)
+        return f"{self.url}/images/{name}{'?' + query if query else ''}"
+
+
+class FixtureServer(Fixtures):
+    """Runs the fixture server on a background thread; use as a context manager"""
+
+    def __init__(self, host='127.0.0.1', port=0):
+        self.server = FixtureHTTPServer((host, port), FixtureHandler)
+        self.server.image = self.image
+        self.server.placeholder = self.placeholder
+        super().__init__(f"http://{host}:{self.server.server_address[1]}")
+        self._images = {}
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self.server.serve_forever, name='fixture-server', daemon=True)
+
+    def image(self, name, seed=0):
+        """Bytes for a manifest image, generated once per (name, seed)"""
+        key = (name, seed)
+        with self._lock:
+            if key not in self._images:
+                spec = IMAGE_MANIFEST[name]
+                self._images[key] = make_image(spec['width'], spec['height'], spec['format'],
+                                               spec.get('mode', 'RGB'), spec.get('quality', 85), seed)
+            return self._images[key]
+
+    def placeholder(self):
+        with self._lock:
+            if 'placeholder' not in self._images:
+                self._images['placeholder'] = make_image(320, 240, quality=70)
+            return self._images['placeholder']
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--port', type=int, default=8771)
+    args = parser.parse_args()
+
+    fixtures = FixtureServer(port=args.port)
+    print(f"Serving fixtures at {fixtures.url}")
+    print(f"  pages:  {', '.join(f'/pages/{name[:-5]}' for name in sorted(os.listdir(HTML_DIR)) if name.endswith('.html'))}")
+    print(f"  images: {', '.join(f'/images/{name}' for name in sorted(IMAGE_MANIFEST))}")
+    try:
+        fixtures.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Load test production.py under each WEB_SERVER mode.
+
+Starts the server in debug mode (no GitHub needed) once per mode and drives
+it with a mix of fast requests (the page shell and /cache-status) and slow
+ones (/fetch-metadata against a local upstream that takes --upstream-delay
+seconds to answer, standing in for a sluggish site). Every client keeps its
+connection alive, the way the Cloudflare tunnel does. Reports throughput
+and p50/p99 latency per request kind.
+
+Usage:
+    python benchmarks/load_test.py [--duration 20] [--clients 32] [--modes werkzeug,gunicorn]
+"""
+
+import os
+import sys
+import time
+import argparse
+import subprocess
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import requests
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+
+UPSTREAM_PAGE = b"""<!DOCTYPE html><html><head><title>Slow page</title>
+<meta property="og:image" content="/hero.jpg"></head><body><p>Hello</p></body></html>"""
+
+
+class SlowUpstream(BaseHTTPRequestHandler):
+    delay = 1.0
+
+    def do_GET(self):
+        time.sleep(self.delay)
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(UPSTREAM_PAGE)))
+        self.end_headers()
+        self.wfile.write(UPSTREAM_PAGE)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def start_server(mode, port, args):
+    env = dict(os.environ, DEBUG_MODE='true', HOST='127.0.0.1', PORT=str(port), WEB_SERVER=mode,
+               WEB_WORKERS=str(args.workers), WEB_THREADS=str(args.threads), METADATA_CACHE_DB='')
+    process = subprocess.Popen([sys.executable, 'production.py'], cwd=ROOT, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            requests.get(f"http://127.0.0.1:{port}/cache-status", timeout=1)
+            return process
+        except requests.RequestException:
+            time.sleep(0.2)
+    process.kill()
+    raise Exception(f"{mode} server did not start on port {port}")
+
+
+def client(base_url, upstream_url, slow, stop, results, counter):
+    session = requests.Session()
+    while not stop.is_set():
+        if slow:
+            kind = 'slow'
+            with counter['lock']:
+                counter['n'] += 1
+                n = counter['n']
+            call = lambda: session.post(f"{base_url}/fetch-metadata", json={'url': f"{upstream_url}/page?n={n}"}, timeout=60)
+        else:
+            kind = 'fast'
+            call = lambda: session.get(f"{base_url}/cache-status", timeout=60)
+        start = time.perf_counter()
+        try:
+            ok = call().status_code == 200
+        except requests.RequestException:
+            ok = False
+        results.append((kind, time.perf_counter() - start, ok))
+
+
+def run_load(mode, port, upstream_url, args):
+    process = start_server(mode, port, args)
+    try:
+        base_url = f"http://127.0.0.1:{port}"
+        stop = threading.Event()
+        results = []
+        counter = {'n': 0, 'lock': threading.Lock()}
+        slow_clients = max(1, int(args.clients * args.slow_fraction))
+        threads = [
+            threading.Thread(target=client, args=(base_url, upstream_url, i < slow_clients, stop, results, counter))
+            for i in range(args.clients)
+        ]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        time.sleep(args.duration)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+    for kind in ('fast', 'slow'):
+        latencies = [r[1] for r in results if r[0] == kind and r[2]]
+        errors = sum(1 for r in results if r[0] == kind and not r[2])
+        print(f"{mode:>9}  {kind:>4}  {len(latencies) / elapsed:8.1f}  "
+              f"{percentile(latencies, 50) * 1000:8.1f}  {percentile(latencies, 99) * 1000:8.1f}  {errors:6d}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--duration', type=float, default=20)
+    parser.add_argument('--clients', type=int, default=32)
+    parser.add_argument('--slow-fraction', type=float, default=0.25, help='share of clients hitting the slow endpoint')
+    parser.add_argument('--upstream-delay', type=float, default=1.0)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--modes', default='werkzeug,gunicorn')
+    parser.add_argument('--port', type=int, default=5099)
+    args = parser.parse_args()
+
+    SlowUpstream.delay = args.upstream_delay
+    upstream = ThreadingHTTPServer(('127.0.0.1', 0), SlowUpstream)
+    threading.Thread(target=upstream.serve_forever, daemon=True).start()
+    upstream_url = f"http://127.0.0.1:{upstream.server_address[1]}"
+
+    print(f"{args.clients} clients for {args.duration:.0f}s each, upstream delay {args.upstream_delay}s")
+    print(f"{'server':>9}  {'kind':>4}  {'req/s':>8}  {'p50 ms':>8}  {'p99 ms':>8}  {'errors':>6}")
+    for mode in args.modes.split(','):
+        run_load(mode, args.port, upstream_url, args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Load test the publish path against the fake GitHub API.
+
+Hosts fake_github.py in this process and runs production.py's server (gunicorn
+or werkzeug) in a child process pointed at it, with scratch databases, so
+every post goes through the real image download, processing and Git Data
+commit path, just into an in-memory repository. Images come from
+fixture_server.py with a fresh seed per post so nothing is deduplicated.
+--clients concurrent clients post for --duration seconds; the report gives
+publish throughput, p50/p95/p99 latency, failures, and what the fake API saw
+(calls per endpoint and the faults it injected).
+
+Usage:
+    python benchmarks/publish_load_test.py [--duration 30] [--clients 8] [--latency-ms 150 --error-rate 0.02]
+    python benchmarks/publish_load_test.py --async-publish   # queue posts and poll /jobs/<id>
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import threading
+import itertools
+import multiprocessing
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_github import FakeGitHub, Faults
+from fixture_server import FixtureServer, IMAGE_MANIFEST
+from load_test import percentile
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+TOKEN = 'publish-load-test'
+
+
+def serve(env):
+    """Child process: run production.py's server with ``env`` applied, output discarded"""
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, 1)
+    os.dup2(devnull, 2)
+    os.environ.update(env)
+    os.chdir(ROOT)
+    sys.path.insert(0, ROOT)
+    import production
+
+    reload_env = production.post_fork
+    def post_fork(server, worker):
+        reload_env(server, worker)
+        # post_fork re-reads .env; a real token or repository must not leak back in
+        os.environ.update(env)
+    production.post_fork = post_fork
+
+    if production.WEB_SERVER == 'werkzeug':
+        production.run_werkzeug()
+    else:
+        production.run_gunicorn()
+
+
+def start_server(port, github, scratch_dir, args):
+    env = {
+        'HOST': '127.0.0.1', 'PORT': str(port), 'WEB_SERVER': args.server,
+        'WEB_WORKERS': str(args.workers), 'WEB_THREADS': str(args.threads),
+        'DEBUG_MODE': 'false', 'GITHUB_API_URL': github.url, 'GITHUB_TOKEN': 'fake-github-token',
+        'GITHUB_REPO': github.repo.full_name, 'GITHUB_BRANCH': github.repo.default_branch,
+        'LINK_POSTER_TOKEN': TOKEN, 'FLASK_SECRET_KEY': 'publish-load-test',
+        'ASYNC_PUBLISH': 'true' if args.async_publish else 'false',
+        'GITHUB_SECONDS_BETWEEN_WRITES': str(args.seconds_between_writes), 'METADATA_CACHE_DB': '',
+        'IMAGE_INDEX_DB': os.path.join(scratch_dir, 'image_index.db'),
+        'PUBLISH_QUEUE_DB': os.path.join(scratch_dir, 'publish_queue.db'),
+        'PROMETHEUS_MULTIPROC_DIR': os.path.join(scratch_dir, 'metrics'),
+    }
+    process = multiprocessing.get_context('spawn').Process(target=serve, args=(env,), name='publish-load-test-server')
+    process.start()
+    deadline = time.time() + 60
+    while time.time() < deadline and process.is_alive():
+        try:
+            requests.get(f"http://127.0.0.1:{port}/cache-status", timeout=1)
+            return process
+        except requests.RequestException:
+            time.sleep(0.2)
+    process.kill()
+    raise Exception(f"Server did not start on port {port}")
+
+
+def publish(session, base_url, payload, async_publish):
+    """Create one post; returns None on success or a short failure description"""
+    response = session.post(f"{base_url}/create-post", json=dict(payload, **{'async': async_publish}), timeout=300)
+    if not async_publish:
+        return None if response.status_code == 200 else f"HTTP {response.status_code}: {response.json().get('error', '')[:60]}"
+    if response.status_code != 202:
+        return f"HTTP {response.status_code}"
+
+    status_url = f"{base_url}{response.json()['status_url']}"
+    while True:
+        job = session.get(status_url, timeout=30).json()
+        if job['status'] == 'done':
+            return None
+        if job['status'] == 'failed':
+            return f"job failed: {(job.get('error') or '')[:60]}"
+        time.sleep(0.1)
+
+
+def client(base_url, fixtures, args, stop, results, sequence):
+    session = requests.Session()
+    session.post(f"{base_url}/login", json={'token': TOKEN}, timeout=30).raise_for_status()
+    while not stop.is_set():
+        n = next(sequence)
+        payload = {
+            'url': fixtures.page_url('news_article', n=n),
+            'title': f"Load test post {n}",
+            'description': 'Published by the publish load test',
+            'source': 'example-news.com',
+        }
+        if args.image:
+            payload['image'] = fixtures.image_url(args.image, seed=n)
+        start = time.perf_counter()
+        try:
+            failure = publish(session, base_url, payload, args.async_publish)
+        except requests.RequestException as e:
+            failure = type(e).__name__
+        results.append((time.perf_counter() - start, failure))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--duration', type=float, default=30)
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--image', default='hero_2400x1350', help=f"manifest image per post, or '' for none ({', '.join(sorted(IMAGE_MANIFEST))})")
+    parser.add_argument('--async-publish', action='store_true', help='queue posts and poll /jobs/<id> until done')
+    parser.add_argument('--server', default='gunicorn', choices=('gunicorn', 'werkzeug'))
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--seconds-between-writes', type=float, default=0.25, help='GITHUB_SECONDS_BETWEEN_WRITES')
+    parser.add_argument('--port', type=int, default=5098)
+    Faults.add_arguments(parser)
+    args = parser.parse_args()
+
+    if args.image and args.image not in IMAGE_MANIFEST:
+        parser.error(f"unknown image {args.image}")
+
+    scratch_dir = tempfile.mkdtemp(prefix='hugo-post-load-test-')
+    with FixtureServer() as fixtures, FakeGitHub(faults=Faults.from_args(args)) as github:
+        if args.image:
+            # The first request for each seed generates the image; do a few up front
+            for seed in range(args.clients):
+                fixtures.image(args.image, seed)
+        process = start_server(args.port, github, scratch_dir, args)
+        try:
+            base_url = f"http://127.0.0.1:{args.port}"
+            stop = threading.Event()
+            results = []
+            sequence = itertools.count()
+            threads = [
+                threading.Thread(target=client, args=(base_url, fixtures, args, stop, results, sequence))
+                for _ in range(args.clients)
+            ]
+            start = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            time.sleep(args.duration)
+            stop.set()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - start
+            stats = github.stats()
+        finally:
+            process.terminate()
+            process.join(timeout=60)
+            shutil.rmtree(scratch_dir, ignore_errors=True)
+
+    latencies = [latency for latency, failure in results if failure is None]
+    failures = [failure for _, failure in results if failure is not None]
+    mode = 'async' if args.async_publish else 'sync'
+    print(f"{args.clients} clients for {elapsed:.0f}s, {mode} publish, {args.server} "
+          f"{args.workers}x{args.threads}, image: {args.image or 'none'}")
+    print(f"{'posts':>6}  {'posts/s':>8}  {'p50 ms':>8}  {'p95 ms':>8}  {'p99 ms':>8}  {'failed':>6}")
+    print(f"{len(latencies):6d}  {len(latencies) / elapsed:8.2f}  {percentile(latencies, 50) * 1000:8.0f}  "
+          f"{percentile(latencies, 95) * 1000:8.0f}  {percentile(latencies, 99) * 1000:8.0f}  {len(failures):6d}")
+    for failure in sorted(set(failures)):
+        print(f"  {failures.count(failure):4d} × {failure}")
+
+    print(f"\nFake GitHub: {stats['writes']} writes, {stats['files']} files in the repository")
+    print(f"  calls:    {', '.join(f'{name} {count}' for name, count in sorted(stats['requests'].items()))}")
+    if stats['injected']:
+        print(f"  injected: {', '.join(f'{name} {count}' for name, count in sorted(stats['injected'].items()))}")
+
+
+if __name__ == '__main__':
+    main()
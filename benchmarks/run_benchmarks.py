@@ -0,0 +1,448 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark suite with JSON baselines.
+
+Runs the app's hot paths against local stand-ins only: the recorded page
+corpus and synthetic images from fixture_server.py, and the in-memory
+GitHub API from fake_github.py. Each benchmark runs in a fresh interpreter
+so its peak RSS is its own. Results are compared with
+benchmarks/baselines.json; a throughput drop, latency rise or memory growth
+beyond the tolerance is reported as a regression and the script exits 1.
+
+Fixtures are generated and connection pools opened before timing starts, so
+the numbers are steady state. Baselines are the median of --repeat runs, and
+record a tolerance per metric: the spread (max - min, over the median) seen
+across those runs, never less than --tolerance. Record them with --repeat 5
+or more; runs with a different --iterations aren't compared.
+
+Benchmarks:
+    fetch_metadata        fetch_url_metadata over the corpus, plus padded heavy pages
+    fetch_metadata_async  fetch_url_metadata_async, --concurrency at a time; no faster than
+                          fetch_metadata here, as a local origin has no latency to overlap
+    playwright            fetch_url_metadata_with_playwright_async (skipped without a browser)
+    process_image         download_and_process_image over every manifest image
+    create_post           POST /create-post with an image, committed to the fake GitHub
+    create_posts          POST /create-posts, --batch-size posts with images per commit
+
+Usage:
+    python benchmarks/run_benchmarks.py [--only fetch_metadata,create_post] [--iterations 3]
+    python benchmarks/run_benchmarks.py --update-baseline --repeat 5
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import logging
+import argparse
+import platform
+import resource
+import tempfile
+import urllib.request
+from multiprocessing import get_context
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_github import FakeGitHub
+from fixture_server import Fixtures, FixtureServer, HTML_DIR, IMAGE_MANIFEST
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baselines.json')
+
+# Corpus pages as recorded, plus inflated variants standing in for heavy news sites
+with open(os.path.join(HTML_DIR, 'corpus.json'), encoding='utf-8') as f:
+    PAGES = [(name, {}) for name in sorted(json.load(f))]
+PAGES += [
+    ('news_article', {'pad_head_kb': 300, 'pad_body_kb': 200}),
+    ('lazy_gallery', {'pad_body_kb': 500}),
+]
+
+JPEG_IMAGES = sorted(name for name, spec in IMAGE_MANIFEST.items() if spec['format'] == 'JPEG')
+
+# Relative change that counts as a regression unless a baseline records a
+# wider one, and the memory growth below which a change is treated as noise
+# whatever its relative size
+DEFAULT_TOLERANCE = 0.20
+RSS_NOISE_MB = 8.0
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def memory_kb(field):
+    """VmRSS or VmHWM (peak) of this process in KB, from /proc where available"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def warm(url):
+    """Request a fixture once so the server has generated it before timing starts"""
+    with urllib.request.urlopen(url) as response:
+        response.read()
+
+
+def manifest_images(args):
+    """(name, seed, ext) for every image process_image downloads"""
+    return [(name, iteration, 'png' if spec['format'] == 'PNG' else 'jpg')
+            for iteration in range(args.iterations) for name, spec in sorted(IMAGE_MANIFEST.items())]
+
+
+def post_images(fixtures, count, first_seed):
+    """Fresh JPEG URLs for ``count`` posts, so nothing is deduplicated"""
+    return [fixtures.image_url(JPEG_IMAGES[i % len(JPEG_IMAGES)], seed=first_seed + i) for i in range(count)]
+
+
+def warm_fetch_metadata(app, fixtures, args):
+    for name, params in PAGES:
+        warm(fixtures.page_url(name, **params))
+    app.fetch_url_metadata(fixtures.page_url(PAGES[0][0]))
+
+
+def warm_fetch_metadata_async(app, fixtures, args):
+    # The first async fetch starts the fetch loop and builds its client
+    # (~250 ms); timed, every fetch in the first --concurrency wave waits on it
+    for name, params in PAGES:
+        warm(fixtures.page_url(name, **params))
+    asyncio.run(app.fetch_url_metadata_async(fixtures.page_url(PAGES[0][0])))
+
+
+def warm_process_image(app, fixtures, args):
+    for name, seed, _ in manifest_images(args):
+        warm(fixtures.image_url(name, seed=seed))
+
+
+def authenticated_client(app):
+    client = app.app.test_client()
+    with client.session_transaction() as session:
+        session['authenticated'] = True
+    return client
+
+
+def publish_first_post(app, fixtures):
+    # The first post opens the GitHub client, image index and publish queue
+    # and resolves the repository; later posts reuse them
+    url = post_images(fixtures, 1, 999)[0]
+    warm(url)
+    response = authenticated_client(app).post('/create-post', json={
+        'url': fixtures.page_url('news_article', n=999),
+        'title': f"Benchmark warm-up {time.time_ns()}",
+        'description': 'Posted by the offline benchmark suite',
+        'image': url,
+        'source': 'example-news.com',
+    })
+    if response.status_code != 200:
+        raise Exception(f"warm-up create-post returned {response.status_code}: {response.get_json()}")
+
+
+def warm_create_post(app, fixtures, args):
+    for url in post_images(fixtures, args.iterations * len(JPEG_IMAGES), 1000):
+        warm(url)
+    publish_first_post(app, fixtures)
+
+
+def warm_create_posts(app, fixtures, args):
+    for url in post_images(fixtures, args.iterations * args.batch_size, 2000):
+        warm(url)
+    publish_first_post(app, fixtures)
+
+
+def bench_fetch_metadata(app, fixtures, args):
+    latencies = []
+    for _ in range(args.iterations):
+        for name, params in PAGES:
+            start = time.perf_counter()
+            metadata = app.fetch_url_metadata(fixtures.page_url(name, **params))
+            latencies.append(time.perf_counter() - start)
+            if 'error' in metadata:
+                raise Exception(f"{name}: {metadata['error']}")
+    return latencies
+
+
+def bench_fetch_metadata_async(app, fixtures, args):
+    urls = [fixtures.page_url(name, **params) for name, params in PAGES] * args.iterations
+    latencies = []
+
+    async def fetch_all():
+        semaphore = asyncio.Semaphore(args.concurrency)
+
+        async def fetch(url):
+            async with semaphore:
+                start = time.perf_counter()
+                metadata = await app.fetch_url_metadata_async(url)
+                latencies.append(time.perf_counter() - start)
+                if 'error' in metadata:
+                    raise Exception(f"{url}: {metadata['error']}")
+
+        await asyncio.gather(*(fetch(url) for url in urls))
+
+    asyncio.run(fetch_all())
+    return latencies
+
+
+def bench_playwright(app, fixtures, args):
+    latencies = []
+
+    async def scrape_all():
+        for _ in range(args.iterations):
+            for name in ('lazy_gallery', 'news_article', 'youtube_watch'):
+                start = time.perf_counter()
+                metadata = await app.fetch_url_metadata_with_playwright_async(fixtures.page_url(name))
+                latencies.append(time.perf_counter() - start)
+                if 'error' in metadata:
+                    raise Exception(f"{name}: {metadata['error']}")
+
+    asyncio.run(scrape_all())
+    return latencies
+
+
+def bench_process_image(app, fixtures, args):
+    latencies = []
+    for name, seed, ext in manifest_images(args):
+        start = time.perf_counter()
+        app.download_and_process_image(fixtures.image_url(name, seed=seed), f"{name}.{ext}")
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def bench_create_post(app, fixtures, args):
+    client = authenticated_client(app)
+    latencies = []
+    for i, url in enumerate(post_images(fixtures, args.iterations * len(JPEG_IMAGES), 1000)):
+        # Fresh title every time too
+        payload = {
+            'url': fixtures.page_url('news_article', n=i),
+            'title': f"Benchmark post {time.time_ns()}",
+            'description': 'Posted by the offline benchmark suite',
+            'image': url,
+            'source': 'example-news.com',
+        }
+        start = time.perf_counter()
+        response = client.post('/create-post', json=payload)
+        latencies.append(time.perf_counter() - start)
+        if response.status_code != 200:
+            raise Exception(f"create-post returned {response.status_code}: {response.get_json()}")
+    return latencies
+
+
+def bench_create_posts(app, fixtures, args):
+    client = authenticated_client(app)
+    latencies = []
+    urls = post_images(fixtures, args.iterations * args.batch_size, 2000)
+    for batch in range(args.iterations):
+        # No titles, so metadata is fetched as it would be for pasted links
+        items = [{'url': fixtures.page_url('news_article', n=2000 + i), 'image': urls[i]}
+                 for i in range(batch * args.batch_size, (batch + 1) * args.batch_size)]
+        start = time.perf_counter()
+        response = client.post('/create-posts', json={'items': items})
+        latencies.append(time.perf_counter() - start)
+        if response.status_code != 200 or not response.get_json()['success']:
+            raise Exception(f"create-posts returned {response.status_code}: {response.get_json()}")
+    return latencies
+
+
+# Untimed setup run before a benchmark's clock starts, so only the app's work is measured
+WARM_UPS = {
+    'fetch_metadata': warm_fetch_metadata,
+    'fetch_metadata_async': warm_fetch_metadata_async,
+    'process_image': warm_process_image,
+    'create_post': warm_create_post,
+    'create_posts': warm_create_posts,
+}
+
+BENCHMARKS = {
+    'fetch_metadata': bench_fetch_metadata,
+    'fetch_metadata_async': bench_fetch_metadata_async,
+    'playwright': bench_playwright,
+    'process_image': bench_process_image,
+    'create_post': bench_create_post,
+    'create_posts': bench_create_posts,
+}
+
+
+def playwright_available():
+    try:
+        from playwright.sync_api import sync_playwright
+        with sync_playwright() as p:
+            return os.path.exists(p.chromium.executable_path)
+    except Exception:
+        return False
+
+
+def _run(name, fixtures_url, github_url, args, workdir, conn):
+    # Configure the app before it is imported: production mode, every
+    # database in a scratch directory, no write throttling, GitHub faked
+    os.environ.update({
+        'DEBUG_MODE': 'false',
+        'GITHUB_TOKEN': 'benchmark-token',
+        'GITHUB_REPO': 'owner/blog',
+        'GITHUB_BRANCH': 'main',
+        'GITHUB_API_URL': github_url,
+        'GITHUB_SECONDS_BETWEEN_WRITES': '0',
+        'IMAGE_INDEX_DB': os.path.join(workdir, 'image_index.db'),
+        'PUBLISH_QUEUE_DB': os.path.join(workdir, 'publish_queue.db'),
+        'METADATA_CACHE_DB': '',
+        'LAZY_IMPORTS': 'false',
+    })
+    os.chdir(workdir)
+    sys.path.insert(0, ROOT)
+    import app
+
+    # Keep per-request app logging out of the results table
+    logging.disable(logging.INFO)
+
+    fixtures = Fixtures(fixtures_url)
+    try:
+        baseline_rss = memory_kb('VmRSS')
+        if name in WARM_UPS:
+            WARM_UPS[name](app, fixtures, args)
+        start = time.perf_counter()
+        latencies = BENCHMARKS[name](app, fixtures, args)
+        elapsed = time.perf_counter() - start
+        peak_rss = memory_kb('VmHWM')
+        conn.send({
+            'ops': len(latencies),
+            'throughput': round(len(latencies) / elapsed, 2),
+            'p50_ms': round(percentile(latencies, 50) * 1000, 1),
+            'p95_ms': round(percentile(latencies, 95) * 1000, 1),
+            'peak_rss_mb': round((peak_rss - baseline_rss) / 1024, 1),
+        })
+    except Exception as e:
+        conn.send({'error': str(e)})
+    conn.close()
+
+
+def run_benchmark(name, fixtures, github, args):
+    """Run one benchmark in a fresh process; returns its result dict"""
+    ctx = get_context('spawn')
+    parent, child = ctx.Pipe()
+    with tempfile.TemporaryDirectory(prefix='hugo-post-bench-') as workdir:
+        process = ctx.Process(target=_run, args=(name, fixtures.url, github.url, args, workdir, child))
+        process.start()
+        result = parent.recv() if parent.poll(args.timeout) else {'error': f"timed out after {args.timeout}s"}
+        process.join(timeout=5)
+        if process.is_alive():
+            process.kill()
+    return result
+
+
+METRICS = ('throughput', 'p50_ms', 'p95_ms', 'peak_rss_mb')
+
+
+def median_result(runs):
+    """Per-metric median of repeated runs, plus each metric's spread (max - min) / median"""
+    result = dict(runs[0], spread={})
+    for key in METRICS:
+        values = sorted(run[key] for run in runs)
+        result[key] = values[len(values) // 2]
+        result['spread'][key] = round((values[-1] - values[0]) / result[key], 2) if result[key] else 0.0
+    return result
+
+
+def compare(name, result, baseline, tolerance):
+    """Regression messages for ``result`` against its baseline entry"""
+    tolerances = {key: max(tolerance, baseline.get('tolerance', {}).get(key, 0)) for key in METRICS}
+    problems = []
+    if baseline['throughput'] and result['throughput'] < baseline['throughput'] * (1 - tolerances['throughput']):
+        problems.append(f"throughput {baseline['throughput']} -> {result['throughput']} ops/s")
+    for key in ('p50_ms', 'p95_ms'):
+        if baseline[key] and result[key] > baseline[key] * (1 + tolerances[key]):
+            problems.append(f"{key} {baseline[key]} -> {result[key]}")
+    rss_growth = result['peak_rss_mb'] - baseline['peak_rss_mb']
+    if rss_growth > RSS_NOISE_MB and result['peak_rss_mb'] > baseline['peak_rss_mb'] * (1 + tolerances['peak_rss_mb']):
+        problems.append(f"peak_rss_mb {baseline['peak_rss_mb']} -> {result['peak_rss_mb']}")
+    return [f"{name}: {problem}" for problem in problems]
+
+
+def load_baselines():
+    if not os.path.exists(BASELINE_PATH):
+        return {}
+    with open(BASELINE_PATH, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_baselines(baselines):
+    with open(BASELINE_PATH, 'w', encoding='utf-8') as f:
+        json.dump(baselines, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--only', help='comma-separated benchmark names')
+    parser.add_argument('--iterations', type=int, default=3)
+    parser.add_argument('--concurrency', type=int, default=16, help='in-flight fetches for fetch_metadata_async')
+    parser.add_argument('--batch-size', type=int, default=8, help='posts per create_posts request')
+    parser.add_argument('--repeat', type=int, default=1, help='fresh-process runs per benchmark; the median is reported')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='minimum relative change reported as a regression')
+    parser.add_argument('--timeout', type=float, default=600, help='seconds before a benchmark is abandoned')
+    parser.add_argument('--update-baseline', action='store_true', help='record these results as the new baseline')
+    args = parser.parse_args()
+
+    names = args.only.split(',') if args.only else list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+
+    baselines = load_baselines()
+    results = {}
+    regressions = []
+
+    print(f"{'benchmark':>20}  {'ops':>5}  {'ops/s':>8}  {'p50 ms':>8}  {'p95 ms':>8}  {'peak MB':>8}")
+    with FixtureServer() as fixtures, FakeGitHub() as github:
+        for name in names:
+            if name == 'playwright' and not playwright_available():
+                print(f"{name:>20}  skipped (Chromium not installed; run `playwright install chromium`)")
+                continue
+            runs = [run_benchmark(name, fixtures, github, args) for _ in range(args.repeat)]
+            failed = next((run for run in runs if 'error' in run), None)
+            if failed:
+                print(f"{name:>20}  failed: {failed['error']}")
+                regressions.append(f"{name}: failed")
+                continue
+            result = median_result(runs)
+            results[name] = result
+            print(f"{name:>20}  {result['ops']:5d}  {result['throughput']:8.2f}  "
+                  f"{result['p50_ms']:8.1f}  {result['p95_ms']:8.1f}  {result['peak_rss_mb']:8.1f}")
+            if name in baselines and not args.update_baseline:
+                # Fewer samples spread wider, and cold costs weigh more per op
+                recorded = baselines[name].get('iterations', args.iterations)
+                if recorded != args.iterations:
+                    print(f"{'':>20}  not compared: baseline recorded with --iterations {recorded}")
+                    continue
+                regressions.extend(compare(name, result, baselines[name], args.tolerance))
+
+    if args.update_baseline:
+        for name, result in results.items():
+            spread = result.pop('spread')
+            baselines[name] = dict(result, recorded=time.strftime('%Y-%m-%d'), python=platform.python_version(),
+                                   iterations=args.iterations, repeat=args.repeat,
+                                   tolerance={key: max(args.tolerance, value) for key, value in spread.items()})
+        save_baselines(baselines)
+        print(f"\nBaseline updated for {', '.join(results) or 'nothing'} in {os.path.relpath(BASELINE_PATH)}")
+        return
+
+    missing = [name for name in results if name not in baselines]
+    if missing:
+        print(f"\nNo baseline yet for {', '.join(missing)}; record one with --update-baseline")
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond tolerance:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+    print("\nNo regressions beyond tolerance")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Import links from a bookmarks, feed or read-later export
+
+Reads a Netscape bookmarks HTML file (browsers, Pocket, Raindrop), an
+RSS/Atom feed, an OPML outline or a Pocket/Raindrop CSV export, streaming
+it rather than loading it whole, and publishes every link not already in
+the repository as a post: title and image from the page, committed
+IMPORT_BATCH_SIZE posts at a time. Progress is kept in IMPORT_DB, so
+running the same import again after an interruption (or a failed commit)
+carries on where it stopped, retrying only the entries that failed.
+
+Usage:
+    python import_links.py bookmarks.html
+    python import_links.py https://example.com/feed.xml --name "Example feed" --no-images
+    python import_links.py pocket.csv --dry-run   # count what would be imported
+"""
+import os
+import sys
+import argparse
+
+from app import (DEBUG_MODE, GITHUB_TOKEN, IMPORT_FORMATS, IMPORT_BATCH_SIZE, IMPORT_IN_FLIGHT,
+                 IMPORT_DOMAIN_DELAY, LinkImporter, get_import_state)
+
+
+def print_progress(counts):
+    print(f"  {counts['entries']} read, {counts['done']} posted, {counts['duplicate']} already posted, "
+          f"{counts['skipped']} skipped, {counts['failed']} failed", flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('source', help="export file, http(s) URL of a feed, or - for stdin")
+    parser.add_argument('--name', help='import name; re-running an import resumes it (default: the source)')
+    parser.add_argument('--format', default='auto', choices=('auto', *IMPORT_FORMATS))
+    parser.add_argument('--no-images', action='store_true', help="don't add a featured image from the page")
+    parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE, help='posts per commit')
+    parser.add_argument('--in-flight', type=int, default=IMPORT_IN_FLIGHT, help='entries fetched/processed at once')
+    parser.add_argument('--domain-delay', type=float, default=IMPORT_DOMAIN_DELAY, help='seconds between requests to one host')
+    parser.add_argument('--limit', type=int, help='import at most this many new links')
+    parser.add_argument('--dry-run', action='store_true', help='read the export and report what would be imported')
+    args = parser.parse_args()
+
+    if not args.dry_run and (DEBUG_MODE or not GITHUB_TOKEN):
+        parser.error('importing needs GITHUB_TOKEN and DEBUG_MODE off (use --dry-run to just read the export)')
+
+    name = args.name or (args.source if args.source.startswith(('http://', 'https://')) else os.path.basename(args.source))
+    importer = LinkImporter(name, images=not args.no_images, batch_size=args.batch_size, in_flight=args.in_flight,
+                            domain_delay=args.domain_delay, limit=args.limit, dry_run=args.dry_run,
+                            progress=print_progress)
+    if not args.dry_run and not importer.claim(args.source, args.format):
+        sys.exit(f"Import '{name}' is already running")
+
+    print(f"{'Checking' if args.dry_run else 'Importing'} {args.source} as '{name}' ({importer.import_id})")
+    try:
+        counts = importer.run(args.source, args.format)
+    except KeyboardInterrupt:
+        sys.exit('\nInterrupted - run the same command again to resume')
+    except Exception as e:
+        sys.exit(f"Import stopped: {str(e)}\nFix the problem and run the same command again to resume")
+
+    if args.dry_run:
+        print(f"{counts['entries']} links read: {counts['new']} new, {counts['duplicate']} already posted, "
+              f"{counts['skipped']} repeated or imported before, {counts['failed']} malformed")
+        return
+    print(f"Finished: {counts['done']} posted, {counts['duplicate']} already posted, "
+          f"{counts['skipped']} repeated or imported before, {counts['failed']} failed")
+    status = get_import_state().get(importer.import_id)
+    for failure in status['failures']:
+        print(f"  failed: {failure['url']} - {failure['error']}")
+    if status['failed']:
+        print(f"{status['failed']} link(s) failed; run the same command again to retry them")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,11 +1,25 @@
 #!/usr/bin/env python3
 """
 Production runner for Hugo Link Poster
+
+Serves the app with gunicorn: a master process supervising WEB_WORKERS
+worker processes of WEB_THREADS threads each. SIGHUP (``systemctl reload``)
+starts fresh workers with re-read code and .env, then retires the old ones
+once their in-flight requests finish. Set WEB_SERVER=werkzeug to fall back
+to the single-process Flask development server.
+
+One worker is the default: the prepared-image and thumbnail caches and the
+Playwright browser pool live in the process, so with several workers a
+/thumb or /create-post often lands on a worker whose cache is cold, and
+each worker runs browsers of its own. Threads already keep one slow scrape
+or publish from holding up other requests.
 """
 import os
 import sys
+import shutil
+import tempfile
+import threading
 from dotenv import load_dotenv
-from app import app
 
 # Load environment variables
 load_dotenv()
@@ -14,28 +28,122 @@ load_dotenv()
 DEBUG_MODE = os.environ.get('DEBUG_MODE', 'false').lower() == 'true'
 HOST = os.environ.get('HOST', '127.0.0.1')
 PORT = int(os.environ.get('PORT', '5001'))
+WEB_SERVER = os.environ.get('WEB_SERVER', 'gunicorn').lower()
+WEB_WORKERS = int(os.environ.get('WEB_WORKERS', '1'))  # see module docstring before raising
+WEB_THREADS = int(os.environ.get('WEB_THREADS', '8'))
+# Worker heartbeat timeout, not a request timeout: a gthread worker's main
+# loop keeps checking in while its threads serve requests, so a slow scrape
+# or publish is never cut off by this; only a wedged worker (main loop stuck)
+# is killed and replaced. What bounds a request is the app's own timeouts
+# (FETCH_DEADLINE, PLAYWRIGHT_JOB_TIMEOUT, per-call image and GitHub HTTP timeouts)
+WEB_TIMEOUT = int(os.environ.get('WEB_TIMEOUT', '120'))
+WEB_GRACEFUL_TIMEOUT = int(os.environ.get('WEB_GRACEFUL_TIMEOUT', '30'))
+# cloudflared drops idle origin connections after 90s; staying open longer
+# means the tunnel, not us, closes them, so it never reuses a dead socket
+WEB_KEEPALIVE = int(os.environ.get('WEB_KEEPALIVE', '95'))
+WEB_MAX_REQUESTS = int(os.environ.get('WEB_MAX_REQUESTS', '0'))
+# Where worker processes share Prometheus samples so /metrics covers all of them
+METRICS_DIR = os.environ.get('PROMETHEUS_MULTIPROC_DIR') or os.path.join(tempfile.gettempdir(), 'hugo-post-metrics')
 
 # Security checks
 if not DEBUG_MODE:
     required_vars = ['FLASK_SECRET_KEY', 'LINK_POSTER_TOKEN', 'GITHUB_TOKEN', 'GITHUB_REPO']
     missing_vars = [var for var in required_vars if not os.environ.get(var)]
-    
+
     if missing_vars:
         print(f"❌ Missing required environment variables: {', '.join(missing_vars)}")
         print("Please check your .env file and ensure all required variables are set.")
         sys.exit(1)
-    
+
     if os.environ.get('LINK_POSTER_TOKEN') == 'change-this-token-in-production':
         print("❌ Please update LINK_POSTER_TOKEN in your .env file")
         sys.exit(1)
 
-print(f"🚀 Starting Hugo Link Poster in {'DEBUG' if DEBUG_MODE else 'PRODUCTION'} mode")
-print(f"📡 Listening on {HOST}:{PORT}")
+def post_fork(server, worker):
+    # Each worker imports the app itself (no preload), which is what lets a
+    # SIGHUP reload pick up new code
+    load_dotenv(override=True)
+
+def warm_imports_in_background():
+    # Heavy modules are imported lazily so the port opens fast; pull them in
+    # now, off the request path, so the first real request doesn't pay either
+    from app import warm_lazy_modules
+    threading.Thread(target=warm_lazy_modules, name='import-warmup', daemon=True).start()
+
+def post_worker_init(worker):
+    warm_imports_in_background()
+
+def on_starting(server):
+    # Samples from a previous run would skew the histograms
+    shutil.rmtree(METRICS_DIR, ignore_errors=True)
+    os.makedirs(METRICS_DIR)
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
+
+def run_gunicorn():
+    from gunicorn.app.base import BaseApplication
+
+    class HugoPostApplication(BaseApplication):
+        def load_config(self):
+            options = {
+                'bind': f"{HOST}:{PORT}",
+                'workers': WEB_WORKERS,
+                'worker_class': 'gthread',
+                'threads': WEB_THREADS,
+                'timeout': WEB_TIMEOUT,
+                'graceful_timeout': WEB_GRACEFUL_TIMEOUT,
+                'keepalive': WEB_KEEPALIVE,
+                'max_requests': WEB_MAX_REQUESTS,
+                'max_requests_jitter': WEB_MAX_REQUESTS // 10,
+                'preload_app': False,
+                'accesslog': '-',
+                'errorlog': '-',
+                'post_fork': post_fork,
+                'post_worker_init': post_worker_init,
+                'on_starting': on_starting,
+                'child_exit': child_exit,
+                'proc_name': 'hugo-post',
+                # The service runs with a read-only home directory
+                'control_socket_disable': True,
+            }
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            from app import app, get_publish_queue, ASYNC_PUBLISH
+            if ASYNC_PUBLISH:
+                # Start workers now so jobs queued before a restart get picked up
+                get_publish_queue()
+            return app
+
+    # Must be set before workers fork so each one writes its samples there
+    os.environ['PROMETHEUS_MULTIPROC_DIR'] = METRICS_DIR
+
+    print(f"⚙️  gunicorn: {WEB_WORKERS} worker(s) × {WEB_THREADS} thread(s), "
+          f"worker heartbeat timeout {WEB_TIMEOUT}s, keep-alive {WEB_KEEPALIVE}s")
+    HugoPostApplication().run()
+
+def run_werkzeug():
+    from app import app, get_publish_queue, ASYNC_PUBLISH
+    if ASYNC_PUBLISH:
+        # Start workers now so jobs queued before a restart get picked up
+        get_publish_queue()
+    warm_imports_in_background()
 
-if __name__ == '__main__':
     app.run(
         debug=DEBUG_MODE,
         host=HOST,
         port=PORT,
         use_reloader=False  # Disable reloader in production
-    )
\ No newline at end of file
+    )
+
+if __name__ == '__main__':
+    print(f"🚀 Starting Hugo Link Poster in {'DEBUG' if DEBUG_MODE else 'PRODUCTION'} mode")
+    print(f"📡 Listening on {HOST}:{PORT}")
+
+    if WEB_SERVER == 'werkzeug':
+        run_werkzeug()
+    else:
+        run_gunicorn()
@@ -43,6 +43,46 @@ else
     echo "⚠️  Disk Usage: ${DISK_USAGE}% (HIGH)"
 fi
 
+# Per-stage latency from the /metrics histograms (since the service started)
+echo ""
+echo "Stage Latency:"
+echo "=============="
+METRICS_TOKEN=$(grep -s '^METRICS_TOKEN=' /home/jelly/Documents/hugo_post/.env | cut -d= -f2- | tr -d "\"'")
+METRICS=$(curl -s -H "Authorization: Bearer ${METRICS_TOKEN}" http://127.0.0.1:5001/metrics)
+if echo "$METRICS" | grep -q '^hugo_post_stage_duration_seconds_bucket'; then
+    echo "$METRICS" | awk '
+        # Linear interpolation inside the bucket holding the quantile, like PromQL histogram_quantile()
+        function quantile(stage, q,    target, i, prev_le, prev_count) {
+            target = q * total[stage]
+            prev_le = 0; prev_count = 0
+            for (i = 1; i <= n[stage]; i++) {
+                if (counts[stage, i] >= target) {
+                    if (les[stage, i] == "+Inf") return sprintf(">%.0f", prev_le * 1000)
+                    if (counts[stage, i] == prev_count) return sprintf("%.0f", les[stage, i] * 1000)
+                    return sprintf("%.0f", (prev_le + (les[stage, i] - prev_le) * (target - prev_count) / (counts[stage, i] - prev_count)) * 1000)
+                }
+                prev_le = les[stage, i]; prev_count = counts[stage, i]
+            }
+        }
+        /^hugo_post_stage_duration_seconds_bucket/ {
+            match($0, /stage="[^"]*"/); stage = substr($0, RSTART + 7, RLENGTH - 8)
+            match($0, /le="[^"]*"/); le = substr($0, RSTART + 4, RLENGTH - 5)
+            if (!(stage in n)) order[++stages] = stage
+            n[stage]++; les[stage, n[stage]] = le; counts[stage, n[stage]] = $NF
+            if (le == "+Inf") total[stage] = $NF
+        }
+        END {
+            printf "%-16s %8s %8s %8s\n", "stage", "count", "p50 ms", "p95 ms"
+            for (i = 1; i <= stages; i++) {
+                stage = order[i]
+                if (total[stage] > 0)
+                    printf "%-16s %8d %8s %8s\n", stage, total[stage], quantile(stage, 0.5), quantile(stage, 0.95)
+            }
+        }'
+else
+    echo "⚠️  No metrics available (is METRICS_TOKEN set in .env?)"
+fi
+
 # Check recent logs for errors
 echo ""
 echo "Recent Logs:"
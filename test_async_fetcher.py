@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+AsyncFetcher's browser pool, against stand-in browsers (no Chromium needed).
+
+Run with pytest.
+"""
+
+import os
+import sys
+import asyncio
+
+# Add the current directory to Python path to import app functions
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app import AsyncFetcher
+
+
+class StubContext:
+    def __init__(self, browser):
+        self.browser = browser
+
+    async def close(self):
+        pass
+
+
+class StubBrowser:
+    def __init__(self, number):
+        self.number = number
+        self.closed = False
+        self.connected = True
+
+    def is_connected(self):
+        return self.connected and not self.closed
+
+    async def new_context(self):
+        assert not self.closed, 'context requested on a closed browser'
+        return StubContext(self)
+
+    async def close(self):
+        self.closed = True
+
+
+def stub_fetcher(**options):
+    fetcher = AsyncFetcher(**options)
+    fetcher.launched = []
+    fetcher._playwright = object()
+
+    async def launch(playwright):
+        fetcher.launched.append(StubBrowser(len(fetcher.launched) + 1))
+        return fetcher.launched[-1]
+    fetcher._launch = launch
+    return fetcher
+
+
+def test_recycling_waits_for_overlapping_contexts():
+    fetcher = stub_fetcher(pages_per_browser=1)
+
+    async def scenario():
+        async with fetcher.browser_context() as first:
+            # The first browser has served its page; the second context gets a fresh one
+            async with fetcher.browser_context() as second:
+                assert (first.browser.number, second.browser.number) == (1, 2)
+                assert not first.browser.closed
+            assert not first.browser.closed
+        # Closed as soon as its last context is done; the current browser stays up
+        assert first.browser.closed
+        assert not second.browser.closed
+    asyncio.run(scenario())
+
+
+def test_disconnected_browser_is_replaced():
+    fetcher = stub_fetcher()
+
+    async def scenario():
+        async with fetcher.browser_context() as first:
+            pass
+        first.browser.connected = False
+        async with fetcher.browser_context() as second:
+            assert second.browser.number == 2
+        assert first.browser.closed
+    asyncio.run(scenario())
+
+
+def test_pool_spreads_concurrent_contexts_and_reuses_warm_browsers():
+    fetcher = stub_fetcher(pool_size=2)
+
+    async def scenario():
+        async with fetcher.browser_context() as a, fetcher.browser_context() as b, fetcher.browser_context() as c:
+            # Two browsers launched for the first two; the third shares the least busy
+            assert [a.browser.number, b.browser.number, c.browser.number] == [1, 2, 1]
+        for _ in range(3):
+            async with fetcher.browser_context() as context:
+                assert context.browser.number == 1
+        assert len(fetcher.launched) == 2
+    asyncio.run(scenario())
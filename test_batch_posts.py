@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Batch post creation (/create-posts) in debug mode, plus post_files naming.
+
+Run with pytest.
+"""
+
+import os
+import sys
+
+import pytest
+
+# Add the current directory to Python path to import app functions
+sys.path.insert(0, os.path.dirname(__file__))
+
+import app
+from app import post_files
+
+
+class Paths(set):
+    """Stands in for RepoPathIndex"""
+
+    def exists(self, path):
+        return path in self
+
+
+def built(title, slug):
+    return {'title': title, 'slug': slug, 'filename': f"{slug}.md", 'content': f"---\ntitle: \"{title}\"\n---",
+            'image': None, 'image_url': None, 'image_filename': None}
+
+
+def test_post_files_names_same_title_posts_apart():
+    files = {}
+    posts = [built('Same title', 'same-title') for _ in range(3)]
+    for post in posts:
+        post_files(post, Paths({'content/links/same-title.md'}), files, 'test')
+    names = [post['filename'] for post in posts]
+    assert len(set(names)) == 3
+    assert 'same-title.md' not in names
+    assert sorted(files) == sorted(f"content/links/{name}" for name in names)
+
+
+def test_post_files_keeps_free_name():
+    files = {}
+    post = built('Fresh', 'fresh')
+    post_files(post, Paths({'content/links/other.md'}), files, 'test')
+    assert post['filename'] == 'fresh.md'
+    assert list(files) == ['content/links/fresh.md']
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """Debug-mode test client with page metadata served from ``pages``"""
+    pages = {}
+    monkeypatch.setattr(app, 'DEBUG_MODE', True)
+    monkeypatch.setattr(app, 'get_url_metadata', lambda url: pages.get(url, {'error': '404 Not Found'}))
+    test_client = app.app.test_client()
+    test_client.pages = pages
+    return test_client
+
+
+def create_posts(client, items):
+    response = client.post('/create-posts', json={'items': items})
+    return response.get_json()['results']
+
+
+@pytest.mark.parametrize('url', [None, '', 42, ['https://example.com/a'], {'href': 'https://example.com/a'}])
+def test_item_without_string_url_is_rejected(client, url):
+    results = create_posts(client, [{'url': url, 'title': 'Bad'}, {'url': 'https://example.com/a', 'title': 'Good', 'image': None}])
+    assert results[0] == {'success': False, 'error': 'URL is required'}
+    assert results[1]['success']
+
+
+def test_repeated_url_is_reported_once(client):
+    results = create_posts(client, [{'url': 'https://example.com/a', 'title': 'A', 'image': None}] * 2)
+    assert results[0]['success']
+    assert results[1]['error'] == 'Duplicate of item 1'
+
+
+def test_picked_image_failure_falls_back_to_no_image(client, monkeypatch):
+    client.pages['https://example.com/a'] = {'title': 'Page A', 'images': ['https://img.example.com/broken.jpg']}
+    build_post = app.build_post
+
+    def failing_image(data, request_id, progress=None):
+        if data.get('image'):
+            raise Exception('Failed to process image: cannot identify image file')
+        return build_post(data, request_id, progress)
+    monkeypatch.setattr(app, 'build_post', failing_image)
+
+    picked, given = create_posts(client, [
+        {'url': 'https://example.com/a'},
+        {'url': 'https://example.com/b', 'title': 'Page B', 'image': 'https://img.example.com/broken.jpg'},
+    ])
+    assert picked['success'] and picked['title'] == 'Page A'
+    assert 'featuredImage' not in picked['debug_content']
+    assert picked['warning'].startswith('Posted without an image')
+    # An image the user chose is never silently dropped
+    assert not given['success'] and 'Failed to process image' in given['error']
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+GitHubClient against the fake GitHub API in benchmarks/fake_github.py:
+single-commit publishing, rebuilding on a moved branch, refusing to
+overwrite existing posts, and the path index.
+
+Run with pytest.
+"""
+
+import os
+import sys
+import time
+
+import pytest
+
+# Add the current directory to Python path to import app functions
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'benchmarks'))
+
+import app
+from app import GitHubClient, PathExistsError
+from fake_github import FakeGitHub
+
+
+@pytest.fixture
+def fake_github(monkeypatch):
+    with FakeGitHub() as fake:
+        monkeypatch.setattr(app, 'GITHUB_API_URL', fake.url)
+        monkeypatch.setattr(app, 'GITHUB_SECONDS_BETWEEN_WRITES', 0)
+        yield fake
+
+
+@pytest.fixture
+def client(fake_github):
+    return GitHubClient('fake-github-token', fake_github.repo.full_name)
+
+
+def push_elsewhere(fake_github, changes):
+    """Commit straight to the fake repository, as another worker or a laptop would"""
+    repo = fake_github.repo
+    with repo.lock:
+        return repo.commit_changes(repo.default_branch, changes, 'Pushed elsewhere')
+
+
+def head(fake_github):
+    repo = fake_github.repo
+    sha = repo.refs[f"heads/{repo.default_branch}"]
+    return sha, repo.commits[sha], {path: repo.blobs[blob] for path, blob in repo.head_tree(repo.default_branch).items()}
+
+
+def test_post_and_image_land_in_one_commit(client, fake_github):
+    initial, _, _ = head(fake_github)
+    commits = len(fake_github.repo.commits)
+    sha = client.commit_files({'content/links/a.md': '---\ntitle: "A"\n---\n', 'static/images/a.jpg': b'\xff\xd8jpeg'},
+                              'Add link: A', new_paths=['content/links/a.md'])
+
+    head_sha, commit, files = head(fake_github)
+    assert (head_sha, commit['parents'], commit['message']) == (sha, [initial], 'Add link: A')
+    assert files == {'content/links/a.md': b'---\ntitle: "A"\n---\n', 'static/images/a.jpg': b'\xff\xd8jpeg'}
+    assert len(fake_github.repo.commits) == commits + 1
+    assert client.path_index.exists('content/links/a.md') and client.path_index.exists('static/images/a.jpg')
+
+
+def test_commit_is_rebuilt_when_the_branch_moved(client, fake_github):
+    client.head_commit()
+    outside = push_elsewhere(fake_github, {'content/links/other.md': b'other'})
+
+    sha = client.commit_files({'content/links/a.md': 'a'}, 'Add link: A', new_paths=['content/links/a.md'])
+    head_sha, commit, files = head(fake_github)
+    # The first attempt's ref update was rejected as a non-fast-forward; the second built on the outside commit
+    assert (head_sha, commit['parents']) == (sha, [outside])
+    assert set(files) == {'content/links/other.md', 'content/links/a.md'}
+    assert fake_github.stats()['requests']['update_ref'] == 2
+
+
+def test_existing_post_is_never_overwritten(client, fake_github):
+    client.head_commit()
+    outside = push_elsewhere(fake_github, {'content/links/a.md': b'posted elsewhere'})
+
+    with pytest.raises(PathExistsError) as raised:
+        client.commit_files({'content/links/a.md': 'a', 'static/images/a.jpg': b'jpeg'}, 'Add link: A',
+                            new_paths=['content/links/a.md'])
+    assert raised.value.paths == ['content/links/a.md']
+    head_sha, _, files = head(fake_github)
+    assert (head_sha, files) == (outside, {'content/links/a.md': b'posted elsewhere'})
+    # So the caller's next pick of a name avoids it
+    assert client.path_index.exists('content/links/a.md')
+
+
+def test_path_index_refresh_picks_up_outside_pushes(client, fake_github):
+    client.commit_files({'content/links/ours.md': 'ours'}, 'Add link: Ours', new_paths=['content/links/ours.md'])
+    assert not client.path_index.exists('content/links/theirs.md')
+    push_elsewhere(fake_github, {'content/links/theirs.md': b'theirs'})
+    assert not client.path_index.exists('content/links/theirs.md')
+
+    # Stale now: the next lookup answers from the old set and refreshes in the background
+    client.path_index.refresh_seconds = 0
+    deadline = time.time() + 5
+    while not client.path_index.exists('content/links/theirs.md'):
+        assert time.time() < deadline, 'path index never refreshed'
+        time.sleep(0.05)
+    assert client.path_index.exists('content/links/ours.md')
+
+
+def test_rate_limit_status_makes_no_request(client, fake_github):
+    assert client.rate_limit_status() == {'remaining': None, 'limit': None, 'reset': None}
+    assert not fake_github.stats().get('requests')
+
+    client.head_commit()
+    status = client.rate_limit_status()
+    assert status['limit'] and status['remaining'] <= status['limit'] and status['reset']
+    assert sum(fake_github.stats()['requests'].values()) == 2
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Which image formats read_image_stream accepts, probed from a streamed download.
+
+Run with pytest.
+"""
+
+import os
+import sys
+import struct
+from io import BytesIO
+
+import pytest
+from PIL import Image
+
+# Add the current directory to Python path to import app functions
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app import read_image_stream
+
+
+class StreamedResponse:
+    """Just enough of a streaming requests response"""
+
+    def __init__(self, data):
+        self.data = data
+        self.headers = {}
+
+    def iter_content(self, chunk_size):
+        for start in range(0, len(self.data), chunk_size):
+            yield self.data[start:start + chunk_size]
+
+
+def encoded(fmt, size=(400, 300)):
+    output = BytesIO()
+    Image.effect_noise(size, 40).convert('RGB').save(output, fmt)
+    return output.getvalue()
+
+
+def tiff_with_trailing_directory(width=400, height=300):
+    """Greyscale TIFF whose directory follows the pixel data, as some encoders write it"""
+    pixels = Image.effect_noise((width, height), 40).tobytes()
+    entries = [(256, 3, 1, width), (257, 3, 1, height), (258, 3, 1, 8), (259, 3, 1, 1), (262, 3, 1, 1),
+               (273, 4, 1, 8), (277, 3, 1, 1), (278, 3, 1, height), (279, 4, 1, len(pixels))]
+    directory = struct.pack('<H', len(entries))
+    for tag, kind, count, value in entries:
+        directory += struct.pack('<HHII', tag, kind, count, value) if kind == 4 else struct.pack('<HHIHH', tag, kind, count, value, 0)
+    directory += struct.pack('<I', 0)
+    return b'II*\x00' + struct.pack('<I', 8 + len(pixels)) + pixels + directory
+
+
+def jpeg_with_app_segments(*segments):
+    """JPEG with extra APPn segments (marker, payload) ahead of the frame header, as phone photos carry"""
+    data = encoded('JPEG')
+    extra = b''.join(b'\xff' + bytes([marker]) + struct.pack('>H', len(payload) + 2) + payload for marker, payload in segments)
+    return data[:2] + extra + data[2:]
+
+
+@pytest.mark.parametrize('fmt', ['JPEG', 'PNG', 'GIF', 'WEBP', 'BMP', 'TIFF'])
+def test_supported_formats(fmt):
+    img, received = read_image_stream(StreamedResponse(encoded(fmt)), 'test')
+    assert (img.format, img.size) == (fmt, (400, 300))
+
+
+def test_tiff_directory_after_pixel_data():
+    data = tiff_with_trailing_directory()
+    img, received = read_image_stream(StreamedResponse(data), 'test')
+    assert (img.format, img.size, received) == ('TIFF', (400, 300), len(data))
+
+
+def test_jpeg_with_large_exif_and_icc_segments():
+    # Together the segments push the frame header (and the image size) well past IMAGE_PROBE_BYTES
+    data = jpeg_with_app_segments((0xE1, b'Exif\x00\x00' + bytes(60000)),
+                                  (0xE2, b'ICC_PROFILE\x00\x01\x01' + bytes(60000)))
+    img, received = read_image_stream(StreamedResponse(data), 'test')
+    assert (img.format, img.size, received) == ('JPEG', (400, 300), len(data))
+
+
+def test_jpeg_without_frame_header_is_rejected():
+    data = b'\xff\xd8\xff\xda\x00\x08' + bytes(100000)
+    with pytest.raises(Exception, match='Unrecognised image format'):
+        read_image_stream(StreamedResponse(data), 'test')
+
+
+def test_unsupported_format_is_rejected():
+    with pytest.raises(Exception, match='Unsupported image format: PCX'):
+        read_image_stream(StreamedResponse(encoded('PCX')), 'test')
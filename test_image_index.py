@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate image matching in ImageIndex.
+
+Run with pytest.
+"""
+
+import os
+import sys
+
+import pytest
+from PIL import Image, ImageDraw, ImageFont
+
+# Add the current directory to Python path to import app functions
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app import ImageIndex, image_fingerprint
+
+
+def flat(color, size=(400, 300)):
+    return Image.new('RGB', size, color)
+
+
+def picture(seed, size=(400, 300)):
+    img = Image.new('RGB', size, 'white')
+    draw = ImageDraw.Draw(img)
+    for i in range(12):
+        x = (seed * 37 + i * 53) % size[0]
+        y = (seed * 91 + i * 29) % size[1]
+        draw.ellipse((x, y, x + 60, y + 40), fill=((seed * 40 + i * 20) % 256, i * 20, 255 - i * 20))
+    return img
+
+
+def card(title):
+    """A site's templated social card: same layout and artwork, different headline"""
+    img = Image.new('RGB', (1200, 630), (20, 40, 90))
+    draw = ImageDraw.Draw(img)
+    draw.rectangle((0, 0, 1200, 80), fill=(240, 200, 0))
+    draw.text((40, 20), 'EXAMPLE NEWS', fill='black', font=ImageFont.load_default(size=40))
+    draw.text((40, 200), title, fill='white', font=ImageFont.load_default(size=64))
+    draw.ellipse((900, 300, 1100, 500), fill=(200, 50, 50))
+    return img
+
+
+@pytest.fixture
+def index(tmp_path):
+    return ImageIndex(db_path=str(tmp_path / 'images.db'))
+
+
+def record(index, filename, img):
+    index.record(f"https://example.com/{filename}", filename, image_fingerprint(img), [])
+
+
+def test_resized_copy_matches(index):
+    record(index, 'a.jpg', picture(1))
+    record(index, 'b.jpg', picture(2))
+    assert index.find_similar(image_fingerprint(picture(1).resize((200, 150))))['filename'] == 'a.jpg'
+
+
+@pytest.mark.parametrize('stored, query', [
+    (flat('white'), flat('black')),
+    (flat((200, 30, 30)), flat((30, 30, 200), size=(1200, 630))),
+    # Plain left-to-right fades hash to all ones, whatever their colours
+    (Image.linear_gradient('L').rotate(-90).convert('RGB'), Image.linear_gradient('L').rotate(-90).resize((640, 200))),
+])
+def test_near_uniform_images_never_match(index, stored, query):
+    record(index, 'stored.jpg', stored)
+    assert index.find_similar(image_fingerprint(query)) is None
+
+
+
+def test_templated_cards_are_not_reused_across_articles(index):
+    record(index, 'march.jpg', card('Prices rise again in March'))
+    record(index, 'storm.jpg', card('Storm hits coast overnight'))
+    assert index.find_similar(image_fingerprint(card('Prices rise again in April'))) is None
+    assert index.find_similar(image_fingerprint(card('Local team wins final'))) is None
+    assert index.find_similar(image_fingerprint(card('Storm hits coast overnight').resize((600, 315))))['filename'] == 'storm.jpg'
+
+
+def test_cropped_copy_is_not_reused(index):
+    record(index, 'a.jpg', picture(1))
+    assert index.find_similar(image_fingerprint(picture(1).crop((0, 0, 400, 250)))) is None
+
+
+def test_images_recorded_by_another_process_are_matched(index):
+    other = ImageIndex(db_path=index.db_path)
+    assert index.find_similar(image_fingerprint(picture(5))) is None
+    record(other, 'a.jpg', picture(5))
+    assert index.find_similar(image_fingerprint(picture(5).resize((200, 150))))['filename'] == 'a.jpg'
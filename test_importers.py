@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+The link importer: streaming parsers, deduplication and resuming.
+
+Each export format must yield the same {url, title} entries whether it is
+read in one go or a few bytes at a time, and format sniffing must pick the
+right parser. Imports run against a stub repository and a fake commit, so
+no network or GitHub is needed. Run with pytest.
+"""
+
+import os
+import sys
+import base64
+import threading
+from io import BytesIO, BufferedReader
+
+import pytest
+
+# Add the current directory to Python path to import app functions
+sys.path.insert(0, os.path.dirname(__file__))
+
+import app
+from app import (iter_import_entries, sniff_import_format, DomainThrottle, ImportState, LinkImporter,
+                 PostedLinkIndex, get_import_state, get_posted_link_index)
+
+BOOKMARKS = b'''<!DOCTYPE NETSCAPE-Bookmark-file-1>
+<META HTTP-EQUIV="Content-Type" CONTENT="text/html; charset=UTF-8">
+<TITLE>Bookmarks</TITLE>
+<DL><p>
+    <DT><H3 ADD_DATE="1700000000">Reading</H3>
+    <DL><p>
+        <DT><A HREF="https://example.com/a" ADD_DATE="1700000001">Caf\xc3\xa9 &amp; <b>Bar</b></A>
+        <DT><A HREF="javascript:void(0)">Bookmarklet</A>
+        <DT><A HREF="https://example.org/b?utm_source=x">  Second
+            link </A>
+    </DL><p>
+</DL><p>
+'''
+
+RSS = b'''<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0"><channel>
+<title>Feed</title><link>https://example.com/</link>
+<item><title>First &amp; best</title><link>https://example.com/1</link><description>&lt;p&gt;Hi&lt;/p&gt;</description></item>
+<item><title>No link</title><guid isPermaLink="false">abc</guid></item>
+<item><title>Second</title><link> https://example.com/2 </link></item>
+</channel></rss>
+'''
+
+ATOM = b'''<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+<title>Atom</title><link href="https://example.com/"/>
+<entry><title type="html">Entry one</title>
+  <link rel="replies" href="https://example.com/1#comments"/>
+  <link href="https://example.com/1"/></entry>
+<entry><title>Entry two</title><link rel="alternate" type="text/html" href="https://example.com/2"/></entry>
+</feed>
+'''
+
+OPML = b'''<?xml version="1.0"?>
+<opml version="2.0"><head><title>Subscriptions</title></head><body>
+<outline text="Tech">
+  <outline type="rss" text="Blog" title="A Blog" xmlUrl="https://blog.example/feed" htmlUrl="https://blog.example/"/>
+  <outline type="rss" text="Feed only" xmlUrl="https://feedonly.example/rss"/>
+  <outline type="link" text="Plain link" url="https://link.example/page"/>
+</outline>
+</body></opml>
+'''
+
+CSV = ('\ufefftitle,url,time_added,tags,status\n'
+       'Pocket item,https://example.com/p,1700000000,,unread\n'
+       '"Quoted, title",https://example.com/q,1700000001,news,archive\n'
+       'Not a link,about:blank,1700000002,,\n').encode('utf-8')
+
+EXPECTED = {
+    'bookmarks': (BOOKMARKS, [
+        {'url': 'https://example.com/a', 'title': 'Café & Bar'},
+        {'url': 'https://example.org/b?utm_source=x', 'title': 'Second link'},
+    ]),
+    'rss': (RSS, [
+        {'url': 'https://example.com/1', 'title': 'First & best'},
+        {'url': 'https://example.com/2', 'title': 'Second'},
+    ]),
+    'atom': (ATOM, [
+        {'url': 'https://example.com/1', 'title': 'Entry one'},
+        {'url': 'https://example.com/2', 'title': 'Entry two'},
+    ]),
+    'opml': (OPML, [
+        {'url': 'https://blog.example/', 'title': 'A Blog'},
+        {'url': 'https://link.example/page', 'title': 'Plain link'},
+    ]),
+    'csv': (CSV, [
+        {'url': 'https://example.com/p', 'title': 'Pocket item'},
+        {'url': 'https://example.com/q', 'title': 'Quoted, title'},
+    ]),
+}
+
+
+@pytest.mark.parametrize('chunk', [None, 7])
+@pytest.mark.parametrize('export', sorted(EXPECTED))
+def test_export_entries(export, chunk, monkeypatch):
+    if chunk:
+        # Tiny reads split tags, entities and multi-byte characters across chunks
+        monkeypatch.setattr(app, 'IMPORT_READ_CHUNK', chunk)
+    data, expected = EXPECTED[export]
+    assert list(iter_import_entries(BytesIO(data))) == expected
+
+
+@pytest.mark.parametrize('export, fmt', [('bookmarks', 'bookmarks'), ('rss', 'feed'), ('atom', 'feed'),
+                                         ('opml', 'feed'), ('csv', 'csv')])
+def test_sniff_format(export, fmt):
+    stream = BufferedReader(BytesIO(EXPECTED[export][0]))
+    assert sniff_import_format(stream) == fmt
+    assert stream.tell() == 0
+
+
+def test_unknown_format():
+    with pytest.raises(Exception, match='Unrecognised export'):
+        list(iter_import_entries(BytesIO(b'just some text\n')))
+
+
+def test_malformed_feed_keeps_earlier_entries():
+    entries = iter_import_entries(BytesIO(RSS.replace(b'</channel></rss>', b'<item><title>&nbsp;</title></item>')))
+    assert next(entries)['url'] == 'https://example.com/1'
+    with pytest.raises(Exception, match='not well-formed'):
+        list(entries)
+
+
+def test_feed_entries_are_dropped_once_read(monkeypatch):
+    items = b''.join(b'<item><title>%d</title><link>https://example.com/%d</link></item>' % (n, n) for n in range(500))
+    elements = []
+    iterparse = app.ElementTree.iterparse
+
+    def record_elements(source, events):
+        for event, element in iterparse(source, events):
+            elements.append(element)
+            yield event, element
+    monkeypatch.setattr(app.ElementTree, 'iterparse', record_elements)
+
+    entries = iter_import_entries(BytesIO(RSS.replace(b'</channel>', items + b'</channel>')))
+    assert len(list(entries)) == 502
+    # The root ends last; only the feed's own elements are left under it, not an empty shell per entry
+    assert len(list(elements[-1].iter())) < 10
+
+
+def test_domain_throttle_spaces_out_one_host(monkeypatch):
+    slept = []
+    monkeypatch.setattr(app.time, 'sleep', slept.append)
+    throttle = DomainThrottle(delay=0.05)
+    for url in ('https://a.example/1', 'https://a.example/2', 'https://b.example/1', 'https://a.example/3'):
+        throttle.wait(url)
+    # The second and third requests to a.example wait their turn; b.example goes straight through
+    assert len(slept) == 2
+    assert 0.04 < slept[0] <= 0.05 and 0.09 < slept[1] <= 0.1
+
+
+class Stub:
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+
+class StubClient:
+    """Just enough of GitHubClient for PostedLinkIndex.refresh: a branch head and its posts"""
+
+    def __init__(self, posts):
+        self.blob_reads = []
+        self.failing = set()
+        self.set_posts(posts)
+        self.repo = Stub(get_git_tree=self.get_git_tree, get_git_blob=self.get_git_blob)
+
+    def set_posts(self, posts):
+        self.posts = {path: f"sha-{content}" for path, content in posts.items()}
+        self.blobs = {f"sha-{content}": content for content in posts.values()}
+
+    def head_commit(self):
+        return Stub(sha='0' * 40, tree=Stub(sha='tree'))
+
+    def get_git_tree(self, sha, recursive=False):
+        return Stub(tree=[Stub(path=path, sha=sha, type='blob') for path, sha in self.posts.items()])
+
+    def get_git_blob(self, sha):
+        self.blob_reads.append(sha)
+        if sha in self.failing:
+            raise Exception('502 Bad Gateway')
+        return Stub(content=base64.b64encode(self.blobs[sha].encode('utf-8')).decode('ascii'))
+
+
+def post(url):
+    return f'---\ntitle: "Post"\nexternalLink: "{url}"\nsourceUrl: ""\n--- \n'
+
+
+def test_posted_link_index_matches_normalized_links(tmp_path):
+    client = StubClient({
+        'content/links/a.md': post('https://Example.com/a?utm_source=feed#top'),
+        'content/links/bad.md': post('http://host:abc/x'),
+        'content/links/none.md': '---\ntitle: "No link"\n--- \n',
+        'static/images/x.jpg': 'not a post',
+    })
+    index = PostedLinkIndex(str(tmp_path / 'imports.db'))
+    index.refresh(client)
+
+    assert index.contains('https://example.com/a')
+    assert index.contains('https://example.com/a?fbclid=1')
+    assert not index.contains('https://example.com/b')
+    # A malformed link in one post doesn't stop the refresh
+    assert index.contains('http://host:abc/x')
+    assert len(client.blob_reads) == 3
+
+
+def test_posted_link_index_reads_only_changed_posts(tmp_path):
+    client = StubClient({'content/links/a.md': post('https://example.com/a'),
+                         'content/links/b.md': post('https://example.com/b')})
+    index = PostedLinkIndex(str(tmp_path / 'imports.db'))
+    index.refresh(client)
+
+    client.set_posts({'content/links/a.md': post('https://example.com/a'),
+                      'content/links/c.md': post('https://example.com/c')})
+    client.blob_reads.clear()
+    client.failing.add(client.posts['content/links/c.md'])
+    index.refresh(client)
+    # b.md was deleted; c.md couldn't be read and is retried next time
+    assert client.blob_reads == [client.posts['content/links/c.md']]
+    assert not index.contains('https://example.com/b')
+    assert not index.contains('https://example.com/c')
+
+    client.failing.clear()
+    client.blob_reads.clear()
+    index.refresh(client)
+    assert client.blob_reads == [client.posts['content/links/c.md']]
+    assert index.contains('https://example.com/c')
+
+
+@pytest.fixture
+def importer_env(tmp_path, monkeypatch):
+    """LinkImporter wired to scratch databases, a stub repository and a fake commit_posts"""
+    env = Stub(commits=[], fail_commit=set(), fail_metadata=set(), client=StubClient({
+        'content/links/old.md': post('https://example.com/already-posted'),
+    }))
+    monkeypatch.setattr(app, 'DEBUG_MODE', False)
+    monkeypatch.setattr(app, '_import_state', ImportState(str(tmp_path / 'imports.db')))
+    monkeypatch.setattr(app, '_posted_link_index', PostedLinkIndex(str(tmp_path / 'imports.db')))
+    monkeypatch.setattr(app, 'get_github_client', lambda: env.client)
+
+    def batch_item_data(item):
+        if item['url'] in env.fail_metadata:
+            raise Exception('Failed to fetch metadata: 503')
+        return dict(item, image=None)
+
+    def commit_posts(posts, request_id, progress=None, summary=None):
+        if len(env.commits) in env.fail_commit:
+            env.fail_commit.discard(len(env.commits))
+            raise Exception('409 Conflict')
+        env.commits.append([p['title'] for p in posts])
+        return [{'success': True, 'filename': p['filename']} for p in posts]
+
+    monkeypatch.setattr(app, 'batch_item_data', batch_item_data)
+    monkeypatch.setattr(app, 'commit_posts', commit_posts)
+
+    def write(links):
+        path = tmp_path / 'bookmarks.html'
+        path.write_text('<!DOCTYPE NETSCAPE-Bookmark-file-1>\n<DL><p>\n' +
+                        ''.join(f'<DT><A HREF="{url}">{title}</A>\n' for url, title in links) + '</DL>\n')
+        return str(path)
+    env.write = write
+    return env
+
+
+def run_import(source, **options):
+    importer = LinkImporter('bookmarks', domain_delay=0, **options)
+    assert importer.claim(source)
+    return importer, importer.run(source)
+
+
+def test_import_resumes_after_failed_commit(importer_env):
+    links = [(f'https://example.com/{n}', f'Link {n}') for n in range(5)]
+    source = importer_env.write(links)
+    importer_env.fail_commit.add(1)
+    importer_env.fail_metadata.add('https://example.com/4')
+
+    with pytest.raises(Exception, match='409'):
+        run_import(source, batch_size=2, in_flight=1)
+    importer = LinkImporter('bookmarks')
+    status = get_import_state().get(importer.import_id)
+    # The first batch landed; the batch whose commit failed is left unrecorded
+    assert importer_env.commits == [['Link 0', 'Link 1']]
+    assert (status['status'], status['done']) == ('failed', 2)
+
+    importer_env.fail_metadata.clear()
+    importer, counts = run_import(source, batch_size=2, in_flight=1)
+    # Done entries are skipped, the rest (including the earlier failure) imported once each
+    assert counts['skipped'] == 2
+    assert sorted(sum(importer_env.commits, [])) == [f'Link {n}' for n in range(5)]
+    status = get_import_state().get(importer.import_id)
+    assert (status['status'], status['done'], status['failed']) == ('done', 5, 0)
+
+
+def test_import_retries_failed_entries(importer_env):
+    source = importer_env.write([('https://example.com/1', 'One'), ('https://example.com/2', 'Two')])
+    importer_env.fail_metadata.add('https://example.com/2')
+
+    importer, counts = run_import(source)
+    assert (counts['done'], counts['failed']) == (1, 1)
+    assert get_import_state().get(importer.import_id)['failures'][0]['url'] == 'https://example.com/2'
+
+    importer_env.fail_metadata.clear()
+    importer, counts = run_import(source)
+    assert (counts['skipped'], counts['done'], counts['failed']) == (1, 1, 0)
+    assert importer_env.commits == [['One'], ['Two']]
+
+
+def test_import_skips_posted_repeated_and_malformed_links(importer_env):
+    source = importer_env.write([
+        ('https://example.com/already-posted?utm_source=rss', 'Posted before'),
+        ('http://host:abc/x', 'Bad port'),
+        ('https://example.com/new', 'New'),
+        ('https://EXAMPLE.com/new#again', 'Repeat'),
+        ('http://[::1/x', 'Bad brackets'),
+    ])
+
+    importer, counts = run_import(source)
+    assert (counts['duplicate'], counts['skipped'], counts['failed'], counts['done']) == (1, 1, 2, 1)
+    assert importer_env.commits == [['New']]
+    status = get_import_state().get(importer.import_id)
+    assert {failure['error'] for failure in status['failures']} == {'Malformed URL'}
+    # Just committed, so a later import sees it as posted
+    assert get_posted_link_index().contains('https://example.com/new')
+
+
+def test_import_waits_for_hosts_on_its_own_pool(importer_env, monkeypatch):
+    waits = []
+    monkeypatch.setattr(app.time, 'sleep', lambda seconds: waits.append(threading.current_thread().name))
+    source = importer_env.write([(f'https://example.com/{n}', '') for n in range(6)])
+
+    importer = LinkImporter('bookmarks', domain_delay=1, in_flight=3)
+    assert importer.claim(source)
+    assert importer.run(source)['done'] == 6
+    # Never on the batch pools shared with /create-posts
+    assert len(waits) == 5
+    assert all(name.startswith('import') for name in waits)
@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+Fixture corpus for the metadata parser backends.
+
+Every backend in METADATA_PARSERS must produce the recorded title and image
+list for each page in fixtures/html/corpus.json. Run with pytest.
+"""
+
+import os
+import sys
+import json
+
+import pytest
+
+# Add the current directory to Python path to import app functions
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app import METADATA_PARSERS, extract_metadata
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), 'fixtures', 'html')
+
+with open(os.path.join(FIXTURE_DIR, 'corpus.json'), encoding='utf-8') as f:
+    CORPUS = json.load(f)
+
+
+@pytest.mark.parametrize('parser', sorted(METADATA_PARSERS))
+@pytest.mark.parametrize('page', sorted(CORPUS))
+def test_parser_matches_corpus(parser, page):
+    with open(os.path.join(FIXTURE_DIR, f'{page}.html'), 'rb') as f:
+        html = f.read()
+
+    assert extract_metadata(html, CORPUS[page]['url'], parser) == CORPUS[page]['expected']
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+URL normalization used for cache keys and link deduplication.
+
+Run with pytest.
+"""
+
+import os
+import sys
+
+import pytest
+
+# Add the current directory to Python path to import app functions
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app import normalize_url
+
+
+@pytest.mark.parametrize('url, expected', [
+    # Scheme and host are case-insensitive; the path is not
+    ('HTTPS://Example.COM/Path', 'https://example.com/Path'),
+    ('https://example.com', 'https://example.com/'),
+    # Default ports go, others stay
+    ('http://example.com:80/a', 'http://example.com/a'),
+    ('https://example.com:443/a', 'https://example.com/a'),
+    ('https://example.com:8443/a', 'https://example.com:8443/a'),
+    # Fragments and tracking parameters are dropped, the rest sorted
+    ('https://example.com/a#comments', 'https://example.com/a'),
+    ('https://example.com/a?utm_source=x&UTM_Medium=y&fbclid=1&gclid=2', 'https://example.com/a'),
+    ('https://example.com/a?b=2&utm_campaign=z&a=1', 'https://example.com/a?a=1&b=2'),
+    ('https://example.com/a?ref=x&q=', 'https://example.com/a?q=&ref=x'),
+    ('  https://example.com/a  ', 'https://example.com/a'),
+])
+def test_normalize_url(url, expected):
+    assert normalize_url(url) == expected
+
+
+@pytest.mark.parametrize('url', ['http://host:abc/x', 'http://[::1/x', 'https://example.com:99999/'])
+def test_malformed_url_is_returned_stripped(url):
+    assert normalize_url(f" {url} ") == url
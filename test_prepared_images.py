@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+PreparedImageCache: bounded background work, and entries that outlive a failed commit.
+
+Run with pytest.
+"""
+
+import os
+import sys
+import threading
+
+import pytest
+
+# Add the current directory to Python path to import app functions
+sys.path.insert(0, os.path.dirname(__file__))
+
+import app
+from app import PreparedImageCache
+
+
+@pytest.fixture
+def prepared(monkeypatch):
+    """Cache whose processing blocks until ``release`` is set, counting each image it processes"""
+    release = threading.Event()
+    processed = []
+
+    def prepare_post_image(image_url, ext):
+        processed.append(image_url)
+        release.wait(timeout=10)
+        return {'filename': 'x.jpg', 'data': b'x' * 10, 'derivatives': []}
+    monkeypatch.setattr(app, 'prepare_post_image', prepare_post_image)
+
+    cache = PreparedImageCache(ttl=60, max_pending=3)
+    cache.release = release
+    cache.processed = processed
+    yield cache
+    release.set()
+
+
+def test_submits_beyond_the_pending_cap_are_refused(prepared):
+    assert all(prepared.submit(f"https://img.example/{n}.jpg", '.jpg') for n in range(3))
+    assert not prepared.submit('https://img.example/3.jpg', '.jpg')
+    # Already pending is fine
+    assert prepared.submit('https://img.example/0.jpg', '.jpg')
+
+    prepared.release.set()
+    assert prepared.get('https://img.example/0.jpg', '.jpg')['filename'] == 'x.jpg'
+    assert prepared.submit('https://img.example/3.jpg', '.jpg')
+
+
+def test_entry_is_kept_until_discarded(prepared):
+    prepared.release.set()
+    prepared.submit('https://img.example/a.jpg', '.jpg')
+    # A failed commit retries with the same prepared image
+    assert prepared.get('https://img.example/a.jpg', '.jpg') is not None
+    assert prepared.get('https://img.example/a.jpg', '.jpg') is not None
+    assert prepared.processed == ['https://img.example/a.jpg']
+
+    prepared.discard('https://img.example/a.jpg', '.jpg')
+    assert prepared.get('https://img.example/a.jpg', '.jpg') is None
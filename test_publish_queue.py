@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+PublishQueue retries: a failed attempt whose commit landed anyway must not publish twice.
+
+Run with pytest.
+"""
+
+import os
+import sys
+import time
+
+import pytest
+
+# Add the current directory to Python path to import app functions
+sys.path.insert(0, os.path.dirname(__file__))
+
+import app
+from app import PublishQueue
+
+
+class StubClient:
+    def __init__(self):
+        self.branch = []
+
+    def contains_commit(self, sha):
+        return sha in self.branch
+
+
+@pytest.fixture
+def queue(tmp_path, monkeypatch):
+    client = StubClient()
+    monkeypatch.setattr(app, 'get_github_client', lambda: client)
+    monkeypatch.setattr(app, 'PUBLISH_RETRY_BASE_SECONDS', 0)
+    publish_queue = PublishQueue(db_path=str(tmp_path / 'jobs.db'), workers=1)
+    publish_queue.client = client
+    publish_queue.calls = 0
+
+    def publish_post(data, request_id, progress=None, on_commit=None):
+        publish_queue.calls += 1
+        sha = f"commit{publish_queue.calls}"
+        on_commit(sha, {'success': True, 'filename': f"{sha}.md"})
+        if publish_queue.calls == 1:
+            if publish_queue.first_lands:
+                client.branch.append(sha)
+            raise Exception('Connection reset by peer')
+        client.branch.append(sha)
+        return {'success': True, 'filename': f"{sha}.md"}
+    monkeypatch.setattr(app, 'publish_post', publish_post)
+    return publish_queue
+
+
+def finish(publish_queue, job_id):
+    publish_queue.start()
+    deadline = time.time() + 10
+    while time.time() < deadline:
+        job = publish_queue.get(job_id)
+        if job['status'] in ('done', 'failed'):
+            return job
+        time.sleep(0.05)
+    raise AssertionError('job did not finish')
+
+
+@pytest.mark.parametrize('first_lands, calls, filename', [(True, 1, 'commit1.md'), (False, 2, 'commit2.md')])
+def test_retry_checks_whether_the_failed_commit_landed(queue, first_lands, calls, filename):
+    queue.first_lands = first_lands
+    job = finish(queue, queue.enqueue({'url': 'https://example.com/a', 'title': 'A'}))
+    assert (job['status'], job['attempts'], job['result']['filename']) == ('done', 2, filename)
+    assert queue.calls == calls
+    assert len(queue.client.branch) == 1
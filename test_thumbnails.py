@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Image picker thumbnails: /prefetch-thumbs limits and failure caching.
+
+Run with pytest.
+"""
+
+import os
+import sys
+
+import pytest
+
+# Add the current directory to Python path to import app functions
+sys.path.insert(0, os.path.dirname(__file__))
+
+import app
+from app import THUMB_MAX_CANDIDATES
+
+
+@pytest.fixture
+def client(monkeypatch):
+    fetched = []
+
+    def get_thumbnail(image_url, referer=None):
+        fetched.append(image_url)
+        return {'data': b'jpeg', 'width': 400, 'height': 300, 'etag': 'x'}
+    monkeypatch.setattr(app, 'DEBUG_MODE', True)
+    monkeypatch.setattr(app, 'get_thumbnail', get_thumbnail)
+    test_client = app.app.test_client()
+    test_client.fetched = fetched
+    return test_client
+
+
+def candidates(count):
+    return [f"https://img.example/{n}.jpg" for n in range(count)]
+
+
+def test_prefetch_accepts_a_full_picker(client):
+    response = client.post('/prefetch-thumbs', json={'images': candidates(THUMB_MAX_CANDIDATES)})
+    assert response.status_code == 200
+    assert all(image['ok'] for image in response.get_json()['images'])
+
+
+@pytest.mark.parametrize('images', [candidates(THUMB_MAX_CANDIDATES + 1), 'https://img.example/0.jpg'])
+def test_prefetch_rejects_oversized_or_malformed_lists(client, images):
+    response = client.post('/prefetch-thumbs', json={'images': images})
+    assert response.status_code == 400
+    assert client.fetched == []
+
+
+def test_failed_thumbnail_is_retried_after_a_short_while(monkeypatch):
+    attempts = []
+
+    def make_thumbnail(image_url, referer=None):
+        attempts.append(image_url)
+        raise Exception('503 Service Unavailable')
+    monkeypatch.setattr(app, 'make_thumbnail', make_thumbnail)
+    monkeypatch.setattr(app, 'thumbnail_cache', app.MetadataCache(max_entries=10, db_path=''))
+    now = [1000.0]
+    monkeypatch.setattr(app.time, 'time', lambda: now[0])
+
+    assert 'error' in app.get_thumbnail('https://img.example/broken.jpg')
+    assert 'error' in app.get_thumbnail('https://img.example/broken.jpg')
+    assert len(attempts) == 1
+    now[0] += app.THUMB_ERROR_TTL + 1
+    app.get_thumbnail('https://img.example/broken.jpg')
+    assert len(attempts) == 2